@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from dispatcher import db, history
+from dispatcher.models import Config, ReviewedIssue
+
+
+class RunBudget:
+    """Admission control for a run's total turns, tokens and dollars.
+
+    Before an issue is launched, check() projects the run's spend as what is
+    already recorded (finished executions plus triage cost) plus the
+    history-based estimate of every in-flight issue and of the candidate.
+    If that would pass any configured limit the candidate is refused;
+    sessions already running are never interrupted.
+    """
+
+    def __init__(self, conn, run_id: str, config: Config) -> None:
+        self._conn = conn
+        self._run_id = run_id
+        self._config = config
+        self._estimates: dict[int, history.Estimate] = {}
+
+    @property
+    def enabled(self) -> bool:
+        c = self._config
+        return bool(c.run_max_turns or c.run_max_tokens or c.run_max_cost_usd)
+
+    def check(self, candidate: ReviewedIssue, in_flight: list[ReviewedIssue]) -> str | None:
+        """Return why candidate may not start, or None if it fits every budget."""
+        if not self.enabled:
+            return None
+        spend = db.get_run_spend(self._conn, self._run_id)
+        reserved = [self._estimate(r) for r in [*in_flight, candidate]]
+        c = self._config
+        limits = (
+            ("turns", c.run_max_turns, spend["turns"], sum(e.turns for e in reserved)),
+            ("tokens", c.run_max_tokens, spend["tokens"], sum(e.tokens for e in reserved)),
+            ("cost", c.run_max_cost_usd, spend["cost_usd"], sum(e.cost_usd for e in reserved)),
+        )
+        for name, limit, spent, expected in limits:
+            if limit and spent + expected > limit:
+                return f"{name} budget: spent {_fmt(name, spent)} + expected {_fmt(name, expected)} > {_fmt(name, limit)}"
+        return None
+
+    def _estimate(self, reviewed: ReviewedIssue) -> history.Estimate:
+        number = reviewed.triage.issue_number
+        if number not in self._estimates:
+            self._estimates[number] = history.estimate(self._conn, reviewed)
+        return self._estimates[number]
+
+
+def _fmt(name: str, value: float) -> str:
+    return f"${value:.2f}" if name == "cost" else f"{value:,.0f}"
@@ -4,11 +4,27 @@ import argparse
 import sys
 
 
+def _slot_list(raw: str) -> list[int]:
+    try:
+        slots = [int(n.strip()) for n in raw.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError("must be a comma-separated list of integers (e.g. 1,2,4)")
+    if any(n < 1 for n in slots):
+        raise argparse.ArgumentTypeError("slot counts must be at least 1")
+    return slots
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="dispatcher",
         description="Batch-process GitHub issues through feature-flow YOLO mode",
     )
+    parser.add_argument(
+        "command", nargs="?", choices=["run", "serve", "stats", "simulate"], default="run",
+        help="run: process one batch and exit (default); serve: keep polling the label and dispatching; "
+        "stats: print token and cost spend from the history DB; "
+        "simulate: replay a recorded run under alternative scheduling policies",
+    )
     parser.add_argument("--issues", type=str, default=None, help="Comma-separated issue numbers (skips selection TUI)")
     parser.add_argument("--label", type=str, default=None, help="Label filter for selection")
     parser.add_argument("--repo", type=str, default=None, help="GitHub repo owner/repo")
@@ -19,6 +35,17 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--limit", type=int, default=None, help="Max issues in selection TUI")
     parser.add_argument("--verbose", action="store_true", help="Print full claude -p output")
     parser.add_argument("--max-parallel", type=int, default=None, help="Max parallel executions (default: 4)")
+    parser.add_argument(
+        "--order", choices=["confidence", "sjf", "deadline"], default=None,
+        help="Execution order: triage confidence, shortest expected job first, or fit run_deadline_minutes",
+    )
+    parser.add_argument("--max-turns", type=int, default=None, help="Turn budget for every issue this run (disables adaptive budgets)")
+    parser.add_argument("--timeout-minutes", type=int, default=None, help="Wall-clock limit per execution; timed-out issues are resumable")
+    parser.add_argument("--max-cost", type=float, default=None, help="Stop starting new issues once this run would pass USD")
+    parser.add_argument("--run", type=str, default=None, help="With stats, report a single run ID; with simulate, the run to replay (default: latest)")
+    parser.add_argument("--slots", type=_slot_list, default=None, help="With simulate, comma-separated slot counts to compare")
+    parser.add_argument("--stack", action="store_true", help="Branch dependent issues from their in-batch prerequisite's PR")
+    parser.add_argument("--stream", action="store_true", help="With --auto, start executing confident issues while triage continues")
     return parser
 
 
@@ -27,8 +54,13 @@ def main() -> None:
     args = parser.parse_args()
 
     from dispatcher.config import load_config
-    from dispatcher.pipeline import run
+    from dispatcher.pipeline import run, serve, simulate, stats
 
     config = load_config(args)
-    exit_code = run(config)
+    if args.command == "stats":
+        exit_code = stats(config, args.run)
+    elif args.command == "simulate":
+        exit_code = simulate(config, args.run, args.slots)
+    else:
+        exit_code = serve(config) if args.command == "serve" else run(config)
     sys.exit(exit_code)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 import argparse
+import os
 import subprocess
 import sys
 from pathlib import Path
 
 import yaml
 
-from dispatcher.models import Config
+from dispatcher.models import SECRET_FIELDS, Config
+
+EXECUTION_ORDERS = ("confidence", "sjf", "deadline")
+EXECUTION_BACKENDS = ("tmux", "pull")
+ROUTE_KEYS = ("scope", "tier", "model", "max_turns")
 
 
 def _detect_repo() -> str:
@@ -96,6 +101,17 @@ def _parse_issues(raw: str | None) -> list[int]:
         sys.exit(2)
 
 
+def _execution_routes(yaml_data: dict, max_turns_override: int | None) -> list[dict]:
+    routes = yaml_data.get("execution_routes") or []
+    if max_turns_override:
+        # An explicit --max-turns applies to every issue, whatever its route
+        routes = [
+            {k: v for k, v in entry.items() if k != "max_turns"} if isinstance(entry, dict) else entry
+            for entry in routes
+        ]
+    return routes
+
+
 def load_config(args: argparse.Namespace) -> Config:
     config_path = Path(args.config)
     yaml_data = _load_yaml(config_path)
@@ -108,7 +124,28 @@ def load_config(args: argparse.Namespace) -> Config:
         print("Error: plugin_path is required in .dispatcher/config.yml", file=sys.stderr)
         sys.exit(2)
 
-    return _build_config(args, yaml_data, plugin_path)
+    config = _build_config(args, yaml_data, plugin_path)
+    if config.execution_order not in EXECUTION_ORDERS:
+        print(f"Error: execution_order must be one of {', '.join(EXECUTION_ORDERS)}", file=sys.stderr)
+        sys.exit(2)
+    if config.execution_backend not in EXECUTION_BACKENDS:
+        print(f"Error: execution_backend must be one of {', '.join(EXECUTION_BACKENDS)}", file=sys.stderr)
+        sys.exit(2)
+    if config.execution_order == "deadline" and config.run_deadline_minutes <= 0:
+        print("Error: execution_order 'deadline' needs run_deadline_minutes > 0", file=sys.stderr)
+        sys.exit(2)
+    for entry in config.execution_routes:
+        if not isinstance(entry, dict) or not set(entry) <= set(ROUTE_KEYS):
+            print(f"Error: execution_routes entries are mappings of {', '.join(ROUTE_KEYS)}", file=sys.stderr)
+            sys.exit(2)
+    if config.execution_backend == "tmux" and (config.run_max_tokens or config.run_max_cost_usd):
+        print(
+            "Warning: interactive tmux sessions report no token usage or cost, so run_max_tokens and "
+            "run_max_cost_usd only count triage and headless executions. Use execution_backend: pull "
+            "to enforce them.",
+            file=sys.stderr,
+        )
+    return config
 
 
 def _build_config(args: argparse.Namespace, yaml_data: dict, plugin_path: str) -> Config:
@@ -118,9 +155,23 @@ def _build_config(args: argparse.Namespace, yaml_data: dict, plugin_path: str) -
         repo=repo,
         base_branch=yaml_data.get("base_branch") or _detect_base_branch(),
         triage_model=yaml_data.get("triage_model", "claude-sonnet-4-6"),
+        triage_cascade_model=yaml_data.get("triage_cascade_model", ""),
+        triage_cascade_threshold=yaml_data.get("triage_cascade_threshold", 0.85),
         execution_model=yaml_data.get("execution_model", "claude-opus-4-6"),
         triage_max_turns=yaml_data.get("triage_max_turns", 5),
-        execution_max_turns=yaml_data.get("execution_max_turns", 200),
+        triage_max_retries=yaml_data.get("triage_max_retries", 2),
+        triage_retry_backoff_seconds=yaml_data.get("triage_retry_backoff_seconds", 2.0),
+        execution_max_turns=args.max_turns or yaml_data.get("execution_max_turns", 200),
+        execution_routes=_execution_routes(yaml_data, args.max_turns),
+        execution_timeout_minutes=args.timeout_minutes or yaml_data.get("execution_timeout_minutes", 0),
+        run_max_turns=yaml_data.get("run_max_turns", 0),
+        run_max_tokens=yaml_data.get("run_max_tokens", 0),
+        run_max_cost_usd=args.max_cost or yaml_data.get("run_max_cost_usd", 0.0),
+        # An explicit --max-turns is a per-run override of history-derived budgets
+        adaptive_budgets=not args.max_turns and yaml_data.get("adaptive_budgets", False),
+        budget_percentile=yaml_data.get("budget_percentile", 0.9),
+        budget_margin=yaml_data.get("budget_margin", 0.5),
+        budget_min_turns=yaml_data.get("budget_min_turns", 20),
         max_resume_attempts=yaml_data.get("max_resume_attempts", 2),
         db_path=yaml_data.get("db_path", ".dispatcher/dispatcher.db"),
         branch_prefix_fix=yaml_data.get("branch_prefix_fix", "fix"),
@@ -130,6 +181,32 @@ def _build_config(args: argparse.Namespace, yaml_data: dict, plugin_path: str) -
         rate_limit_pause_seconds=yaml_data.get("rate_limit_pause_seconds", 300),
         rate_limit_batch_pause_seconds=yaml_data.get("rate_limit_batch_pause_seconds", 900),
         max_parallel=args.max_parallel or yaml_data.get("max_parallel", 4),
+        execution_order=args.order or yaml_data.get("execution_order", "confidence"),
+        run_deadline_minutes=yaml_data.get("run_deadline_minutes", 0),
+        stack_dependents=args.stack or yaml_data.get("stack_dependents", False),
+        autoscale=yaml_data.get("autoscale", False),
+        min_parallel=yaml_data.get("min_parallel", 1),
+        autoscale_interval_seconds=yaml_data.get("autoscale_interval_seconds", 30),
+        autoscale_max_load_per_cpu=yaml_data.get("autoscale_max_load_per_cpu", 1.0),
+        autoscale_min_free_memory_mb=yaml_data.get("autoscale_min_free_memory_mb", 2048),
+        autoscale_min_free_disk_mb=yaml_data.get("autoscale_min_free_disk_mb", 5120),
+        job_lease_seconds=yaml_data.get("job_lease_seconds", 120),
+        retain_worktrees=yaml_data.get("retain_worktrees", True),
+        worktree_retention_days=yaml_data.get("worktree_retention_days", 7),
+        worktree_retention_max_mb=yaml_data.get("worktree_retention_max_mb", 10240),
+        stall_minutes=yaml_data.get("stall_minutes", 0),
+        stall_grace_minutes=yaml_data.get("stall_grace_minutes", 5),
+        persistent_workers=yaml_data.get("persistent_workers", False),
+        tmux_control_mode=yaml_data.get("tmux_control_mode", False),
+        execution_backend=yaml_data.get("execution_backend", "tmux"),
+        stream=args.stream or yaml_data.get("stream", False),
+        stream_confidence_threshold=yaml_data.get("stream_confidence_threshold", 0.85),
+        triage_concurrency=yaml_data.get("triage_concurrency", 1),
+        prefetch_concurrency=yaml_data.get("prefetch_concurrency", 2),
+        serve_poll_seconds=yaml_data.get("serve_poll_seconds", 60),
+        webhook_host=yaml_data.get("webhook_host", "127.0.0.1"),
+        webhook_port=yaml_data.get("webhook_port", 0),
+        webhook_secret=yaml_data.get("webhook_secret") or os.environ.get(SECRET_FIELDS["webhook_secret"], ""),
         issues=_parse_issues(args.issues),
         auto=args.auto,
         dry_run=args.dry_run,
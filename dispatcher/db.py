@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
+import os
 import sqlite3
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
-from dispatcher.models import ExecutionResult, TriageResult
+from dispatcher.models import RESUMABLE_OUTCOMES, ConcurrencyDecision, ExecutionResult, TriageAttempt, TriageResult
 
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS runs (
@@ -13,7 +14,11 @@ CREATE TABLE IF NOT EXISTS runs (
     finished_at TEXT,
     issue_list TEXT NOT NULL,
     config TEXT NOT NULL,
-    status TEXT NOT NULL DEFAULT 'running'
+    status TEXT NOT NULL DEFAULT 'running',
+    stage TEXT,
+    spent_turns INTEGER DEFAULT 0,
+    spent_tokens INTEGER DEFAULT 0,
+    spent_cost_usd REAL DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS issues (
@@ -46,37 +51,193 @@ CREATE TABLE IF NOT EXISTS issues (
     triage_started_at TEXT,
     triage_finished_at TEXT,
     exec_started_at TEXT,
-    exec_finished_at TEXT
+    exec_finished_at TEXT,
+    estimated_seconds REAL,
+    estimated_turns REAL,
+    estimate_basis TEXT,
+    max_turns INTEGER,
+    timeout_seconds REAL,
+    execution_model TEXT,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    cache_creation_tokens INTEGER DEFAULT 0,
+    cost_usd REAL DEFAULT 0,
+    usage_reported INTEGER DEFAULT 1,
+    triage_input_tokens INTEGER DEFAULT 0,
+    triage_output_tokens INTEGER DEFAULT 0,
+    triage_cache_read_tokens INTEGER DEFAULT 0,
+    triage_cache_creation_tokens INTEGER DEFAULT 0,
+    triage_cost_usd REAL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS triage_attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    issue_number INTEGER NOT NULL,
+    stage TEXT NOT NULL,
+    model TEXT NOT NULL,
+    latency_seconds REAL,
+    cost_usd REAL,
+    confidence REAL,
+    accepted INTEGER DEFAULT 0,
+    error_message TEXT,
+    retry INTEGER DEFAULT 0,
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    cache_read_tokens INTEGER DEFAULT 0,
+    cache_creation_tokens INTEGER DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS issue_snapshots (
+    issue_number INTEGER PRIMARY KEY,
+    data TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS intake (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    delivery_id TEXT UNIQUE,
+    issue_number INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    updated_at TEXT,
+    received_at TEXT NOT NULL,
+    processed_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    issue_number INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    session_name TEXT,
+    pane_index INTEGER,
+    worker TEXT,
+    attempts INTEGER DEFAULT 0,
+    lease_expires_at TEXT,
+    heartbeat_at TEXT,
+    stalled_at TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (run_id, issue_number)
+);
+
+CREATE TABLE IF NOT EXISTS concurrency_decisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    previous_limit INTEGER NOT NULL,
+    new_limit INTEGER NOT NULL,
+    running INTEGER NOT NULL,
+    queued INTEGER NOT NULL,
+    load_per_cpu REAL,
+    mem_available_mb INTEGER,
+    disk_free_mb INTEGER,
+    rate_limited INTEGER DEFAULT 0,
+    reason TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS worktrees (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL UNIQUE,
+    run_id TEXT NOT NULL REFERENCES runs(id),
+    issue_number INTEGER NOT NULL,
+    branch_name TEXT,
+    outcome TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
 );
 
 CREATE INDEX IF NOT EXISTS idx_issues_run_id ON issues(run_id);
 CREATE INDEX IF NOT EXISTS idx_issues_outcome ON issues(outcome);
 CREATE INDEX IF NOT EXISTS idx_issues_issue_number ON issues(issue_number);
+CREATE INDEX IF NOT EXISTS idx_triage_attempts_run_id ON triage_attempts(run_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_run_state ON jobs(run_id, state);
 """
 
+# Columns added after a table's first release: (table, column, declaration).
+# init_db adds any that are missing so existing dispatcher.db files keep working.
+_MIGRATIONS: list[tuple[str, str, str]] = [
+    ("runs", "stage", "TEXT"),
+    ("jobs", "worker", "TEXT"),
+    ("jobs", "stalled_at", "TEXT"),
+    ("issues", "estimated_seconds", "REAL"),
+    ("issues", "estimated_turns", "REAL"),
+    ("issues", "estimate_basis", "TEXT"),
+    ("issues", "max_turns", "INTEGER"),
+    ("issues", "timeout_seconds", "REAL"),
+    ("issues", "execution_model", "TEXT"),
+    ("issues", "input_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "output_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "cache_read_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "cache_creation_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "cost_usd", "REAL DEFAULT 0"),
+    ("issues", "triage_input_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "triage_output_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "triage_cache_read_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "triage_cache_creation_tokens", "INTEGER DEFAULT 0"),
+    ("issues", "triage_cost_usd", "REAL DEFAULT 0"),
+    ("triage_attempts", "input_tokens", "INTEGER DEFAULT 0"),
+    ("triage_attempts", "output_tokens", "INTEGER DEFAULT 0"),
+    ("triage_attempts", "cache_read_tokens", "INTEGER DEFAULT 0"),
+    ("triage_attempts", "cache_creation_tokens", "INTEGER DEFAULT 0"),
+    ("runs", "spent_turns", "INTEGER DEFAULT 0"),
+    ("runs", "spent_tokens", "INTEGER DEFAULT 0"),
+    ("runs", "spent_cost_usd", "REAL DEFAULT 0"),
+    ("issues", "usage_reported", "INTEGER DEFAULT 1"),
+]
+
 
 def init_db(path: str) -> sqlite3.Connection:
     from pathlib import Path
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(path)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL needs shared memory, so pull workers on other hosts sharing the file
+    # over a network filesystem must set DISPATCHER_DB_JOURNAL_MODE=DELETE.
+    conn.execute(f"PRAGMA journal_mode={os.environ.get('DISPATCHER_DB_JOURNAL_MODE', 'WAL')}")
+    conn.execute("PRAGMA busy_timeout=10000")
+    _migrate(conn)
     conn.executescript(_SCHEMA)
     return conn
 
 
+def _migrate(conn: sqlite3.Connection) -> None:
+    for table, column, decl in _MIGRATIONS:
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if columns and column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+    conn.commit()
+
+
 def _now() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+def _in(seconds: float) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
 def insert_run(conn: sqlite3.Connection, run_id: str, issue_list: list[int], config_json: str) -> None:
     conn.execute(
-        "INSERT INTO runs (id, started_at, issue_list, config, status) VALUES (?, ?, ?, ?, 'running')",
+        "INSERT INTO runs (id, started_at, issue_list, config, status, stage) VALUES (?, ?, ?, ?, 'running', 'triage')",
         (run_id, _now(), json.dumps(issue_list), config_json),
     )
     conn.commit()
 
 
+def add_run_issue(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    """Append an issue number to a run's issue_list (used by serve mode)."""
+    row = conn.execute("SELECT issue_list FROM runs WHERE id = ?", (run_id,)).fetchone()
+    issues = json.loads(row[0]) if row and row[0] else []
+    if issue_number not in issues:
+        issues.append(issue_number)
+        conn.execute("UPDATE runs SET issue_list = ? WHERE id = ?", (json.dumps(issues), run_id))
+        conn.commit()
+
+
 def update_run_status(conn: sqlite3.Connection, run_id: str, status: str) -> None:
     finished = _now() if status in ("completed", "failed", "cancelled") else None
     conn.execute(
@@ -86,6 +247,12 @@ def update_run_status(conn: sqlite3.Connection, run_id: str, status: str) -> Non
     conn.commit()
 
 
+def update_run_stage(conn: sqlite3.Connection, run_id: str, stage: str) -> None:
+    """Record the pipeline stage a run has reached: triage, review or execution."""
+    conn.execute("UPDATE runs SET stage = ? WHERE id = ?", (stage, run_id))
+    conn.commit()
+
+
 def insert_issue(conn: sqlite3.Connection, run_id: str, tr: TriageResult) -> None:
     conn.execute(
         """INSERT INTO issues (
@@ -101,32 +268,232 @@ def insert_issue(conn: sqlite3.Connection, run_id: str, tr: TriageResult) -> Non
             json.dumps(tr.missing_info), tr.reasoning, _now(), _now(),
         ),
     )
+    _refresh_triage_usage(conn, run_id, tr.issue_number)
     conn.commit()
 
 
+def _refresh_triage_usage(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    """Roll the issue's triage_attempts usage up onto its issues row (if it has one yet)."""
+    conn.execute(
+        """UPDATE issues SET
+            (triage_input_tokens, triage_output_tokens, triage_cache_read_tokens,
+             triage_cache_creation_tokens, triage_cost_usd) = (
+                SELECT COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0),
+                    COALESCE(SUM(cache_read_tokens), 0), COALESCE(SUM(cache_creation_tokens), 0),
+                    COALESCE(SUM(cost_usd), 0)
+                FROM triage_attempts WHERE run_id = ? AND issue_number = ?)
+        WHERE run_id = ? AND issue_number = ?""",
+        (run_id, issue_number, run_id, issue_number),
+    )
+
+
 def update_issue_execution(conn: sqlite3.Connection, run_id: str, issue_number: int, er: ExecutionResult) -> None:
+    """Record an execution's result; its usage is added to the issue's and the run's spend."""
     conn.execute(
         """UPDATE issues SET
             branch_name = ?, session_id = ?, num_turns = ?, is_error = ?,
             pr_number = ?, pr_url = ?, error_message = ?, outcome = ?,
-            exec_started_at = ?, exec_finished_at = ?
+            exec_started_at = COALESCE(exec_started_at, ?), exec_finished_at = ?,
+            input_tokens = COALESCE(input_tokens, 0) + ?,
+            output_tokens = COALESCE(output_tokens, 0) + ?,
+            cache_read_tokens = COALESCE(cache_read_tokens, 0) + ?,
+            cache_creation_tokens = COALESCE(cache_creation_tokens, 0) + ?,
+            cost_usd = COALESCE(cost_usd, 0) + ?,
+            usage_reported = MIN(COALESCE(usage_reported, 1), ?)
         WHERE run_id = ? AND issue_number = ?""",
         (
             er.branch_name, er.session_id, er.num_turns, int(er.is_error),
             er.pr_number, er.pr_url, er.error_message, er.outcome,
-            _now(), _now(), run_id, issue_number,
+            _now(), _now(), er.input_tokens, er.output_tokens, er.cache_read_tokens,
+            er.cache_creation_tokens, er.cost_usd, int(er.usage_reported), run_id, issue_number,
         ),
     )
+    conn.execute(
+        """UPDATE runs SET
+            spent_turns = COALESCE(spent_turns, 0) + ?,
+            spent_tokens = COALESCE(spent_tokens, 0) + ?,
+            spent_cost_usd = COALESCE(spent_cost_usd, 0) + ?
+        WHERE id = ?""",
+        (er.num_turns, er.total_tokens, er.cost_usd, run_id),
+    )
+    conn.commit()
+
+
+def record_issue_session(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, branch_name: str, session_id: str,
+) -> None:
+    """Store the branch and pinned session ID as soon as an execution starts, so an interrupted one can resume."""
+    conn.execute(
+        "UPDATE issues SET branch_name = ?, session_id = ? WHERE run_id = ? AND issue_number = ?",
+        (branch_name, session_id, run_id, issue_number),
+    )
+    conn.commit()
+
+
+def mark_issues_unfinished(
+    conn: sqlite3.Connection, run_id: str, issue_numbers: list[int], outcome: str, message: str,
+) -> None:
+    """Give issues without an outcome a resumable one (e.g. ``interrupted``), keeping branch and session ID."""
+    conn.executemany(
+        """UPDATE issues SET outcome = ?, is_error = 1, error_message = ?, exec_finished_at = ?
+        WHERE run_id = ? AND issue_number = ? AND outcome IS NULL""",
+        [(outcome, message, _now(), run_id, n) for n in issue_numbers],
+    )
+    conn.commit()
+
+
+def clear_issue_outcomes(conn: sqlite3.Connection, run_id: str, issue_numbers: list[int]) -> None:
+    """Forget previous outcomes of issues about to be resumed, so a stale one is never read as the new result."""
+    conn.executemany(
+        "UPDATE issues SET outcome = NULL WHERE run_id = ? AND issue_number = ?",
+        [(run_id, n) for n in issue_numbers],
+    )
     conn.commit()
 
 
+def get_run_spend(conn: sqlite3.Connection, run_id: str) -> sqlite3.Row:
+    """Turns, tokens and dollars spent by a run so far; dollars include triage calls."""
+    return conn.execute(
+        """SELECT COALESCE(spent_turns, 0) AS turns, COALESCE(spent_tokens, 0) AS tokens,
+            COALESCE(spent_cost_usd, 0)
+              + (SELECT COALESCE(SUM(cost_usd), 0) FROM triage_attempts WHERE run_id = runs.id) AS cost_usd
+        FROM runs WHERE id = ?""",
+        (run_id,),
+    ).fetchone()
+
+
+def mark_issue_started(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    """Stamp exec_started_at when an execution (or resume) begins, so durations are real."""
+    conn.execute(
+        "UPDATE issues SET exec_started_at = ?, exec_finished_at = NULL WHERE run_id = ? AND issue_number = ?",
+        (_now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def set_issue_estimate(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, seconds: float, turns: float, basis: str,
+) -> None:
+    conn.execute(
+        """UPDATE issues SET estimated_seconds = ?, estimated_turns = ?, estimate_basis = ?
+        WHERE run_id = ? AND issue_number = ?""",
+        (seconds, turns, basis, run_id, issue_number),
+    )
+    conn.commit()
+
+
+def set_issue_budget(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, max_turns: int | None, timeout_seconds: float | None,
+    model: str | None = None,
+) -> None:
+    conn.execute(
+        """UPDATE issues SET max_turns = ?, timeout_seconds = ?, execution_model = COALESCE(?, execution_model)
+        WHERE run_id = ? AND issue_number = ?""",
+        (max_turns, timeout_seconds, model, run_id, issue_number),
+    )
+    conn.commit()
+
+
+_DURATION_SQL = "(julianday(exec_finished_at) - julianday(exec_started_at)) * 86400.0"
+
+
+def _execution_filter(
+    scope: str | None, tier: str | None, richness_score: int | None, model: str | None = None,
+) -> tuple[str, list]:
+    clauses = ["outcome IS NOT NULL", "exec_started_at IS NOT NULL", "exec_finished_at > exec_started_at"]
+    params: list = []
+    if scope is not None:
+        clauses.append("scope = ?")
+        params.append(scope)
+    if tier is not None:
+        clauses.append("COALESCE(reviewed_tier, triage_tier) = ?")
+        params.append(tier)
+    if richness_score is not None:
+        clauses.append("richness_score = ?")
+        params.append(richness_score)
+    if model is not None:
+        clauses.append("execution_model = ?")
+        params.append(model)
+    return " AND ".join(clauses), params
+
+
+def get_execution_stats(
+    conn: sqlite3.Connection,
+    scope: str | None = None,
+    tier: str | None = None,
+    richness_score: int | None = None,
+    model: str | None = None,
+) -> sqlite3.Row:
+    """Sample count and mean wall-clock seconds / turns / tokens / cost of finished executions matching the filters.
+
+    Turns, tokens and cost are averaged over ``usage_samples``, the executions
+    that reported usage; interactive sessions only count towards duration.
+    """
+    where, params = _execution_filter(scope, tier, richness_score, model)
+    return conn.execute(
+        f"""SELECT COUNT(*) AS samples, AVG({_DURATION_SQL}) AS avg_seconds,
+            SUM(usage_reported != 0) AS usage_samples,
+            AVG(CASE WHEN usage_reported != 0 THEN num_turns END) AS avg_turns,
+            AVG(CASE WHEN usage_reported != 0 THEN COALESCE(input_tokens, 0) + COALESCE(output_tokens, 0)
+                + COALESCE(cache_read_tokens, 0) + COALESCE(cache_creation_tokens, 0) END) AS avg_tokens,
+            AVG(CASE WHEN usage_reported != 0 THEN COALESCE(cost_usd, 0) END) AS avg_cost_usd
+        FROM issues WHERE {where}""",
+        params,
+    ).fetchone()
+
+
+def get_successful_executions(
+    conn: sqlite3.Connection, scope: str | None = None, tier: str | None = None,
+) -> list[sqlite3.Row]:
+    """(num_turns, seconds, usage_reported) of executions that ended in a PR, for budget percentiles."""
+    where, params = _execution_filter(scope, tier, None)
+    return conn.execute(
+        f"""SELECT num_turns, {_DURATION_SQL} AS seconds, usage_reported FROM issues
+        WHERE {where} AND outcome IN ('pr_created', 'pr_created_review')""",
+        params,
+    ).fetchall()
+
+
+def get_executed_issues(conn: sqlite3.Connection, run_id: str) -> list[sqlite3.Row]:
+    """Issues of a run whose execution finished, with its wall-clock ``seconds``, in triage order."""
+    where, params = _execution_filter(None, None, None)
+    return conn.execute(
+        f"SELECT *, {_DURATION_SQL} AS seconds FROM issues WHERE run_id = ? AND {where} ORDER BY id",
+        (run_id, *params),
+    ).fetchall()
+
+
 def get_resumable_issues(conn: sqlite3.Connection, run_id: str) -> list[sqlite3.Row]:
+    placeholders = ", ".join("?" for _ in RESUMABLE_OUTCOMES)
     return conn.execute(
-        "SELECT * FROM issues WHERE run_id = ? AND outcome IN ('failed', 'leash_hit')",
+        f"SELECT * FROM issues WHERE run_id = ? AND outcome IN ({placeholders})",
+        (run_id, *RESUMABLE_OUTCOMES),
+    ).fetchall()
+
+
+def get_triaged_issues(conn: sqlite3.Connection, run_id: str) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT * FROM issues WHERE run_id = ? ORDER BY id",
         (run_id,),
     ).fetchall()
 
 
+def save_issue_snapshot(conn: sqlite3.Connection, issue_number: int, data: dict) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO issue_snapshots (issue_number, data, fetched_at) VALUES (?, ?, ?)",
+        (issue_number, json.dumps(data), _now()),
+    )
+    conn.commit()
+
+
+def get_issue_snapshot(conn: sqlite3.Connection, issue_number: int) -> dict | None:
+    row = conn.execute(
+        "SELECT data FROM issue_snapshots WHERE issue_number = ?",
+        (issue_number,),
+    ).fetchone()
+    return json.loads(row["data"]) if row else None
+
+
 def get_previous_triage(conn: sqlite3.Connection, issue_number: int) -> sqlite3.Row | None:
     return conn.execute(
         "SELECT * FROM issues WHERE issue_number = ? ORDER BY triage_finished_at DESC LIMIT 1",
@@ -140,3 +507,358 @@ def increment_resume_count(conn: sqlite3.Connection, run_id: str, issue_number:
         (run_id, issue_number),
     )
     conn.commit()
+
+
+def insert_triage_attempts(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, attempts: list[TriageAttempt],
+) -> None:
+    conn.executemany(
+        """INSERT INTO triage_attempts (
+            run_id, issue_number, stage, model, latency_seconds, cost_usd,
+            confidence, accepted, error_message, retry, input_tokens, output_tokens,
+            cache_read_tokens, cache_creation_tokens, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [
+            (
+                run_id, issue_number, a.stage, a.model, a.latency_seconds, a.cost_usd,
+                a.confidence, int(a.accepted), a.error_message, a.retry, a.input_tokens,
+                a.output_tokens, a.cache_read_tokens, a.cache_creation_tokens, _now(),
+            )
+            for a in attempts
+        ],
+    )
+    _refresh_triage_usage(conn, run_id, issue_number)
+    conn.commit()
+
+
+def get_triage_stage_stats(conn: sqlite3.Connection, run_id: str | None = None) -> list[sqlite3.Row]:
+    """Per-stage/model triage latency, cost and acceptance, for tuning the cascade threshold."""
+    where = "WHERE run_id = ?" if run_id else ""
+    return conn.execute(
+        f"""SELECT stage, model,
+            COUNT(*) AS calls,
+            SUM(accepted) AS accepted,
+            SUM(error_message IS NOT NULL) AS failed,
+            SUM(retry > 0) AS retries,
+            AVG(latency_seconds) AS avg_latency_seconds,
+            SUM(cost_usd) AS total_cost_usd
+        FROM triage_attempts {where}
+        GROUP BY stage, model ORDER BY stage, model""",
+        (run_id,) if run_id else (),
+    ).fetchall()
+
+
+def get_usage_by_scope(conn: sqlite3.Connection, run_id: str | None = None) -> list[sqlite3.Row]:
+    """Per-scope/tier token and dollar totals across triage and execution, most expensive first."""
+    where = "WHERE run_id = ?" if run_id else ""
+    return conn.execute(
+        f"""SELECT scope, COALESCE(reviewed_tier, triage_tier) AS tier,
+            COUNT(*) AS issues,
+            SUM(outcome IS NOT NULL) AS executed,
+            SUM(outcome IS NOT NULL AND usage_reported = 0) AS unreported,
+            COALESCE(SUM(triage_input_tokens + triage_output_tokens
+                + triage_cache_read_tokens + triage_cache_creation_tokens), 0) AS triage_tokens,
+            COALESCE(SUM(triage_cost_usd), 0) AS triage_cost_usd,
+            COALESCE(SUM(input_tokens), 0) AS input_tokens,
+            COALESCE(SUM(output_tokens), 0) AS output_tokens,
+            COALESCE(SUM(cache_read_tokens), 0) AS cache_read_tokens,
+            COALESCE(SUM(cache_creation_tokens), 0) AS cache_creation_tokens,
+            COALESCE(SUM(cost_usd), 0) AS cost_usd
+        FROM issues {where}
+        GROUP BY scope, tier
+        ORDER BY COALESCE(SUM(cost_usd), 0) + COALESCE(SUM(triage_cost_usd), 0) DESC""",
+        (run_id,) if run_id else (),
+    ).fetchall()
+
+
+def get_execution_model_stats(conn: sqlite3.Connection, run_id: str | None = None) -> list[sqlite3.Row]:
+    """Per-execution-model counts, PR rate, average turns and run time, and dollars."""
+    where = "AND run_id = ?" if run_id else ""
+    return conn.execute(
+        f"""SELECT execution_model AS model,
+            COUNT(*) AS executions,
+            SUM(outcome IN ('pr_created', 'pr_created_review')) AS prs,
+            AVG(num_turns) AS avg_turns,
+            AVG({_DURATION_SQL}) AS avg_seconds,
+            COALESCE(SUM(cost_usd), 0) AS cost_usd
+        FROM issues WHERE outcome IS NOT NULL AND execution_model IS NOT NULL {where}
+        GROUP BY execution_model
+        ORDER BY cost_usd DESC""",
+        (run_id,) if run_id else (),
+    ).fetchall()
+
+
+def get_escalation_rate(conn: sqlite3.Connection, run_id: str | None = None) -> tuple[int, int]:
+    """Return (escalated, cascaded): issues whose cascade stage was rejected vs all cascaded issues."""
+    where = "AND run_id = ?" if run_id else ""
+    row = conn.execute(
+        f"""SELECT COUNT(*) AS cascaded, COALESCE(SUM(rejected), 0) AS escalated FROM (
+            SELECT run_id, issue_number, MAX(accepted = 0) AS rejected
+            FROM triage_attempts WHERE stage = 'cascade' {where}
+            GROUP BY run_id, issue_number
+        )""",
+        (run_id,) if run_id else (),
+    ).fetchone()
+    return row["escalated"], row["cascaded"]
+
+
+def insert_intake(
+    conn: sqlite3.Connection, delivery_id: str | None, issue_number: int,
+    action: str, updated_at: str | None,
+) -> bool:
+    """Queue a webhook event. Returns False for an already-seen delivery ID."""
+    cur = conn.execute(
+        """INSERT OR IGNORE INTO intake (delivery_id, issue_number, action, updated_at, received_at)
+        VALUES (?, ?, ?, ?, ?)""",
+        (delivery_id, issue_number, action, updated_at, _now()),
+    )
+    conn.commit()
+    return cur.rowcount == 1
+
+
+def claim_intake(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """Return unprocessed intake events in arrival order and mark them processed."""
+    rows = conn.execute("SELECT * FROM intake WHERE processed_at IS NULL ORDER BY id").fetchall()
+    if rows:
+        conn.executemany(
+            "UPDATE intake SET processed_at = ? WHERE id = ?",
+            [(_now(), row["id"]) for row in rows],
+        )
+        conn.commit()
+    return rows
+
+
+# --- Execution jobs ---
+# state: queued -> leased (pane assigned) -> running (prompt sent) -> done.
+# A leased/running job whose lease_expires_at has passed lost its worker.
+
+def enqueue_job(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, payload: str, state: str = "queued",
+) -> None:
+    """Queue an issue for execution; re-queues it if an earlier job for the run is done.
+
+    ``state='held'`` writes the job parked, so no pull worker can claim it
+    before it is held.
+    """
+    now = _now()
+    conn.execute(
+        """INSERT INTO jobs (run_id, issue_number, payload, state, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (run_id, issue_number) DO UPDATE SET
+            payload = excluded.payload, state = excluded.state, session_name = NULL, pane_index = NULL,
+            lease_expires_at = NULL, heartbeat_at = NULL, updated_at = excluded.updated_at
+        WHERE jobs.state = 'done'""",
+        (run_id, issue_number, payload, state, now, now),
+    )
+    conn.commit()
+
+
+def lease_job(
+    conn: sqlite3.Connection, run_id: str, issue_number: int,
+    session_name: str, pane_index: int, lease_seconds: float,
+) -> None:
+    conn.execute(
+        """UPDATE jobs SET state = 'leased', session_name = ?, pane_index = ?,
+            attempts = COALESCE(attempts, 0) + 1, lease_expires_at = ?, updated_at = ?
+        WHERE run_id = ? AND issue_number = ?""",
+        (session_name, pane_index, _in(lease_seconds), _now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def mark_job_running(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    conn.execute(
+        "UPDATE jobs SET state = 'running', updated_at = ? WHERE run_id = ? AND issue_number = ? AND state = 'leased'",
+        (_now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def heartbeat_job(conn: sqlite3.Connection, run_id: str, issue_number: int, lease_seconds: float) -> None:
+    """Called by the worker to prove it is alive and extend its lease."""
+    now = _now()
+    conn.execute(
+        """UPDATE jobs SET heartbeat_at = ?, lease_expires_at = ?, updated_at = ?
+        WHERE run_id = ? AND issue_number = ? AND state IN ('leased', 'running')""",
+        (now, _in(lease_seconds), now, run_id, issue_number),
+    )
+    conn.commit()
+
+
+def set_job_stalled(conn: sqlite3.Connection, run_id: str, issue_number: int, stalled: bool) -> None:
+    """Flag (or unflag) a running job whose session has shown no activity."""
+    conn.execute(
+        "UPDATE jobs SET stalled_at = ?, updated_at = ? WHERE run_id = ? AND issue_number = ?",
+        (_now() if stalled else None, _now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def finish_job(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    conn.execute(
+        "UPDATE jobs SET state = 'done', lease_expires_at = NULL, updated_at = ? WHERE run_id = ? AND issue_number = ?",
+        (_now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def requeue_job(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    conn.execute(
+        """UPDATE jobs SET state = 'queued', session_name = NULL, pane_index = NULL,
+            lease_expires_at = NULL, stalled_at = NULL, updated_at = ?
+        WHERE run_id = ? AND issue_number = ?""",
+        (_now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def hold_jobs(conn: sqlite3.Connection, run_id: str, issue_numbers: list[int]) -> list[int]:
+    """Park queued jobs so no worker claims them; recover()/--resume requeues held jobs.
+
+    Returns the issues actually held: a pull worker may have claimed some in the meantime.
+    """
+    now = _now()
+    held = [
+        n for n in issue_numbers
+        if conn.execute(
+            "UPDATE jobs SET state = 'held', updated_at = ? WHERE run_id = ? AND issue_number = ? AND state = 'queued'",
+            (now, run_id, n),
+        ).rowcount
+    ]
+    conn.commit()
+    return held
+
+
+def release_job(conn: sqlite3.Connection, run_id: str, issue_number: int, payload: str) -> None:
+    """Queue a held job again with an updated payload."""
+    conn.execute(
+        "UPDATE jobs SET payload = ?, state = 'queued', updated_at = ? WHERE run_id = ? AND issue_number = ? AND state = 'held'",
+        (payload, _now(), run_id, issue_number),
+    )
+    conn.commit()
+
+
+def delete_job(conn: sqlite3.Connection, run_id: str, issue_number: int) -> None:
+    conn.execute(
+        "DELETE FROM jobs WHERE run_id = ? AND issue_number = ? AND state IN ('queued', 'held')",
+        (run_id, issue_number),
+    )
+    conn.commit()
+
+
+def claim_job(
+    conn: sqlite3.Connection, worker: str, lease_seconds: float, run_id: str | None = None,
+) -> sqlite3.Row | None:
+    """Atomically lease the oldest queued job (optionally for one run) to a pull worker."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if run_id is None:
+            row = conn.execute("SELECT id FROM jobs WHERE state = 'queued' ORDER BY id LIMIT 1").fetchone()
+        else:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE state = 'queued' AND run_id = ? ORDER BY id LIMIT 1", (run_id,),
+            ).fetchone()
+        if row is None:
+            conn.commit()
+            return None
+        conn.execute(
+            """UPDATE jobs SET state = 'leased', worker = ?, session_name = NULL, pane_index = NULL,
+                attempts = COALESCE(attempts, 0) + 1, lease_expires_at = ?, updated_at = ?
+            WHERE id = ?""",
+            (worker, _in(lease_seconds), _now(), row["id"]),
+        )
+        job = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+        conn.commit()
+        return job
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def get_job(conn: sqlite3.Connection, run_id: str, issue_number: int) -> sqlite3.Row | None:
+    return conn.execute(
+        "SELECT * FROM jobs WHERE run_id = ? AND issue_number = ?", (run_id, issue_number),
+    ).fetchone()
+
+
+def get_issue(conn: sqlite3.Connection, run_id: str, issue_number: int) -> sqlite3.Row | None:
+    return conn.execute(
+        "SELECT * FROM issues WHERE run_id = ? AND issue_number = ?", (run_id, issue_number),
+    ).fetchone()
+
+
+def get_job_issue_numbers(conn: sqlite3.Connection, run_id: str) -> set[int]:
+    """Issues of a run that were ever handed to an executor, whatever their job state."""
+    rows = conn.execute("SELECT issue_number FROM jobs WHERE run_id = ?", (run_id,)).fetchall()
+    return {r["issue_number"] for r in rows}
+
+
+def get_run(conn: sqlite3.Connection, run_id: str) -> sqlite3.Row | None:
+    return conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+
+
+def get_latest_run(conn: sqlite3.Connection) -> sqlite3.Row | None:
+    return conn.execute("SELECT * FROM runs ORDER BY started_at DESC LIMIT 1").fetchone()
+
+
+def get_unfinished_jobs(conn: sqlite3.Connection, run_id: str) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT * FROM jobs WHERE run_id = ? AND state != 'done' ORDER BY id",
+        (run_id,),
+    ).fetchall()
+
+
+def lease_expired(job: sqlite3.Row) -> bool:
+    return job["lease_expires_at"] is None or job["lease_expires_at"] < _now()
+
+
+def insert_concurrency_decision(conn: sqlite3.Connection, run_id: str, d: ConcurrencyDecision) -> None:
+    conn.execute(
+        """INSERT INTO concurrency_decisions (
+            run_id, previous_limit, new_limit, running, queued, load_per_cpu,
+            mem_available_mb, disk_free_mb, rate_limited, reason, created_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        (
+            run_id, d.previous_limit, d.new_limit, d.running, d.queued, d.load_per_cpu,
+            d.mem_available_mb, d.disk_free_mb, int(d.rate_limited), d.reason, _now(),
+        ),
+    )
+    conn.commit()
+
+
+def retain_worktree(
+    conn: sqlite3.Connection, run_id: str, issue_number: int, path: str, branch_name: str, outcome: str,
+) -> None:
+    """Index a worktree kept after a resumable outcome so --resume can reuse it."""
+    now = _now()
+    conn.execute(
+        """INSERT INTO worktrees (path, run_id, issue_number, branch_name, outcome, created_at, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(path) DO UPDATE SET run_id = excluded.run_id, issue_number = excluded.issue_number,
+            branch_name = excluded.branch_name, outcome = excluded.outcome, updated_at = excluded.updated_at""",
+        (path, run_id, issue_number, branch_name, outcome, now, now),
+    )
+    conn.commit()
+
+
+def get_retained_worktree(conn: sqlite3.Connection, issue_number: int) -> sqlite3.Row | None:
+    return conn.execute(
+        "SELECT * FROM worktrees WHERE issue_number = ? ORDER BY updated_at DESC LIMIT 1",
+        (issue_number,),
+    ).fetchone()
+
+
+def get_retained_worktrees(conn: sqlite3.Connection) -> list[sqlite3.Row]:
+    """All retained worktrees, least recently used first."""
+    return conn.execute("SELECT * FROM worktrees ORDER BY updated_at", ()).fetchall()
+
+
+def release_worktree(conn: sqlite3.Connection, path: str) -> None:
+    conn.execute("DELETE FROM worktrees WHERE path = ?", (path,))
+    conn.commit()
+
+
+def get_concurrency_decisions(conn: sqlite3.Connection, run_id: str) -> list[sqlite3.Row]:
+    return conn.execute(
+        "SELECT * FROM concurrency_decisions WHERE run_id = ? ORDER BY id", (run_id,),
+    ).fetchall()
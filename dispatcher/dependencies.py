@@ -94,3 +94,22 @@ def find_unmet(
         if missing:
             result[issue_num] = missing
     return result
+
+
+def stack_parents(
+    graph: dict[int, list[int]],
+    batch: set[int],
+) -> tuple[dict[int, int], dict[int, list[int]]]:
+    """Map each batch issue to the single in-batch prerequisite it can be stacked on.
+    Returns (parents, ambiguous): ambiguous holds issues with several in-batch
+    prerequisites, which can't branch from all of them. Raises CycleError on cycles."""
+    dep_waves(graph, sorted(batch))  # raises CycleError
+    parents: dict[int, int] = {}
+    ambiguous: dict[int, list[int]] = {}
+    for issue_num in batch:
+        prereqs = sorted({d for d in graph.get(issue_num, []) if d in batch})
+        if len(prereqs) == 1:
+            parents[issue_num] = prereqs[0]
+        elif prereqs:
+            ambiguous[issue_num] = prereqs
+    return parents, ambiguous
@@ -3,11 +3,14 @@ from __future__ import annotations
 import json
 import re
 import subprocess
+import uuid
+from pathlib import Path
 
 from dispatcher import github
 from dispatcher.models import Config, ExecutionResult, ReviewedIssue, TriageResult
 
 _ALLOWED_TOOLS = "Skill,Read,Write,Edit,Bash,Glob,Grep,WebFetch,WebSearch,Task,ToolSearch,AskUserQuestion,EnterPlanMode,ExitPlanMode,TaskCreate,TaskGet,TaskUpdate,TaskList"
+_RESUME_PROMPT = "Continue where you left off and finish the issue."
 
 
 def _slugify(text: str, max_len: int = 40) -> str:
@@ -15,17 +18,22 @@ def _slugify(text: str, max_len: int = 40) -> str:
     return slug[:max_len].rstrip("-")
 
 
-def create_branch(issue_number: int, scope: str, config: Config) -> str:
+def branch_name_for(issue_number: int, scope: str, config: Config) -> str:
     prefix = config.branch_prefix_fix if scope in ("quick-fix",) else config.branch_prefix_feat
-    slug = _slugify(f"issue-{issue_number}")
-    branch_name = f"{prefix}/{issue_number}-{slug}"
+    return f"{prefix}/{issue_number}-{_slugify(f'issue-{issue_number}')}"
+
+
+def create_branch(issue_number: int, scope: str, config: Config, base_branch: str | None = None) -> str:
+    """Create the issue branch from origin's base_branch (config.base_branch by default) and check it out."""
+    branch_name = branch_name_for(issue_number, scope, config)
+    base_branch = base_branch or config.base_branch
 
     # Sync with remote before branching to prevent stale-base conflicts
     subprocess.run(
         ["git", "fetch", "origin"],
         capture_output=True, text=True, timeout=30,
     )
-    start_point = f"origin/{config.base_branch}"
+    start_point = f"origin/{base_branch}"
 
     try:
         subprocess.run(
@@ -42,7 +50,7 @@ def create_branch(issue_number: int, scope: str, config: Config) -> str:
             branch_name = f"{branch_name}-2"
             print(f"  Warning: branch conflict, using fallback name: {branch_name}")
             subprocess.run(
-                ["git", "checkout", "-b", branch_name, config.base_branch],
+                ["git", "checkout", "-b", branch_name, base_branch],
                 capture_output=True, text=True, timeout=30, check=True,
             )
 
@@ -74,39 +82,71 @@ def unstash() -> None:
         print(f"  Warning: git stash pop failed: {result.stderr.strip()}")
 
 
-def build_interactive_claude_cmd(config: Config) -> list[str]:
+def build_interactive_claude_cmd(config: Config, session_id: str | None = None, model: str | None = None) -> list[str]:
     """Build the claude command for interactive TUI (no -p, no prompt)."""
-    return [
+    cmd = [
         "claude", "--plugin-dir", config.plugin_path,
-        "--model", config.execution_model,
+        "--model", model or config.execution_model,
         "--allowedTools", _ALLOWED_TOOLS,
         "--dangerously-skip-permissions",
     ]
+    if session_id:
+        cmd += ["--session-id", session_id]
+    return cmd
 
 
-def build_interactive_prompt(tr: TriageResult, branch_name: str) -> str:
+def build_interactive_prompt(tr: TriageResult, branch_name: str, base_branch: str | None = None) -> str:
     """Build the prompt text to send to an interactive Claude session."""
-    return f"start: GitHub issue #{tr.issue_number}. Issue title: {tr.issue_title}. Work on branch {branch_name}. YOLO mode."
-
-
-def _run_claude(tr: TriageResult, branch_name: str, config: Config, interactive: bool = False) -> subprocess.CompletedProcess:
-    prompt = f"start: GitHub issue #{tr.issue_number}. Issue title: {tr.issue_title}. Work on branch {branch_name}. YOLO mode."
+    prompt = f"start: GitHub issue #{tr.issue_number}. Issue title: {tr.issue_title}. Work on branch {branch_name}."
+    if base_branch:
+        prompt += f" Open the pull request against {base_branch}."
+    return prompt + " YOLO mode."
+
+
+def _run_claude(
+    tr: TriageResult,
+    branch_name: str,
+    config: Config,
+    interactive: bool = False,
+    max_turns: int | None = None,
+    timeout: float | None = None,
+    session_id: str | None = None,
+    cwd: Path | None = None,
+    base_branch: str | None = None,
+    model: str | None = None,
+) -> subprocess.CompletedProcess:
+    """Run one claude session. Raises subprocess.TimeoutExpired (child killed) past timeout."""
+    prompt = build_interactive_prompt(tr, branch_name, base_branch)
     if interactive:
         # Launch interactive TUI — prompt is sent separately via tmux send-keys.
-        cmd = build_interactive_claude_cmd(config)
-        result = subprocess.run(cmd)
+        cmd = build_interactive_claude_cmd(config, session_id, model)
+        result = subprocess.run(cmd, timeout=timeout, cwd=cwd)
         return subprocess.CompletedProcess(result.args, result.returncode, "", "")
     else:
         cmd = [
             "claude", "--plugin-dir", config.plugin_path,
             "-p", prompt,
-            "--model", config.execution_model,
+            "--model", model or config.execution_model,
             "--allowedTools", _ALLOWED_TOOLS,
-            "--max-turns", str(config.execution_max_turns),
+            "--max-turns", str(max_turns or config.execution_max_turns),
             "--dangerously-skip-permissions",
             "--output-format", "json",
         ]
-        return subprocess.run(cmd, capture_output=True, text=True)
+        if session_id:
+            cmd += ["--session-id", session_id]
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+
+
+def usage_fields(outer: dict) -> dict:
+    """ExecutionResult usage kwargs from a claude JSON envelope (zeros when absent)."""
+    usage = outer.get("usage") or {}
+    return {
+        "input_tokens": usage.get("input_tokens") or 0,
+        "output_tokens": usage.get("output_tokens") or 0,
+        "cache_read_tokens": usage.get("cache_read_input_tokens") or 0,
+        "cache_creation_tokens": usage.get("cache_creation_input_tokens") or 0,
+        "cost_usd": outer.get("total_cost_usd") or 0.0,
+    }
 
 
 def _error_result(issue_number: int, branch_name: str, message: str, **kw) -> ExecutionResult:
@@ -127,7 +167,7 @@ def _parse_claude_output(stdout: str, issue_number: int, branch_name: str) -> di
     if outer.get("is_error", False):
         return _error_result(
             issue_number, branch_name, "claude -p reported error",
-            session_id=outer.get("session_id"), num_turns=outer.get("num_turns", 0),
+            session_id=outer.get("session_id"), num_turns=outer.get("num_turns", 0), **usage_fields(outer),
         )
     return outer
 
@@ -137,12 +177,13 @@ def _determine_outcome(reviewed: ReviewedIssue, branch_name: str, outer: dict, c
     num_turns = outer.get("num_turns", 0)
     session_id = outer.get("session_id")
     pr_number, pr_url = _find_pr(branch_name, config)
-    outcome = _classify_outcome(pr_number, num_turns, reviewed.final_tier, config)
+    outcome = _classify_outcome(pr_number, num_turns, reviewed.final_tier, config, reviewed.max_turns)
 
     return ExecutionResult(
         issue_number=tr.issue_number, branch_name=branch_name,
         session_id=session_id, num_turns=num_turns, is_error=False,
         pr_number=pr_number, pr_url=pr_url, error_message=None, outcome=outcome,
+        **usage_fields(outer),
     )
 
 
@@ -156,9 +197,11 @@ def _find_pr(branch_name: str, config: Config) -> tuple[int | None, str | None]:
     return None, None
 
 
-def _classify_outcome(pr_number: int | None, num_turns: int, final_tier: str, config: Config) -> str:
+def _classify_outcome(
+    pr_number: int | None, num_turns: int, final_tier: str, config: Config, max_turns: int | None = None,
+) -> str:
     if not pr_number:
-        return "leash_hit" if num_turns >= config.execution_max_turns else "failed"
+        return "leash_hit" if num_turns >= (max_turns or config.execution_max_turns) else "failed"
     if final_tier == "supervised-yolo":
         _try_add_review_label(pr_number, config)
         return "pr_created_review"
@@ -172,10 +215,53 @@ def _try_add_review_label(pr_number: int, config: Config) -> None:
         print(f"  Warning: Failed to add review label to PR #{pr_number}: {exc}")
 
 
-def execute_issue(reviewed: ReviewedIssue, branch_name: str, config: Config, interactive: bool = False) -> ExecutionResult:
+def execute_issue(
+    reviewed: ReviewedIssue, branch_name: str, config: Config, interactive: bool = False,
+    session_id: str | None = None,
+    cwd: Path | None = None,
+) -> ExecutionResult:
+    er = _execute(reviewed, branch_name, config, interactive, session_id, cwd)
+    if reviewed.base_branch and er.pr_number:
+        # A stacked PR must target its prerequisite's branch whatever base the session picked
+        _try_set_pr_base(er.pr_number, reviewed.base_branch, config)
+    return er
+
+
+def _try_set_pr_base(pr_number: int, base_branch: str, config: Config) -> None:
+    try:
+        github.set_pr_base(pr_number, base_branch, config.repo)
+    except github.GithubError as exc:
+        print(f"  Warning: Failed to retarget PR #{pr_number} to {base_branch}: {exc}")
+
+
+def _execute(
+    reviewed: ReviewedIssue, branch_name: str, config: Config, interactive: bool,
+    session_id: str | None, cwd: Path | None,
+) -> ExecutionResult:
     tr = reviewed.triage
+    # Pin the session ID up front so a killed session can still be resumed
+    session_id = session_id or str(uuid.uuid4())
     try:
-        result = _run_claude(tr, branch_name, config, interactive=interactive)
+        result = _run_claude(
+            tr, branch_name, config, interactive=interactive,
+            max_turns=reviewed.max_turns, timeout=reviewed.timeout_seconds, session_id=session_id, cwd=cwd,
+            base_branch=reviewed.base_branch, model=reviewed.model,
+        )
+    except subprocess.TimeoutExpired:
+        pr_number, pr_url = _find_pr(branch_name, config)
+        if pr_number:
+            outcome = _classify_outcome(pr_number, 0, reviewed.final_tier, config)
+            return ExecutionResult(
+                issue_number=tr.issue_number, branch_name=branch_name, session_id=session_id, num_turns=0,
+                is_error=False, pr_number=pr_number, pr_url=pr_url, error_message=None, outcome=outcome,
+                usage_reported=False,
+            )
+        return ExecutionResult(
+            issue_number=tr.issue_number, branch_name=branch_name, session_id=session_id, num_turns=0,
+            is_error=True, pr_number=None, pr_url=None,
+            error_message=f"Timed out after {reviewed.timeout_seconds / 60:.0f} min",
+            outcome="timed_out", usage_reported=False,
+        )
     except Exception as exc:
         return _error_result(tr.issue_number, branch_name, str(exc))
 
@@ -185,10 +271,10 @@ def execute_issue(reviewed: ReviewedIssue, branch_name: str, config: Config, int
         outcome = "pr_created" if pr_number else "failed"
         return ExecutionResult(
             issue_number=tr.issue_number, branch_name=branch_name,
-            session_id=None, num_turns=0, is_error=not pr_number,
+            session_id=session_id, num_turns=0, is_error=not pr_number,
             pr_number=pr_number, pr_url=pr_url,
             error_message=None if pr_number else "No PR created",
-            outcome=outcome,
+            outcome=outcome, usage_reported=False,
         )
 
     if result.returncode != 0 and not result.stdout.strip():
@@ -200,20 +286,41 @@ def execute_issue(reviewed: ReviewedIssue, branch_name: str, config: Config, int
     return _determine_outcome(reviewed, branch_name, parsed, config)
 
 
-def resume_issue(session_id: str, config: Config) -> dict:
+def checkout_branch(branch_name: str) -> str:
+    """Switch the current checkout (usually a fresh worktree) to an existing issue branch."""
+    subprocess.run(
+        ["git", "checkout", branch_name],
+        capture_output=True, text=True, timeout=30, check=True,
+    )
+    return branch_name
+
+
+def resume_issue(
+    session_id: str, config: Config, cwd: Path | None = None,
+    model: str | None = None, max_turns: int | None = None, timeout_seconds: float | None = None,
+) -> dict:
+    """Continue a pinned session; cwd must be the directory it ran in (its worktree, if kept)."""
+    timeout = timeout_seconds or config.execution_timeout_minutes * 60 or config.execution_max_turns * 120
     try:
         result = subprocess.run(
             [
                 "claude", "--plugin-dir", config.plugin_path,
                 "--resume", session_id,
-                "--model", config.execution_model,
+                "-p", _RESUME_PROMPT,
+                "--model", model or config.execution_model,
+                "--allowedTools", _ALLOWED_TOOLS,
+                "--max-turns", str(max_turns or config.execution_max_turns),
+                "--dangerously-skip-permissions",
                 "--output-format", "json",
             ],
-            capture_output=True, text=True,
-            timeout=config.execution_max_turns * 120,
+            capture_output=True, text=True, cwd=cwd, timeout=timeout,
         )
     except subprocess.TimeoutExpired:
-        return {"is_error": True, "error": "resume timed out"}
+        # Same session: a timed-out resume can be resumed again
+        return {
+            "is_error": True, "timed_out": True, "session_id": session_id,
+            "error": f"Timed out after {timeout / 60:.0f} min",
+        }
     try:
         return json.loads(result.stdout)
     except (json.JSONDecodeError, TypeError):
@@ -239,3 +346,36 @@ This issue was reviewed for automated processing but needs more detail before wo
 
 *Once the above information is added, this issue will be re-evaluated on the next dispatcher run.*
 *Posted by [feature-flow dispatcher](https://github.com/uta2000/feature-flow)*"""
+
+
+def parse_resume_result(
+    issue_number: int, branch: str, raw: dict, config: Config,
+    final_tier: str = "full-yolo", max_turns: int | None = None,
+) -> ExecutionResult:
+    is_error = raw.get("is_error", True)
+    num_turns = raw.get("num_turns", 0)
+    session_id = raw.get("session_id")
+    timed_out = raw.get("timed_out", False)
+
+    if is_error and not timed_out:
+        return ExecutionResult(
+            issue_number=issue_number, branch_name=branch,
+            session_id=session_id, num_turns=num_turns, is_error=True,
+            pr_number=None, pr_url=None, error_message="resume failed", outcome="failed",
+            **usage_fields(raw),
+        )
+
+    pr_number, pr_url = _find_pr(branch, config)
+    if timed_out and not pr_number:
+        return ExecutionResult(
+            issue_number=issue_number, branch_name=branch,
+            session_id=session_id, num_turns=num_turns, is_error=True,
+            pr_number=None, pr_url=None, error_message=raw["error"], outcome="timed_out",
+        )
+    outcome = _classify_outcome(pr_number, num_turns, final_tier, config, max_turns)
+    return ExecutionResult(
+        issue_number=issue_number, branch_name=branch,
+        session_id=session_id, num_turns=num_turns, is_error=False,
+        pr_number=pr_number, pr_url=pr_url, error_message=None, outcome=outcome,
+        **usage_fields(raw),
+    )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+from dispatcher import history
+from dispatcher.models import Config, ReviewedIssue
+
+
+@dataclass(frozen=True)
+class Forecast:
+    """Expected duration, turns and cost of each planned issue, and the batch makespan."""
+
+    issues: list[tuple[ReviewedIssue, history.Estimate]]
+    slots: int
+    makespan_seconds: float
+
+    @property
+    def turns(self) -> float:
+        return sum(est.turns for _, est in self.issues)
+
+    @property
+    def cost_usd(self) -> float:
+        return sum(est.cost_usd for _, est in self.issues)
+
+    @property
+    def unpriced(self) -> int:
+        """Issues with no cost figure: estimated from the per-scope prior, or from interactive executions only."""
+        return sum(1 for _, est in self.issues if est.usage_samples == 0)
+
+
+def plan(
+    conn,
+    to_execute: list[ReviewedIssue],
+    config: Config,
+    slots: int,
+    dep_graph: dict[int, list[int]] | None = None,
+) -> Forecast:
+    """Forecast to_execute, in order, on ``slots`` parallel slots.
+
+    Each issue is estimated from past executions with its scope, tier and
+    routed execution model (see history.estimate); with stack_dependents the
+    makespan waits for in-batch prerequisites, as the executor does.
+    """
+    routed = [
+        r if r.model else replace(r, model=config.route(r.triage.scope, r.final_tier)[0])
+        for r in to_execute
+    ]
+    estimates = {r.triage.issue_number: history.estimate(conn, r) for r in routed}
+    return Forecast(
+        issues=[(r, estimates[r.triage.issue_number]) for r in routed],
+        slots=slots,
+        makespan_seconds=history.makespan(routed, estimates, slots, dep_graph, config.stack_dependents),
+    )
+
+
+def summary(forecast: Forecast) -> str:
+    if not forecast.issues:
+        return "Forecast: nothing to execute."
+    cost = f"~${forecast.cost_usd:.2f}"
+    if forecast.unpriced:
+        cost += f" (+{forecast.unpriced} issue(s) without cost history)"
+    return (
+        f"Forecast: {len(forecast.issues)} issue(s) on {forecast.slots} slot(s), "
+        f"~{format_duration(forecast.makespan_seconds)}, ~{forecast.turns:.0f} turns, {cost}"
+    )
+
+
+def report(forecast: Forecast) -> list[str]:
+    """Per-issue lines followed by the summary line."""
+    lines = []
+    for r, est in forecast.issues:
+        cost = f"${est.cost_usd:.2f}" if est.usage_samples else "$?"
+        lines.append(
+            f"  #{r.triage.issue_number}: ~{format_duration(est.seconds)}, ~{est.turns:.0f} turns, {cost}"
+            f" ({r.model}; {est.basis}, n={est.samples})"
+        )
+    lines.append(f"  {summary(forecast)}")
+    return lines
+
+
+def format_duration(seconds: float) -> str:
+    minutes = round(seconds / 60)
+    return f"{minutes // 60}h{minutes % 60:02d}m" if minutes >= 60 else f"{minutes} min"
@@ -24,7 +24,7 @@ def list_issues(label: str, limit: int, repo: str) -> list[dict]:
         "--label", label,
         "--limit", str(limit),
         "--repo", repo,
-        "--json", "number,title,url,labels,createdAt",
+        "--json", "number,title,url,labels,createdAt,updatedAt",
     ])
     return json.loads(out) if out.strip() else []
 
@@ -62,3 +62,11 @@ def add_label(pr_number: int, label: str, repo: str) -> None:
         "--add-label", label,
         "--repo", repo,
     ])
+
+
+def set_pr_base(pr_number: int, base_branch: str, repo: str) -> None:
+    _run_gh([
+        "pr", "edit", str(pr_number),
+        "--base", base_branch,
+        "--repo", repo,
+    ])
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from dispatcher import db
+from dispatcher.models import RESUMABLE_OUTCOMES, ConcurrencyDecision, Config, ExecutionResult
+
+_RATE_LIMIT_RE = re.compile(r"rate.?limit|\b429\b|overloaded", re.IGNORECASE)
+
+
+@dataclass
+class SystemSample:
+    load_per_cpu: float | None
+    mem_available_mb: int | None
+    disk_free_mb: int | None
+
+
+def sample_system(path: Path) -> SystemSample:
+    """Read 1-minute load per CPU, available memory and free disk at path.
+
+    Each reading is None where the platform can't provide it (no load
+    average, no /proc/meminfo); the governor ignores missing readings.
+    """
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        load = None
+
+    mem = None
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    mem = int(line.split()[1]) // 1024
+                    break
+    except OSError:
+        pass
+
+    # The worktree dir may not exist yet; measure the filesystem it will live on
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    try:
+        disk = shutil.disk_usage(path).free // (1024 * 1024)
+    except OSError:
+        disk = None
+    return SystemSample(load_per_cpu=load, mem_available_mb=mem, disk_free_mb=disk)
+
+
+def is_rate_limited(er: ExecutionResult) -> bool:
+    return bool(er.error_message and _RATE_LIMIT_RE.search(er.error_message))
+
+
+class Governor:
+    """Adapts how many issues may run at once, between min_parallel and max_parallel.
+
+    Additive increase, multiplicative decrease: every
+    ``autoscale_interval_seconds`` the limit grows by one while all slots are
+    busy with work waiting and the host has headroom, shrinks by one under
+    load, memory or disk pressure, and halves after a rate-limited execution or two failures in a row.
+    Running executions are never stopped; a lower limit only delays launches.
+    Every change is recorded in the concurrency_decisions table.
+    """
+
+    def __init__(
+        self,
+        conn,
+        run_id: str,
+        config: Config,
+        path: Path,
+        sampler: Callable[[Path], SystemSample] = sample_system,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._conn = conn
+        self._run_id = run_id
+        self._config = config
+        self._path = path
+        self._sampler = sampler
+        self._clock = clock
+        self._floor = max(1, min(config.min_parallel, config.max_parallel))
+        self.limit = self._floor
+        self._rate_limited = False
+        self._consecutive_failures = 0
+        self._next_check = 0.0
+
+    def record_result(self, er: ExecutionResult) -> None:
+        if is_rate_limited(er):
+            self._rate_limited = True
+        if er.outcome in RESUMABLE_OUTCOMES:
+            self._consecutive_failures += 1
+        else:
+            self._consecutive_failures = 0
+
+    def update(self, running: int, queued: int) -> int:
+        """Re-evaluate the limit if the check interval has passed; returns the current limit."""
+        now = self._clock()
+        if now < self._next_check:
+            return self.limit
+        self._next_check = now + self._config.autoscale_interval_seconds
+
+        sample = self._sampler(self._path)
+        pressure = self._pressure(sample)
+        rate_limited = self._rate_limited or self._consecutive_failures >= 2
+        previous = self.limit
+        if rate_limited:
+            new, reason = max(self._floor, previous // 2), "rate limited"
+        elif pressure:
+            new, reason = max(self._floor, previous - 1), "; ".join(pressure)
+        elif queued and running >= previous:
+            new, reason = min(self._config.max_parallel, previous + 1), "all slots busy with work queued"
+        else:
+            new, reason = previous, ""
+        self._rate_limited = False
+        if rate_limited:
+            self._consecutive_failures = 0
+
+        if new != previous:
+            self.limit = new
+            print(f"  Concurrency {previous} -> {new}: {reason}")
+            db.insert_concurrency_decision(self._conn, self._run_id, ConcurrencyDecision(
+                previous_limit=previous,
+                new_limit=new,
+                running=running,
+                queued=queued,
+                load_per_cpu=sample.load_per_cpu,
+                mem_available_mb=sample.mem_available_mb,
+                disk_free_mb=sample.disk_free_mb,
+                rate_limited=rate_limited,
+                reason=reason,
+            ))
+        return self.limit
+
+    def _pressure(self, sample: SystemSample) -> list[str]:
+        cfg = self._config
+        reasons = []
+        if sample.load_per_cpu is not None and sample.load_per_cpu > cfg.autoscale_max_load_per_cpu:
+            reasons.append(f"load {sample.load_per_cpu:.2f}/cpu")
+        if sample.mem_available_mb is not None and sample.mem_available_mb < cfg.autoscale_min_free_memory_mb:
+            reasons.append(f"{sample.mem_available_mb} MB memory available")
+        if sample.disk_free_mb is not None and sample.disk_free_mb < cfg.autoscale_min_free_disk_mb:
+            reasons.append(f"{sample.disk_free_mb} MB disk free")
+        return reasons
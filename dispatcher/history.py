@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass, replace
+
+from dispatcher import db
+from dispatcher.models import Config, ReviewedIssue
+
+# Fallbacks (seconds, turns) per scope until enough history exists
+_PRIOR: dict[str, tuple[float, float]] = {
+    "quick-fix": (900.0, 30.0),
+    "small-enhancement": (1800.0, 60.0),
+    "feature": (3600.0, 120.0),
+    "major-feature": (5400.0, 180.0),
+}
+_DEFAULT_PRIOR = (3600.0, 120.0)
+MIN_SAMPLES = 3
+# Never give a session less wall-clock time than this, however fast its peers were
+_MIN_TIMEOUT_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class Estimate:
+    seconds: float
+    turns: float
+    samples: int
+    basis: str
+    tokens: float = 0.0
+    cost_usd: float = 0.0
+    usage_samples: int = 0  # executions behind turns, tokens and cost (interactive ones report none)
+
+
+def estimate(conn, reviewed: ReviewedIssue) -> Estimate:
+    """Expected wall-clock seconds, turns, tokens and cost for an issue, from past executions.
+
+    Uses the most specific history bucket with at least MIN_SAMPLES finished
+    executions: scope + tier + execution model (when the issue has one), then
+    scope + tier + richness, then scope + tier, then scope. Falls back to a
+    per-scope prior, with no token or cost figure, when no bucket is big enough.
+    Executions that reported no usage count towards duration only; turns come
+    from the prior when no execution in the bucket reported them.
+    """
+    tr = reviewed.triage
+    buckets = (
+        ("scope+tier+model", {"scope": tr.scope, "tier": reviewed.final_tier, "model": reviewed.model}),
+        ("scope+tier+richness", {"scope": tr.scope, "tier": reviewed.final_tier, "richness_score": tr.richness_score}),
+        ("scope+tier", {"scope": tr.scope, "tier": reviewed.final_tier}),
+        ("scope", {"scope": tr.scope}),
+    )
+    for basis, filters in buckets:
+        if "model" in filters and reviewed.model is None:
+            continue
+        row = db.get_execution_stats(conn, **filters)
+        if row["samples"] >= MIN_SAMPLES:
+            turns = row["avg_turns"] if row["avg_turns"] is not None else _PRIOR.get(tr.scope, _DEFAULT_PRIOR)[1]
+            return Estimate(
+                row["avg_seconds"], turns, row["samples"], basis,
+                tokens=row["avg_tokens"] or 0.0, cost_usd=row["avg_cost_usd"] or 0.0,
+                usage_samples=row["usage_samples"] or 0,
+            )
+    seconds, turns = _PRIOR.get(tr.scope, _DEFAULT_PRIOR)
+    return Estimate(seconds, turns, 0, "prior")
+
+
+def estimate_all(conn, run_id: str, to_execute: list[ReviewedIssue]) -> dict[int, Estimate]:
+    """Estimate every issue and store the estimate next to its row for later comparison with actuals."""
+    estimates = {}
+    for r in to_execute:
+        est = estimate(conn, r)
+        db.set_issue_estimate(conn, run_id, r.triage.issue_number, est.seconds, est.turns, est.basis)
+        estimates[r.triage.issue_number] = est
+    return estimates
+
+
+def shortest_first(to_execute: list[ReviewedIssue], estimates: dict[int, Estimate]) -> list[ReviewedIssue]:
+    """Shortest expected job first; minimises mean completion time. Ties keep their order."""
+    return sorted(to_execute, key=lambda r: estimates[r.triage.issue_number].seconds)
+
+
+def fit_deadline(
+    ordered: list[ReviewedIssue],
+    estimates: dict[int, Estimate],
+    slots: int,
+    deadline_seconds: float,
+    dep_graph: dict[int, list[int]] | None = None,
+    stack: bool = False,
+) -> tuple[list[ReviewedIssue], list[ReviewedIssue]]:
+    """Split ordered issues into those expected to finish within the deadline and the rest.
+
+    Issues are added in order to the schedule makespan() simulates; one is
+    deferred when the schedule with it would run past the deadline or when
+    one of its prerequisites was deferred. Returns (kept, deferred).
+    """
+    dep_graph = dep_graph or {}
+    kept: list[ReviewedIssue] = []
+    deferred: list[ReviewedIssue] = []
+    deferred_numbers: set[int] = set()
+    for r in ordered:
+        number = r.triage.issue_number
+        if not any(d in deferred_numbers for d in dep_graph.get(number, [])):
+            finish = _schedule([*kept, r], estimates, slots, dep_graph, stack)
+            if number in finish and max(finish.values()) <= deadline_seconds:
+                kept.append(r)
+                continue
+        deferred.append(r)
+        deferred_numbers.add(number)
+    return kept, deferred
+
+
+def makespan(
+    ordered: list[ReviewedIssue],
+    estimates: dict[int, Estimate],
+    slots: int,
+    dep_graph: dict[int, list[int]] | None = None,
+    stack: bool = False,
+) -> float:
+    """Expected seconds until the last of ordered finishes on ``slots`` parallel slots."""
+    return max(_schedule(ordered, estimates, slots, dep_graph, stack).values(), default=0.0)
+
+
+def _schedule(
+    ordered: list[ReviewedIssue],
+    estimates: dict[int, Estimate],
+    slots: int,
+    dep_graph: dict[int, list[int]] | None,
+    stack: bool,
+) -> dict[int, float]:
+    """Expected finish second of each issue of ordered on ``slots`` parallel slots.
+
+    Simulates list scheduling in the given order, as the executor launches:
+    each free slot takes the next issue. Only with ``stack`` do issues wait
+    for their in-batch prerequisites, and a free slot then goes to the first
+    issue whose prerequisites have finished. Issues in a dependency cycle
+    never start and are left out.
+    """
+    numbers = {r.triage.issue_number for r in ordered}
+    deps = {n: [d for d in (dep_graph or {}).get(n, []) if d in numbers] for n in numbers} if stack else {}
+    pending = list(ordered)
+    free_at = [0.0] * max(1, slots)
+    finish: dict[int, float] = {}
+    while pending:
+        now = heapq.heappop(free_at)
+        r = next(
+            (r for r in pending if all(finish.get(d, math.inf) <= now for d in deps.get(r.triage.issue_number, []))),
+            None,
+        )
+        if r is None:
+            # Idle until the next running issue finishes; nothing running means a dependency cycle
+            later = [f for f in finish.values() if f > now]
+            if not later:
+                break
+            heapq.heappush(free_at, min(later))
+            continue
+        pending.remove(r)
+        finish[r.triage.issue_number] = now + estimates[r.triage.issue_number].seconds
+        heapq.heappush(free_at, finish[r.triage.issue_number])
+    return finish
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Linear-interpolated q-quantile (0 <= q <= 1) of a non-empty list."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def budget(conn, reviewed: ReviewedIssue, config: Config) -> ReviewedIssue:
+    """Return reviewed with its execution model and turn and wall-clock budgets filled in.
+
+    The model and the turn cap come from the first ``execution_routes`` entry
+    matching the issue's scope and tier (``execution_model`` and
+    ``execution_max_turns`` otherwise). With ``adaptive_budgets``, both
+    budgets come from the ``budget_percentile`` of successful executions with
+    the same scope and tier (or scope only), plus ``budget_margin``. Turns
+    stay within [budget_min_turns, turn cap]. ``execution_timeout_minutes``,
+    when set, caps the timeout. Without enough history, or without adaptive
+    budgets, the configured limits apply. Budgets already set are kept.
+    """
+    model, cap = config.route(reviewed.triage.scope, reviewed.final_tier)
+    if reviewed.model is None:
+        reviewed = replace(reviewed, model=model)
+    if reviewed.max_turns is not None:
+        return reviewed
+    max_turns = cap
+    timeout = config.execution_timeout_minutes * 60.0 or None
+    if config.adaptive_budgets:
+        tr = reviewed.triage
+        rows = db.get_successful_executions(conn, scope=tr.scope, tier=reviewed.final_tier)
+        if len(rows) < MIN_SAMPLES:
+            rows = db.get_successful_executions(conn, scope=tr.scope)
+        if len(rows) >= MIN_SAMPLES:
+            scale = 1.0 + config.budget_margin
+            # Interactive sessions report no turns; they only inform the timeout
+            reported = [r["num_turns"] or 0 for r in rows if r["usage_reported"]]
+            if len(reported) >= MIN_SAMPLES:
+                turns = math.ceil(percentile(reported, config.budget_percentile) * scale)
+                max_turns = min(cap, max(config.budget_min_turns, turns))
+            predicted = max(_MIN_TIMEOUT_SECONDS, percentile([r["seconds"] for r in rows], config.budget_percentile) * scale)
+            timeout = min(timeout, predicted) if timeout else predicted
+    return replace(reviewed, max_turns=max_turns, timeout_seconds=timeout)
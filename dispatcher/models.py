@@ -2,6 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+# Outcomes that did not produce a PR and can be picked up again with --resume
+RESUMABLE_OUTCOMES = ("failed", "leash_hit", "timed_out", "stalled", "interrupted")
+
+# Config fields never written to the DB, temp files or worker messages, and the env var each is read from instead
+SECRET_FIELDS = {"webhook_secret": "DISPATCHER_WEBHOOK_SECRET"}
+
 
 @dataclass
 class Config:
@@ -9,9 +15,23 @@ class Config:
     repo: str = ""
     base_branch: str = "main"
     triage_model: str = "claude-sonnet-4-6"
+    triage_cascade_model: str = ""
+    triage_cascade_threshold: float = 0.85
     execution_model: str = "claude-opus-4-6"
     triage_max_turns: int = 1
+    triage_max_retries: int = 2
+    triage_retry_backoff_seconds: float = 2.0
     execution_max_turns: int = 200
+    # [{scope, tier, model, max_turns}]; the first entry matching an issue's scope and tier wins
+    execution_routes: list[dict] = field(default_factory=list)
+    execution_timeout_minutes: int = 0
+    run_max_turns: int = 0
+    run_max_tokens: int = 0
+    run_max_cost_usd: float = 0.0
+    adaptive_budgets: bool = False
+    budget_percentile: float = 0.9
+    budget_margin: float = 0.5
+    budget_min_turns: int = 20
     max_resume_attempts: int = 2
     db_path: str = ".dispatcher/dispatcher.db"
     branch_prefix_fix: str = "fix"
@@ -21,12 +41,45 @@ class Config:
     rate_limit_pause_seconds: int = 300
     rate_limit_batch_pause_seconds: int = 900
     max_parallel: int = 4
+    execution_order: str = "confidence"
+    run_deadline_minutes: int = 0
+    stack_dependents: bool = False
+    autoscale: bool = False
+    min_parallel: int = 1
+    autoscale_interval_seconds: int = 30
+    autoscale_max_load_per_cpu: float = 1.0
+    autoscale_min_free_memory_mb: int = 2048
+    autoscale_min_free_disk_mb: int = 5120
+    job_lease_seconds: int = 120
+    retain_worktrees: bool = True
+    worktree_retention_days: int = 7
+    worktree_retention_max_mb: int = 10240
+    stall_minutes: int = 0
+    stall_grace_minutes: int = 5
+    persistent_workers: bool = False
+    tmux_control_mode: bool = False
+    execution_backend: str = "tmux"
+    stream: bool = False
+    stream_confidence_threshold: float = 0.85
+    triage_concurrency: int = 1
+    prefetch_concurrency: int = 2
+    serve_poll_seconds: int = 60
+    webhook_host: str = "127.0.0.1"
+    webhook_port: int = 0
+    webhook_secret: str = ""
     issues: list[int] = field(default_factory=list)
     auto: bool = False
     dry_run: bool = False
     resume: str = ""
     verbose: bool = False
 
+    def route(self, scope: str, tier: str) -> tuple[str, int]:
+        """Execution model and turn cap for an issue with this scope and tier."""
+        for entry in self.execution_routes:
+            if entry.get("scope", scope) == scope and entry.get("tier", tier) == tier:
+                return entry.get("model") or self.execution_model, entry.get("max_turns") or self.execution_max_turns
+        return self.execution_model, self.execution_max_turns
+
 
 @dataclass(frozen=True)
 class TriageResult:
@@ -43,12 +96,47 @@ class TriageResult:
     reasoning: str
 
 
+@dataclass(frozen=True)
+class TriageAttempt:
+    stage: str
+    model: str
+    latency_seconds: float
+    cost_usd: float
+    confidence: float | None
+    accepted: bool
+    error_message: str | None = None
+    retry: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+
+
+@dataclass
+class ConcurrencyDecision:
+    previous_limit: int
+    new_limit: int
+    running: int
+    queued: int
+    load_per_cpu: float | None
+    mem_available_mb: int | None
+    disk_free_mb: int | None
+    rate_limited: bool
+    reason: str
+
+
 @dataclass
 class ReviewedIssue:
     triage: TriageResult
     final_tier: str
     skipped: bool
     edited_comment: str | None
+    max_turns: int | None = None  # per-issue budget; None means config.execution_max_turns
+    timeout_seconds: float | None = None  # wall-clock limit; None means no limit
+    resume_session_id: str | None = None  # continue this claude session instead of starting fresh
+    resume_branch: str | None = None  # existing branch to check out instead of creating one
+    base_branch: str | None = None  # branch to fork from and open the PR against; None means config.base_branch
+    model: str | None = None  # execution model from config.route(); None means config.execution_model
 
 
 @dataclass(frozen=True)
@@ -62,3 +150,13 @@ class ExecutionResult:
     pr_url: str | None
     error_message: str | None
     outcome: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    cost_usd: float = 0.0
+    usage_reported: bool = True  # interactive and killed sessions print no usage; their zeros mean unknown
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens + self.cache_read_tokens + self.cache_creation_tokens
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
 import json
+import select
+import signal
+import socket
 import sys
+import tempfile
 import time
 import uuid
 
-from dataclasses import asdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, replace
+from datetime import datetime
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
-from dispatcher import db, github, tmux, worktree
+from dispatcher import budget, db, forecast, github, governor, history, tmux, watchdog, webhook, worktree
+from dispatcher import simulate as sim
 from dispatcher import dependencies as dep_module
 from dispatcher.execute import (
+    branch_name_for,
     build_interactive_prompt,
+    parse_resume_result,
     create_branch,
     execute_issue,
     generate_parked_comment,
@@ -21,7 +30,7 @@ from dispatcher.execute import (
     unstash,
 )
 from dispatcher.github import GithubError
-from dispatcher.models import Config, ExecutionResult, ReviewedIssue, TriageResult
+from dispatcher.models import RESUMABLE_OUTCOMES, SECRET_FIELDS, Config, ExecutionResult, ReviewedIssue, TriageAttempt, TriageResult
 from dispatcher.triage import TriageError, triage_issue
 
 
@@ -53,16 +62,27 @@ def run(config: Config) -> int:
     conn = db.init_db(config.db_path)
     run_id = str(uuid.uuid4())
 
-    selected_numbers = _select_issues(conn, config)
-    if selected_numbers is None:
-        return 0
-    if not selected_numbers:
-        print("No issues selected.")
-        return 0
+    prefetch = None
+    if not config.auto and not config.issues and config.prefetch_concurrency > 0:
+        prefetch = _TriagePrefetcher(config)
+    try:
+        selected_numbers = _select_issues(conn, config, prefetch)
+        if selected_numbers is None:
+            return 0
+        if not selected_numbers:
+            print("No issues selected.")
+            return 0
 
-    db.insert_run(conn, run_id, selected_numbers, "{}")
+        db.insert_run(conn, run_id, selected_numbers, _config_json(config))
+        print(f"Run {run_id} (resume with --resume {run_id})")
 
-    triage_results, issues_raw = _run_triage(conn, run_id, selected_numbers, config)
+        if config.stream and config.auto and not config.dry_run and _can_run_parallel(config):
+            return _run_streaming(conn, run_id, selected_numbers, start_time, config)
+
+        triage_results, issues_raw = _run_triage(conn, run_id, selected_numbers, config, prefetch)
+    finally:
+        if prefetch is not None:
+            prefetch.close()
     if not triage_results:
         db.update_run_status(conn, run_id, "failed")
         return 1
@@ -108,27 +128,23 @@ def _review_and_execute(
     selected_numbers = [tr.issue_number for tr in triage_results]
     dep_graph, unmet = _check_dependencies(issues_raw, selected_numbers)
 
-    reviewed = _run_review(triage_results, dep_graph, unmet, config)
+    db.update_run_stage(conn, run_id, "review")
+    reviewed = _run_review(triage_results, dep_graph, unmet, config, _review_forecaster(conn, dep_graph, config))
     if reviewed is None:
         db.update_run_status(conn, run_id, "cancelled")
         return 0
 
     to_execute = [r for r in reviewed if not r.skipped and r.final_tier != "parked"]
     parked = [r for r in reviewed if r.final_tier == "parked" and not r.skipped]
+    estimates = _apply_execution_order(conn, run_id, to_execute, config)
+    if estimates:
+        to_execute = history.shortest_first(to_execute, estimates)
 
-    # Auto mode: reorder to_execute into dependency waves
-    if config.auto and dep_graph and to_execute:
-        try:
-            nums = [r.triage.issue_number for r in to_execute]
-            waves = dep_module.dep_waves(dep_graph, nums)
-            lookup = {r.triage.issue_number: r for r in to_execute}
-            print("\n  Dependency waves detected:")
-            for i, wave in enumerate(waves, 1):
-                print(f"    Wave {i}: {', '.join(f'#{n}' for n in wave)}")
-            print("  Executing waves sequentially...\n")
-            to_execute = [lookup[n] for wave in waves for n in wave if n in lookup]
-        except dep_module.CycleError:
-            pass  # already warned in _check_dependencies; proceed with original order
+    # Auto mode (and stacking): reorder to_execute into dependency waves
+    if (config.auto or config.stack_dependents) and dep_graph and to_execute:
+        to_execute = _order_by_waves(to_execute, dep_graph)
+    if estimates and config.execution_order == "deadline":
+        to_execute = _fit_deadline(to_execute, estimates, dep_graph, config)
 
     if not to_execute and not config.dry_run:
         _post_parked_comments(parked, config)
@@ -136,20 +152,99 @@ def _review_and_execute(
         return 3
 
     if config.dry_run:
+        _print_forecast(conn, to_execute, dep_graph, config)
         print("\nDry run — skipping execution.")
         db.update_run_status(conn, run_id, "completed")
         return 0
 
-    results, total_turns = _run_execution(conn, run_id, to_execute, config)
+    db.update_run_stage(conn, run_id, "execution")
+    results, total_turns = _run_execution(conn, run_id, to_execute, config, _make_stack(to_execute, dep_graph, config))
     _post_parked_comments(parked, config)
-    _print_summary(results, parked, to_execute, total_turns, start_time, config)
+    _print_summary(
+        results, parked, _turn_budget(conn, run_id, to_execute, config), total_turns, start_time, config,
+        _triage_cost(conn, run_id),
+    )
 
-    failed_count = sum(1 for er in results if er.outcome in ("failed", "leash_hit"))
+    failed_count = sum(1 for er in results if er.outcome in RESUMABLE_OUTCOMES)
     db.update_run_status(conn, run_id, "completed" if failed_count == 0 else "failed")
     return 0 if failed_count == 0 else 1
 
 
-def _select_issues(conn, config: Config) -> list[int] | None:
+def _forecast_slots(config: Config, issue_count: int) -> int:
+    """Parallel slots _run_execution would use for issue_count issues."""
+    return config.max_parallel if _can_run_parallel(config) and issue_count > 1 else 1
+
+
+def _print_forecast(
+    conn, to_execute: list[ReviewedIssue], dep_graph: dict[int, list[int]], config: Config,
+) -> None:
+    plan = forecast.plan(conn, to_execute, config, _forecast_slots(config, len(to_execute)), dep_graph)
+    print("\n  Expected per issue, from past executions with the same scope, tier and model:")
+    for line in forecast.report(plan):
+        print(line)
+
+
+def _review_forecaster(
+    conn, dep_graph: dict[int, list[int]], config: Config,
+) -> Callable[[list[ReviewedIssue]], str]:
+    """Forecast summary for the review TUI, recomputed as tiers are cycled and issues skipped."""
+    def describe(reviewed: list[ReviewedIssue]) -> str:
+        planned = [r for r in reviewed if not r.skipped and r.final_tier != "parked"]
+        plan = forecast.plan(conn, planned, config, _forecast_slots(config, len(planned)), dep_graph)
+        return forecast.summary(plan)
+    return describe
+
+
+def _order_by_waves(
+    to_execute: list[ReviewedIssue], dep_graph: dict[int, list[int]],
+) -> list[ReviewedIssue]:
+    try:
+        nums = [r.triage.issue_number for r in to_execute]
+        waves = dep_module.dep_waves(dep_graph, nums)
+    except dep_module.CycleError:
+        return to_execute  # already warned in _check_dependencies; proceed with original order
+    print("\n  Dependency waves detected:")
+    for i, wave in enumerate(waves, 1):
+        print(f"    Wave {i}: {', '.join(f'#{n}' for n in wave)}")
+    print("  Executing waves sequentially...\n")
+    # Keep the incoming (policy) order within each wave
+    return [r for wave in waves for r in to_execute if r.triage.issue_number in set(wave)]
+
+
+def _apply_execution_order(
+    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config,
+) -> dict[int, history.Estimate]:
+    """Estimate issues from history when a history-driven order is selected; {} for confidence order."""
+    if config.execution_order == "confidence" or not to_execute:
+        return {}
+    estimates = history.estimate_all(conn, run_id, to_execute)
+    print("\n  Expected run times:")
+    for r in sorted(to_execute, key=lambda r: estimates[r.triage.issue_number].seconds):
+        est = estimates[r.triage.issue_number]
+        print(f"    #{r.triage.issue_number}: ~{est.seconds / 60:.0f} min, ~{est.turns:.0f} turns ({est.basis}, n={est.samples})")
+    return estimates
+
+
+def _fit_deadline(
+    to_execute: list[ReviewedIssue],
+    estimates: dict[int, history.Estimate],
+    dep_graph: dict[int, list[int]],
+    config: Config,
+) -> list[ReviewedIssue]:
+    # Same slots and schedule as the forecast, so a kept issue is one the forecast expects in time
+    kept, deferred = history.fit_deadline(
+        to_execute, estimates, _forecast_slots(config, len(to_execute)), config.run_deadline_minutes * 60,
+        dep_graph, config.stack_dependents,
+    )
+    if deferred:
+        print(
+            f"  Deferring {len(deferred)} issue(s) expected to miss the {config.run_deadline_minutes} min deadline: "
+            + ", ".join(f"#{r.triage.issue_number}" for r in deferred)
+        )
+    return kept
+
+
+def _select_issues(conn, config: Config, prefetch: _TriagePrefetcher | None = None) -> list[int] | None:
     if config.issues:
         return config.issues
 
@@ -166,34 +261,274 @@ def _select_issues(conn, config: Config) -> list[int] | None:
 
     from dispatcher.tui.selection import SelectionApp
 
-    app = SelectionApp(issues=issues, parked_numbers=parked_numbers, label=config.default_label, unmet_deps={})
+    predictions = None
+    if prefetch is not None:
+        prefetch.submit([i["number"] for i in issues])
+        predictions = prefetch.predictions
+
+    app = SelectionApp(
+        issues=issues, parked_numbers=parked_numbers, label=config.default_label, unmet_deps={},
+        predictions=predictions,
+    )
     selected = app.run()
+    if prefetch is not None:
+        prefetch.retain(selected or [])
     return selected if selected else None
 
 
 def _run_triage(
-    conn, run_id: str, selected_numbers: list[int], config: Config
+    conn, run_id: str, selected_numbers: list[int], config: Config,
+    prefetch: _TriagePrefetcher | None = None,
 ) -> tuple[list[TriageResult], list[dict[str, Any]]]:
     triage_results = []
     issues_raw: list[dict[str, Any]] = []
     for number in selected_numbers:
-        try:
-            issue_data = github.view_issue(number, config.repo)
-        except GithubError as exc:
-            print(f"  Error fetching #{number}: {exc}. Skipping.")
-            continue
+        outcome = prefetch.take(number) if prefetch is not None else None
+        if outcome is None:
+            outcome = _fetch_and_triage(number, config)
+        tr = _record_triage(conn, run_id, number, outcome)
+        if outcome[0] is not None:
+            issues_raw.append(outcome[0])  # collect raw dict (has body + state)
+        if tr is not None:
+            triage_results.append(tr)
+
+    if config.triage_cascade_model:
+        _print_cascade_summary(conn, run_id, config)
+    return triage_results, issues_raw
 
-        issues_raw.append(issue_data)  # collect raw dict (has body + state)
-        try:
-            tr = triage_issue(issue_data, number, f"https://github.com/{config.repo}/issues/{number}", config)
-        except TriageError as exc:
-            print(f"  Triage error for #{number}: {exc}. Skipping.")
-            continue
 
-        triage_results.append(tr)
-        db.insert_issue(conn, run_id, tr)
-        print(f"  #{number}: {tr.issue_title} → {tr.triage_tier} ({tr.confidence:.2f})")
-    return triage_results, issues_raw
+_TriageOutcome = tuple[dict[str, Any] | None, TriageResult | None, list[TriageAttempt], str | None]
+
+
+def _fetch_and_triage(number: int, config: Config) -> _TriageOutcome:
+    """Fetch and triage one issue without touching the DB.
+
+    Safe to run on a worker thread. Returns (issue_data, triage_result,
+    attempts, error); error is a printable message when either step failed.
+    """
+    try:
+        issue_data = github.view_issue(number, config.repo)
+    except GithubError as exc:
+        return None, None, [], f"Error fetching #{number}: {exc}. Skipping."
+
+    attempts: list[TriageAttempt] = []
+    try:
+        tr = triage_issue(
+            issue_data, number, f"https://github.com/{config.repo}/issues/{number}", config,
+            attempts=attempts,
+        )
+    except TriageError as exc:
+        return issue_data, None, attempts, f"Triage error for #{number}: {exc}. Skipping."
+    return issue_data, tr, attempts, None
+
+
+def _record_triage(conn, run_id: str, number: int, outcome: _TriageOutcome) -> TriageResult | None:
+    issue_data, tr, attempts, error = outcome
+    if issue_data is not None:
+        db.save_issue_snapshot(conn, number, issue_data)
+        db.insert_triage_attempts(conn, run_id, number, attempts)
+    if error is not None:
+        print(f"  {error}")
+        return None
+    db.insert_issue(conn, run_id, tr)
+    print(f"  #{number}: {tr.issue_title} → {tr.triage_tier} ({tr.confidence:.2f})")
+    return tr
+
+
+class _TriagePrefetcher:
+    """Speculatively fetches and triages issues while the selection TUI is open.
+
+    Work runs on a small thread pool and never touches the DB; _run_triage
+    records the outcome only for issues the user actually selects.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self._config = config
+        self._pool = ThreadPoolExecutor(max_workers=config.prefetch_concurrency)
+        self._futures: dict[int, Future] = {}
+
+    def submit(self, numbers: list[int]) -> None:
+        for number in numbers:
+            if number not in self._futures:
+                self._futures[number] = self._pool.submit(_fetch_and_triage, number, self._config)
+
+    def predictions(self) -> dict[int, TriageResult]:
+        """Triage results that have finished so far, keyed by issue number."""
+        ready: dict[int, TriageResult] = {}
+        for number, future in list(self._futures.items()):
+            if future.done() and not future.cancelled() and future.exception() is None:
+                tr = future.result()[1]
+                if tr is not None:
+                    ready[number] = tr
+        return ready
+
+    def retain(self, numbers: list[int]) -> None:
+        """Drop queued work for issues that were not selected.
+
+        Triage already in flight for a dropped issue finishes in the
+        background and is discarded.
+        """
+        keep = set(numbers)
+        for number in [n for n in self._futures if n not in keep]:
+            self._futures.pop(number).cancel()
+
+    def take(self, number: int) -> _TriageOutcome | None:
+        """Return the prefetched outcome for an issue, waiting if it is in flight."""
+        future = self._futures.pop(number, None)
+        if future is None or future.cancelled():
+            return None
+        return future.result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _print_cascade_summary(conn, run_id: str, config: Config) -> None:
+    escalated, cascaded = db.get_escalation_rate(conn, run_id)
+    if cascaded:
+        print(
+            f"  Triage cascade: {escalated}/{cascaded} escalated from "
+            f"{config.triage_cascade_model} to {config.triage_model} ({escalated / cascaded:.0%})."
+        )
+
+
+def _run_streaming(
+    conn, run_id: str, selected_numbers: list[int], start_time: float, config: Config,
+) -> int:
+    """Auto-mode pipeline that overlaps triage with execution.
+
+    Issues are triaged on a thread pool; each confident full-yolo result is
+    handed to the pane executor as soon as it lands, unless one of its
+    in-batch prerequisites has not been released yet. Everything else goes
+    through the usual wave ordering once triage has finished.
+    """
+    batch = set(selected_numbers)
+    dep_graph: dict[int, list[int]] = {}
+    triage_results: list[TriageResult] = []
+    issues_raw: list[dict[str, Any]] = []
+    candidates: list[TriageResult] = []
+    released: dict[int, ReviewedIssue] = {}
+    remaining: list[ReviewedIssue] = []
+    parked: list[ReviewedIssue] = []
+
+    executor = _make_executor(conn, run_id, config)
+    pool = ThreadPoolExecutor(max_workers=max(1, config.triage_concurrency))
+    shutdown = _ShutdownRequest()
+    shutdown.install()
+    try:
+        pending = {pool.submit(_fetch_and_triage, n, config): n for n in selected_numbers}
+        while pending and not shutdown.requested:
+            done, _ = wait(pending, timeout=5, return_when=FIRST_COMPLETED)
+            for future in done:
+                number = pending.pop(future)
+                outcome = future.result()
+                tr = _record_triage(conn, run_id, number, outcome)
+                if outcome[0] is not None:
+                    issues_raw.append(outcome[0])
+                    dep_graph[number] = dep_module.extract_deps(outcome[0].get("body"))
+                if tr is None:
+                    continue
+                triage_results.append(tr)
+                if tr.triage_tier == "full-yolo" and tr.confidence >= config.stream_confidence_threshold:
+                    candidates.append(tr)
+            if shutdown.requested:
+                break
+            for tr in _release_ready(candidates, dep_graph, batch, released):
+                reviewed = ReviewedIssue(triage=tr, final_tier=tr.triage_tier, skipped=False, edited_comment=None)
+                released[tr.issue_number] = reviewed
+                print(f"  Streaming #{tr.issue_number} to execution.")
+                executor.submit(reviewed)
+            executor.poll()
+            executor.fill_slots()
+        if shutdown.requested:
+            # First Ctrl-C: stop triaging and launching, let running sessions finish.
+            # A second one raises KeyboardInterrupt and abandons them below.
+            pool.shutdown(wait=False, cancel_futures=True)
+            _drain(conn, run_id, executor)
+            print(f"  Stopped with {len(pending)} issue(s) not triaged. Continue with --resume {run_id}.")
+            db.update_run_status(conn, run_id, "failed")
+            return 1
+        shutdown.restore()
+        pool.shutdown()
+
+        if config.triage_cascade_model:
+            _print_cascade_summary(conn, run_id, config)
+        if not triage_results:
+            db.update_run_status(conn, run_id, "failed")
+            return 1
+
+        triage_results.sort(key=lambda t: t.confidence, reverse=True)
+        graph, unmet = _check_dependencies(issues_raw, [tr.issue_number for tr in triage_results])
+        reviewed_all = _run_review(triage_results, graph, unmet, config)
+        remaining = [
+            r for r in reviewed_all
+            if not r.skipped and r.final_tier != "parked" and r.triage.issue_number not in released
+        ]
+        parked = [r for r in reviewed_all if r.final_tier == "parked" and not r.skipped]
+        estimates = _apply_execution_order(conn, run_id, remaining, config)
+        if estimates:
+            remaining = history.shortest_first(remaining, estimates)
+        if graph and remaining:
+            remaining = _order_by_waves(remaining, graph)
+        if estimates and config.execution_order == "deadline":
+            remaining = _fit_deadline(remaining, estimates, graph, config)
+
+        db.update_run_stage(conn, run_id, "execution")
+        for r in remaining:
+            executor.submit(r)
+        results = _drive_executor(conn, run_id, executor)
+    except KeyboardInterrupt:
+        print("\n  Interrupted. Cleaning up...")
+        pool.shutdown(wait=False, cancel_futures=True)
+        if executor.abandon():
+            print(f"  Worktrees of running issues are kept. Continue with --resume {run_id}.")
+        db.update_run_status(conn, run_id, "failed")
+        return 1
+    finally:
+        shutdown.restore()
+        executor.close()
+
+    to_execute = list(released.values()) + remaining
+    _post_parked_comments(parked, config)
+    if not to_execute:
+        db.update_run_status(conn, run_id, "completed")
+        return 3
+
+    total_turns = sum(r.num_turns for r in results)
+    _print_summary(
+        results, parked, _turn_budget(conn, run_id, to_execute, config), total_turns, start_time, config,
+        _triage_cost(conn, run_id),
+    )
+    failed_count = sum(1 for er in results if er.outcome in RESUMABLE_OUTCOMES)
+    db.update_run_status(conn, run_id, "completed" if failed_count == 0 else "failed")
+    return 0 if failed_count == 0 else 1
+
+
+def _release_ready(
+    candidates: list[TriageResult],
+    dep_graph: dict[int, list[int]],
+    batch: set[int],
+    released: dict[int, ReviewedIssue],
+) -> list[TriageResult]:
+    """Pop candidates whose in-batch prerequisites have all been released.
+
+    Prerequisites that are still in triage, or that will never stream
+    (parked, low confidence, failed), hold their dependents back until the
+    post-triage wave ordering.
+    """
+    ready: list[TriageResult] = []
+    cleared = set(released)
+    progress = True
+    while progress:
+        progress = False
+        for tr in list(candidates):
+            prereqs = [d for d in dep_graph.get(tr.issue_number, []) if d in batch]
+            if all(d in cleared for d in prereqs):
+                candidates.remove(tr)
+                ready.append(tr)
+                cleared.add(tr.issue_number)
+                progress = True
+    return ready
 
 
 def _run_review(
@@ -201,6 +536,7 @@ def _run_review(
     dep_graph: dict[int, list[int]],
     unmet: dict[int, list[int]],
     config: Config,
+    forecaster: Callable[[list[ReviewedIssue]], str] | None = None,
 ) -> list[ReviewedIssue] | None:
     if config.auto:
         return [
@@ -210,34 +546,105 @@ def _run_review(
 
     from dispatcher.tui.review import ReviewApp
 
-    app = ReviewApp(triage_results=triage_results, unmet=unmet)
+    app = ReviewApp(triage_results=triage_results, unmet=unmet, forecast=forecaster)
     reviewed = app.run()
     return reviewed if reviewed else None
 
 
 def _run_execution(
-    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config
+    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config, stack: _Stack | None = None,
 ) -> tuple[list[ExecutionResult], int]:
-    if tmux.is_tmux_available() and len(to_execute) > 1:
-        return _run_parallel_execution(conn, run_id, to_execute, config)
-    return _run_sequential_execution(conn, run_id, to_execute, config)
+    if config.execution_backend == "pull" or (tmux.is_tmux_available() and len(to_execute) > 1):
+        return _run_parallel_execution(conn, run_id, to_execute, config, stack)
+    return _run_sequential_execution(conn, run_id, to_execute, config, stack)
+
+
+class _Stack:
+    """Stacks dependent issues on the PR branch of their in-batch prerequisite.
+
+    A dependent waits until its prerequisite finishes. If the prerequisite
+    opened a PR, the dependent branches from its branch and opens its own PR
+    against it; otherwise the dependent is not run and is recorded as failed.
+    """
+
+    def __init__(self, parents: dict[int, int]) -> None:
+        self._parents = parents
+        self._finished: dict[int, ExecutionResult] = {}
+
+    def record(self, er: ExecutionResult) -> None:
+        self._finished[er.issue_number] = er
+
+    def waiting(self, issue_number: int) -> bool:
+        parent = self._parents.get(issue_number)
+        return parent is not None and parent not in self._finished
+
+    def blocker(self, issue_number: int) -> str | None:
+        """Why issue_number can't run, once its prerequisite finished without a PR."""
+        parent = self._parents.get(issue_number)
+        er = self._finished.get(parent) if parent is not None else None
+        if er is None or er.pr_number:
+            return None
+        return f"Not started: prerequisite #{parent} did not open a PR ({er.outcome})"
+
+    def stacked(self, reviewed: ReviewedIssue) -> ReviewedIssue:
+        parent = self._parents.get(reviewed.triage.issue_number)
+        if parent is None:
+            return reviewed
+        return replace(reviewed, base_branch=self._finished[parent].branch_name)
+
+
+def _make_stack(to_execute: list[ReviewedIssue], dep_graph: dict[int, list[int]], config: Config) -> _Stack | None:
+    if not config.stack_dependents or not dep_graph:
+        return None
+    try:
+        parents, ambiguous = dep_module.stack_parents(dep_graph, {r.triage.issue_number for r in to_execute})
+    except dep_module.CycleError:
+        return None  # already warned in _check_dependencies
+    for issue_num, prereqs in sorted(ambiguous.items()):
+        print(
+            f"  ⚠  #{issue_num} depends on {', '.join(f'#{d}' for d in prereqs)} in this batch;"
+            f" it can only be stacked on one, so it branches from {config.base_branch}."
+        )
+    if not parents:
+        return None
+    print("  Stacking: " + ", ".join(f"#{n} on #{p}" for n, p in sorted(parents.items())))
+    return _Stack(parents)
 
 
 def _run_sequential_execution(
-    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config
+    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config, stack: _Stack | None = None,
 ) -> tuple[list[ExecutionResult], int]:
     results = []
     total_turns = 0
     tracker = _RateLimitTracker()
-
-    for r in to_execute:
+    run_budget = budget.RunBudget(conn, run_id, config)
+
+    for i, r in enumerate(to_execute):
+        refusal = run_budget.check(r, [])
+        if refusal:
+            _print_budget_hold(refusal, to_execute[i:], run_id)
+            # No job rows on this path: the outcome is what --resume finds
+            held = [h.triage.issue_number for h in to_execute[i:]]
+            results.extend(_interrupt(conn, run_id, held, f"Not started: run budget reached ({refusal})"))
+            break
+        r = _with_budget(conn, run_id, r, config)
         if tracker.should_backoff():
             wait = tracker.backoff_seconds()
             print(f"  Rate limit backoff: waiting {wait}s before next execution.")
             time.sleep(wait)
 
+        blocker = stack.blocker(r.triage.issue_number) if stack else None
+        if blocker:
+            er = _not_started(conn, run_id, r.triage.issue_number, blocker)
+            stack.record(er)
+            results.append(er)
+            continue
+        if stack:
+            r = stack.stacked(r)
         er = _execute_single_issue(conn, run_id, r, config)
-        if er.outcome in ("failed", "leash_hit"):
+        if stack:
+            stack.record(er)
+        if er.outcome in RESUMABLE_OUTCOMES:
             tracker.record_failure()
         else:
             tracker.record_success()
@@ -249,70 +656,844 @@ def _run_sequential_execution(
 
 
 def _run_parallel_execution(
-    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config,
+    conn, run_id: str, to_execute: list[ReviewedIssue], config: Config, stack: _Stack | None = None,
 ) -> tuple[list[ExecutionResult], int]:
-    repo_root = Path.cwd()
-    session_name = f"dispatcher-{run_id[:8]}"
-    num_panes = min(len(to_execute), config.max_parallel)
-    worktree_paths: list[Path] = []
-
+    executor = _make_executor(conn, run_id, config)
+    executor.stack = stack
     try:
-        # Create worktrees for all issues
         for r in to_execute:
-            wt_path = worktree.create_worktree(
-                r.triage.issue_number, config.base_branch, repo_root,
+            executor.submit(r)
+        results = _drive_executor(conn, run_id, executor)
+    finally:
+        executor.close()
+
+    total_turns = sum(r.num_turns for r in results)
+    return results, total_turns
+
+
+def _drive_executor(conn, run_id: str, executor: _PaneExecutor | _PullExecutor) -> list[ExecutionResult]:
+    """Run the executor until it is idle, with two-stage Ctrl-C.
+
+    The first Ctrl-C (or SIGTERM) stops launching issues: queued ones are
+    recorded as ``interrupted`` and running ones are waited for. A second one
+    stops the running sessions too, keeping their worktrees, branches and
+    session IDs so ``--resume`` can continue them.
+    """
+    shutdown = _ShutdownRequest()
+    shutdown.install()
+    try:
+        executor.fill_slots()
+        while executor.busy and not shutdown.requested:
+            executor.wait(5)
+            executor.poll()
+            executor.fill_slots()
+        if shutdown.requested:
+            _drain(conn, run_id, executor)
+    except KeyboardInterrupt:
+        stopped = executor.abandon()
+        if stopped:
+            print(
+                f"\n  Stopped {len(stopped)} running issue(s); their worktrees are kept. "
+                f"Continue with --resume {run_id}."
             )
-            worktree_paths.append(wt_path)
+    finally:
+        shutdown.restore()
+    return executor.results
+
+
+def _drain(conn, run_id: str, executor: _PaneExecutor | _PullExecutor) -> None:
+    dropped = [r.triage.issue_number for r in executor.drop_queued()]
+    if dropped:
+        executor.results.extend(_interrupt(conn, run_id, dropped, "Not started: run interrupted"))
+        print(f"  Not starting {len(dropped)} queued issue(s); they are resumable.")
+    waiting: set[int] = set()
+    while executor.busy:
+        if executor.issue_numbers != waiting:
+            waiting = executor.issue_numbers
+            print(f"  Waiting for {len(waiting)} running issue(s): {', '.join(f'#{n}' for n in sorted(waiting))}")
+        executor.wait(5)
+        executor.poll()
+
+
+def _interrupt(conn, run_id: str, issue_numbers: list[int], message: str) -> list[ExecutionResult]:
+    """Record issues as ``interrupted`` and close their jobs; returns their results."""
+    return _record_unfinished(conn, run_id, issue_numbers, "interrupted", message)
 
-        # Create tmux session
-        tmux.create_session(session_name)
 
-        # Build serialized config
-        config_json = json.dumps({k: v for k, v in asdict(config).items()})
-        db_path = str(Path(config.db_path).resolve())
+def _not_started(conn, run_id: str, issue_number: int, message: str) -> ExecutionResult:
+    """Record a stacked issue whose prerequisite failed as ``failed`` without running it."""
+    er = _record_unfinished(conn, run_id, [issue_number], "failed", message)[0]
+    _print_execution_result(issue_number, er.branch_name, er)
+    return er
+
 
-        # Launch initial batch
-        queue = list(enumerate(to_execute))
-        pane_assignments: dict[int, int] = {}
-        for pane_idx in range(num_panes):
-            qi, reviewed = queue.pop(0)
-            cmd = _build_worker_cmd(worktree_paths[qi], reviewed, config_json, run_id, db_path)
-            actual_idx = tmux.launch_in_pane(session_name, pane_idx, cmd)
-            pane_assignments[actual_idx] = qi
+def _record_unfinished(
+    conn, run_id: str, issue_numbers: list[int], outcome: str, message: str,
+) -> list[ExecutionResult]:
+    db.mark_issues_unfinished(conn, run_id, issue_numbers, outcome, message)
+    results = []
+    for number in issue_numbers:
+        db.finish_job(conn, run_id, number)
+        results.append(_read_result_from_db(conn, run_id, number) or _worker_failed(number, message))
+    return results
 
+
+def _config_json(config: Config) -> str:
+    return json.dumps({k: v for k, v in asdict(config).items() if k not in SECRET_FIELDS})
+
+
+def _can_run_parallel(config: Config) -> bool:
+    return config.execution_backend == "pull" or tmux.is_tmux_available()
+
+
+def _make_executor(conn, run_id: str, config: Config) -> _PaneExecutor | _PullExecutor:
+    if config.execution_backend == "pull":
+        return _PullExecutor(conn, run_id, config)
+    if config.persistent_workers:
+        return _SocketPaneExecutor(conn, run_id, config)
+    return _PaneExecutor(conn, run_id, config)
+
+
+class _PaneExecutor:
+    """Runs reviewed issues in tmux panes, one git worktree per issue.
+
+    Issues can be submitted at any time; fill_slots() launches queued issues
+    into free panes (up to max_parallel, or the governor's limit with
+    autoscale) and poll() collects finished panes.
+    Every transition is mirrored in the jobs table so recover() can pick up
+    after the orchestrator dies.
+    """
+
+    def __init__(self, conn, run_id: str, config: Config) -> None:
+        self._conn = conn
+        self._run_id = run_id
+        self._config = config
+        self.repo_root = Path.cwd()
+        self.session_name = f"dispatcher-{run_id[:8]}"
+        self._config_json = _config_json(config)
+        self._db_path = str(Path(config.db_path).resolve())
+        self._queue: list[ReviewedIssue] = []
+        self._running: dict[int, ReviewedIssue] = {}  # pane index -> issue
+        self._free_panes: list[int] = []
+        self._pane_count = 0
+        self._session_started = False
+        self.results: list[ExecutionResult] = []
+        self.governor = (
+            governor.Governor(conn, run_id, config, worktree.worktrees_dir(self.repo_root))
+            if config.autoscale else None
+        )
+        self.budget = budget.RunBudget(conn, run_id, config)
+        self.held: list[ReviewedIssue] = []
+        self.admission_closed: str | None = None  # reason, once the run budget stopped admitting work
+        self.watchdog = (
+            watchdog.Watchdog(config.stall_minutes * 60, config.stall_grace_minutes * 60)
+            if config.stall_minutes else None
+        )
+        self.stack: _Stack | None = None
+        self._control: tmux.ControlClient | None = None
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._queue or self._running)
+
+    @property
+    def limit(self) -> int:
+        """Current concurrency limit: max_parallel, or the governor's value when autoscaling."""
+        return self.governor.limit if self.governor else self._config.max_parallel
+
+    @property
+    def running_count(self) -> int:
+        return len(self._running)
+
+    @property
+    def queued_count(self) -> int:
+        return len(self._queue)
+
+    @property
+    def tracked(self) -> list[ReviewedIssue]:
+        """Issues queued or running."""
+        return [*self._queue, *self._running.values()]
+
+    @property
+    def issue_numbers(self) -> set[int]:
+        return {r.triage.issue_number for r in self.tracked}
+
+    def submit(self, reviewed: ReviewedIssue) -> None:
+        reviewed = _with_budget(self._conn, self._run_id, reviewed, self._config)
+        db.enqueue_job(self._conn, self._run_id, reviewed.triage.issue_number, json.dumps(asdict(reviewed)))
+        self._queue.append(reviewed)
+
+    def discard(self, issue_number: int) -> bool:
+        """Remove a queued (not yet running) issue. Returns True if it was queued."""
+        before = len(self._queue)
+        self._queue = [r for r in self._queue if r.triage.issue_number != issue_number]
+        if len(self._queue) == before:
+            return False
+        db.delete_job(self._conn, self._run_id, issue_number)
+        return True
+
+    def recover(self) -> tuple[int, int]:
+        """Rebuild state from the jobs table after a restart.
+
+        Jobs whose pane is still alive and whose worker is still heartbeating
+        are re-adopted; jobs that already have an outcome are marked done;
+        everything else (expired lease, dead or missing pane) is requeued.
+        Returns (adopted, requeued).
+        """
+        statuses = {idx: alive for idx, alive, _ in tmux.get_pane_status(self.session_name)}
+        if statuses:
+            self._session_started = True
+            self._pane_count = max(statuses) + 1
+            self._connect()
+        adopted = requeued = 0
+        for job in db.get_unfinished_jobs(self._conn, self._run_id):
+            number = job["issue_number"]
+            reviewed = _reviewed_from_dict(json.loads(job["payload"]))
+            if _read_result_from_db(self._conn, self._run_id, number) is not None:
+                db.finish_job(self._conn, self._run_id, number)
+                continue
+            pane = job["pane_index"]
+            if job["state"] != "queued" and statuses.get(pane) and not db.lease_expired(job):
+                self._running[pane] = reviewed
+                adopted += 1
+                continue
+            if job["state"] != "queued" and statuses.get(pane):
+                print(f"  Warning: worker for #{number} in pane {pane} stopped heartbeating; requeueing.")
+                # The old session would otherwise keep working in the worktree the requeued job reuses
+                tmux.stop_pane(self.session_name, pane)
+                statuses[pane] = False
+            db.requeue_job(self._conn, self._run_id, number)
+            self._queue.append(reviewed)
+            requeued += 1
+        self._free_panes = [
+            idx for idx, alive in sorted(statuses.items()) if not alive and idx not in self._running
+        ]
+        return adopted, requeued
+
+    def drop_queued(self) -> list[ReviewedIssue]:
+        dropped, self._queue = self._queue, []
+        return dropped
+
+    def fill_slots(self) -> None:
+        launched: list[int] = []
+        first_launch = False
+        if self.governor:
+            self.governor.update(len(self._running), len(self._queue))
+        self._skip_blocked()
+        while self._queue and len(self._running) < self.limit:
+            index = self._next_ready()
+            if index is None:
+                break  # everything queued waits on a running prerequisite
+            refusal = self.budget.check(self._queue[index], list(self._running.values()))
+            if refusal:
+                self._hold_queue(refusal)
+                break
+            reviewed = self._queue.pop(index)
+            if self.stack:
+                reviewed = self.stack.stacked(reviewed)
+            wt_path = (
+                reviewed.resume_branch and _retained_worktree(self._conn, reviewed.triage.issue_number)
+            ) or worktree.create_worktree(
+                reviewed.triage.issue_number, reviewed.base_branch or self._config.base_branch, self.repo_root,
+            )
+            if not self._session_started:
+                tmux.create_session(self.session_name)
+                self._session_started = True
+                first_launch = True
+                self._connect()
+            try:
+                pane_idx = self._launch(reviewed, wt_path)
+            except RuntimeError as exc:
+                self._launch_failed(reviewed, str(exc))
+                continue
+            self._running[pane_idx] = reviewed
+            launched.append(pane_idx)
+
+        if not launched:
+            return
         # Wait for workers to create branches and start claude, then send prompts
         time.sleep(5)
-        for pane_idx, qi in pane_assignments.items():
-            reviewed = to_execute[qi]
-            branch_prefix = config.branch_prefix_fix if reviewed.triage.scope in ("quick-fix",) else config.branch_prefix_feat
-            branch_name = f"{branch_prefix}/{reviewed.triage.issue_number}-issue-{reviewed.triage.issue_number}"
-            prompt = build_interactive_prompt(reviewed.triage, branch_name)
-            # Set model to Sonnet before sending the start prompt
-            tmux.send_keys(session_name, pane_idx, "/model sonnet")
-            time.sleep(2)
-            tmux.send_keys(session_name, pane_idx, prompt)
-
-        print(f"\n  Interactive sessions launched in tmux session '{session_name}'.")
-        print(f"  Run `tmux attach -t {session_name}` to interact with each pane.")
-        print(f"  Use Ctrl-B + arrow keys to switch panes. Sessions close when you exit Claude.\n")
-
-        # Poll for completion
-        results = _poll_for_completion(
-            conn, run_id, session_name, to_execute, queue,
-            worktree_paths, pane_assignments, config_json, db_path, config,
-        )
-    except KeyboardInterrupt:
-        print("\n  Interrupted. Cleaning up...")
-        results = []
-    finally:
+        for pane_idx in launched:
+            reviewed = self._running[pane_idx]
+            tr = reviewed.triage
+            if reviewed.resume_session_id:
+                # The worker continues the recorded session headlessly; there is no prompt to send
+                db.mark_job_running(self._conn, self._run_id, tr.issue_number)
+                continue
+            branch = reviewed.resume_branch or branch_name_for(tr.issue_number, tr.scope, self._config)
+            tmux.send_keys(self.session_name, pane_idx, build_interactive_prompt(tr, branch, reviewed.base_branch))
+            db.mark_job_running(self._conn, self._run_id, tr.issue_number)
+        if first_launch:
+            print(f"\n  Interactive sessions launched in tmux session '{self.session_name}'.")
+            print(f"  Run `tmux attach -t {self.session_name}` to interact with each pane.")
+            print("  Use Ctrl-B + arrow keys to switch panes and Ctrl-B n / p to switch windows")
+            print(f"  (up to {tmux.PANES_PER_WINDOW} panes each). Sessions close when you exit Claude.\n")
+
+    def _connect(self) -> None:
+        """Open a tmux control-mode connection for the session (``tmux_control_mode``)."""
+        if not self._config.tmux_control_mode:
+            return
+        self._control = tmux.connect(self.session_name)
+        if self._control is None:
+            print("  Warning: could not open a tmux control-mode connection (needs tmux 3.2+); polling instead.")
+
+    def wait(self, seconds: float) -> None:
+        """Sleep until the next poll; with a control connection, wake as soon as a pane exits."""
+        if self._control is not None and self._control.connected:
+            self._control.wait(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _next_ready(self) -> int | None:
+        """Index of the first queued issue not waiting on a prerequisite."""
+        for index, reviewed in enumerate(self._queue):
+            if not (self.stack and self.stack.waiting(reviewed.triage.issue_number)):
+                return index
+        return None
+
+    def _skip_blocked(self) -> None:
+        """Drop queued issues whose prerequisite finished without a PR (and, in turn, their dependents)."""
+        while self.stack:
+            blocked = [(r, self.stack.blocker(r.triage.issue_number)) for r in self._queue]
+            blocked = [(r, reason) for r, reason in blocked if reason]
+            if not blocked:
+                return
+            for reviewed, reason in blocked:
+                self._queue.remove(reviewed)
+                er = _not_started(self._conn, self._run_id, reviewed.triage.issue_number, reason)
+                self.stack.record(er)
+                self.results.append(er)
+
+    def _hold_queue(self, reason: str) -> None:
+        self.admission_closed = reason
+        held, self._queue = self._queue, []
+        db.hold_jobs(self._conn, self._run_id, [r.triage.issue_number for r in held])
+        self.held.extend(held)
+        _print_budget_hold(reason, held, self._run_id)
+
+    def _launch(self, reviewed: ReviewedIssue, wt_path: Path) -> int:
+        """Start a one-shot worker for reviewed in a free or new pane; returns the pane index."""
+        cmd = _build_worker_cmd(wt_path, reviewed, self._config_json, self._run_id, self._db_path)
+        number = reviewed.triage.issue_number
+        if self._free_panes:
+            pane_idx = self._free_panes.pop(0)
+            db.lease_job(self._conn, self._run_id, number, self.session_name, pane_idx, self._config.job_lease_seconds)
+            tmux.respawn_pane(self.session_name, pane_idx, cmd)
+        else:
+            pane_idx = tmux.launch_in_pane(self.session_name, self._pane_count, cmd)
+            self._pane_count += 1
+            db.lease_job(self._conn, self._run_id, number, self.session_name, pane_idx, self._config.job_lease_seconds)
+        return pane_idx
+
+    def _launch_failed(self, reviewed: ReviewedIssue, message: str) -> None:
+        """Record an issue whose worker never started as resumable ``failed``; the other slots keep going."""
+        number = reviewed.triage.issue_number
+        er = _record_unfinished(self._conn, self._run_id, [number], "failed", f"Worker did not start: {message}")[0]
+        self._settle_worktree(er)
+        if self.stack:
+            self.stack.record(er)
+        self.results.append(er)
+        _print_execution_result(number, er.branch_name, er)
+
+    def poll(self) -> list[ExecutionResult]:
+        if self.watchdog:
+            self._check_stalls()
+        finished: list[ExecutionResult] = []
+        for pane_idx, er in self._collect():
+            reviewed = self._running.pop(pane_idx)
+            if self.watchdog:
+                self.watchdog.forget(reviewed.triage.issue_number)
+            db.finish_job(self._conn, self._run_id, reviewed.triage.issue_number)
+            self._settle_worktree(er)
+            if self.stack:
+                self.stack.record(er)
+            if self.governor:
+                self.governor.record_result(er)
+            finished.append(er)
+            _print_execution_result(reviewed.triage.issue_number, er.branch_name, er)
+        self.results.extend(finished)
+        return finished
+
+    def _check_stalls(self) -> None:
+        """Flag, then reclaim, running panes whose activity signals stopped changing.
+
+        A reclaimed issue gets a resumable ``stalled`` outcome, keeping its
+        recorded branch and session ID, before its pane is killed, so the next _collect() reports it like any other
+        finished pane and the slot goes to the next queued issue.
+        """
+        for pane_idx, reviewed in list(self._running.items()):
+            tr = reviewed.triage
+            if not self.watchdog.due(tr.issue_number):
+                continue
+            fingerprint = watchdog.activity_fingerprint(
+                self.session_name, pane_idx, worktree.worktree_path(tr.issue_number, self.repo_root),
+            )
+            action = self.watchdog.observe(tr.issue_number, fingerprint)
+            idle_minutes = self.watchdog.idle_seconds(tr.issue_number) / 60
+            if action == watchdog.FLAG:
+                db.set_job_stalled(self._conn, self._run_id, tr.issue_number, True)
+                print(
+                    f"  [#{tr.issue_number}] No activity for {idle_minutes:.0f}m in pane {pane_idx}; "
+                    f"reclaiming it in {self._config.stall_grace_minutes}m unless it resumes."
+                )
+            elif action == watchdog.RESUMED:
+                db.set_job_stalled(self._conn, self._run_id, tr.issue_number, False)
+            elif action == watchdog.RECLAIM:
+                # Outcome only: the branch and pinned session ID the worker recorded stay resumable
+                db.mark_issues_unfinished(
+                    self._conn, self._run_id, [tr.issue_number], "stalled",
+                    f"Stalled: no activity for {idle_minutes:.0f} min",
+                )
+                try:
+                    tmux.stop_pane(self.session_name, pane_idx)
+                except Exception as exc:
+                    print(f"  Warning: could not stop stalled pane {pane_idx} for #{tr.issue_number}: {exc}")
+
+    def _collect(self) -> list[tuple[int, ExecutionResult]]:
+        """Return (pane_index, result) for running panes whose worker has exited."""
+        done: list[tuple[int, ExecutionResult]] = []
+        for pane_idx, is_alive, exit_code in tmux.get_pane_status(self.session_name):
+            if is_alive or pane_idx not in self._running:
+                continue
+            self._free_panes.append(pane_idx)
+            number = self._running[pane_idx].triage.issue_number
+            done.append((pane_idx, _result_or_failure(self._conn, self._run_id, number, f"Worker exited with code {exit_code}")))
+        return done
+
+    def _settle_worktree(self, er: ExecutionResult, retain: bool = False) -> None:
+        """Remove a finished issue's worktree, or index it for --resume if its outcome is resumable."""
+        path = worktree.worktree_path(er.issue_number, self.repo_root)
+        if retain or (self._config.retain_worktrees and er.outcome in RESUMABLE_OUTCOMES):
+            db.retain_worktree(self._conn, self._run_id, er.issue_number, str(path), er.branch_name, er.outcome)
+        else:
+            worktree.remove_worktree(path, self.repo_root)
+            db.release_worktree(self._conn, str(path))
+
+    def abandon(self) -> list[ExecutionResult]:
+        """Stop running sessions, keep their worktrees and record them as resumable ``interrupted``."""
+        numbers = [r.triage.issue_number for r in self._running.values()]
+        self._running.clear()
         try:
-            tmux.kill_session(session_name)
+            tmux.kill_session(self.session_name)
         except Exception:
             pass
-        worktree.cleanup_all(repo_root)
+        stopped = _interrupt(self._conn, self._run_id, numbers, "Interrupted: session stopped")
+        for er in stopped:
+            self._settle_worktree(er, retain=True)
+        self.results.extend(stopped)
+        return stopped
 
-    total_turns = sum(r.num_turns for r in results)
-    return results, total_turns
+    def close(self) -> None:
+        try:
+            tmux.kill_session(self.session_name)
+        except Exception:
+            pass
+        _cleanup_worktrees(self._conn, self.repo_root, self._config)
+
+
+class _WorkerLink:
+    """Orchestrator end of a long-lived worker's socket (newline-delimited JSON)."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self._sock = sock
+        self._buffer = b""
+        self.closed = False
+
+    def send(self, msg: dict[str, Any]) -> None:
+        self._sock.sendall(json.dumps(msg).encode() + b"\n")
+
+    def read(self, timeout: float = 0.0) -> list[dict[str, Any]]:
+        """Return complete messages received so far, waiting up to timeout for the first byte."""
+        messages: list[dict[str, Any]] = []
+        while not self.closed and select.select([self._sock], [], [], timeout)[0]:
+            timeout = 0.0
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                self.closed = True
+                break
+            self._buffer += chunk
+        while b"\n" in self._buffer:
+            line, self._buffer = self._buffer.split(b"\n", 1)
+            messages.append(json.loads(line))
+        return messages
+
+    def close(self) -> None:
+        self.closed = True
+        self._sock.close()
+
+
+class _SocketPaneExecutor(_PaneExecutor):
+    """_PaneExecutor with one long-lived worker per pane (``persistent_workers``).
+
+    Each pane runs ``python -m dispatcher.worker --socket`` once; issues are
+    sent to idle workers over a per-run Unix socket instead of launching a
+    fresh interpreter (and DB connection) per issue. A pane whose worker dies
+    is respawned on next use, so one-shot recovery semantics still apply.
+    """
+
+    _ACCEPT_TIMEOUT = 30.0
+
+    def __init__(self, conn, run_id: str, config: Config) -> None:
+        super().__init__(conn, run_id, config)
+        self.socket_path = Path(tempfile.gettempdir()) / f"dispatcher-{run_id[:8]}.sock"
+        self._server: socket.socket | None = None
+        self._workers: dict[int, _WorkerLink] = {}  # pane index -> connected worker
+
+    def _listen(self) -> socket.socket:
+        if self._server is None:
+            self.socket_path.unlink(missing_ok=True)
+            self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._server.bind(str(self.socket_path))
+            self._server.listen()
+        return self._server
+
+    def _accept(self) -> _WorkerLink:
+        server = self._listen()
+        server.settimeout(self._ACCEPT_TIMEOUT)
+        try:
+            sock, _ = server.accept()
+        except socket.timeout as exc:
+            raise RuntimeError(f"Worker did not connect to {self.socket_path} within {self._ACCEPT_TIMEOUT:.0f}s") from exc
+        link = _WorkerLink(sock)
+        hello = link.read(timeout=self._ACCEPT_TIMEOUT)
+        if not hello or hello[0].get("type") != "hello":
+            link.close()
+            raise RuntimeError("Worker connected without a hello")
+        return link
+
+    def _launch(self, reviewed: ReviewedIssue, wt_path: Path) -> int:
+        idle = [p for p, link in self._workers.items() if p not in self._running and not link.closed]
+        if idle:
+            pane_idx = idle[0]
+        else:
+            self._listen()
+            cmd = _build_persistent_worker_cmd(self.socket_path, self._run_id, self._db_path)
+            if self._free_panes:
+                pane_idx = self._free_panes.pop(0)
+                tmux.respawn_pane(self.session_name, pane_idx, cmd)
+            else:
+                pane_idx = tmux.launch_in_pane(self.session_name, self._pane_count, cmd)
+                self._pane_count += 1
+            try:
+                self._workers[pane_idx] = self._accept()
+            except RuntimeError:
+                # A worker that connects late must not be mistaken for the next pane's
+                tmux.stop_pane(self.session_name, pane_idx)
+                raise
+        db.lease_job(
+            self._conn, self._run_id, reviewed.triage.issue_number,
+            self.session_name, pane_idx, self._config.job_lease_seconds,
+        )
+        self._workers[pane_idx].send({
+            "type": "job",
+            "cwd": str(wt_path),
+            "issue": asdict(reviewed),
+            "config": json.loads(self._config_json),
+        })
+        return pane_idx
+
+    def _collect(self) -> list[tuple[int, ExecutionResult]]:
+        done: dict[int, ExecutionResult] = {}
+        for pane_idx, link in self._workers.items():
+            for msg in link.read():
+                if msg.get("type") == "result" and pane_idx in self._running:
+                    done[pane_idx] = ExecutionResult(**msg["result"])
+        for pane_idx, is_alive, exit_code in tmux.get_pane_status(self.session_name):
+            if is_alive:
+                continue
+            link = self._workers.pop(pane_idx, None)
+            if link is not None:
+                link.close()
+            if pane_idx not in self._free_panes:
+                self._free_panes.append(pane_idx)
+            if pane_idx in self._running and pane_idx not in done:
+                number = self._running[pane_idx].triage.issue_number
+                done[pane_idx] = _result_or_failure(self._conn, self._run_id, number, f"Worker exited with code {exit_code}")
+        return list(done.items())
+
+    def close(self) -> None:
+        for link in self._workers.values():
+            try:
+                link.send({"type": "stop"})
+            except OSError:
+                pass
+            link.close()
+        self._workers.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            self.socket_path.unlink(missing_ok=True)
+        super().close()
+
+
+class _PullExecutor:
+    """Schedules issues for pull-mode workers (``python -m dispatcher.worker --pull``).
+
+    Same interface as _PaneExecutor, but the orchestrator only writes jobs and
+    watches the jobs table; workers on any host sharing the DB claim and run
+    them. Jobs whose lease expires without a heartbeat are requeued.
+    """
+
+    def __init__(self, conn, run_id: str, config: Config) -> None:
+        self._conn = conn
+        self._run_id = run_id
+        self._config = config
+        self._tracked: dict[int, ReviewedIssue] = {}
+        self._announced = False
+        self.results: list[ExecutionResult] = []
+        self.budget = budget.RunBudget(conn, run_id, config)
+        self.held: list[ReviewedIssue] = []
+        self.admission_closed: str | None = None
+        self.stack: _Stack | None = None
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tracked)
+
+    def wait(self, seconds: float) -> None:
+        time.sleep(seconds)
+
+    @property
+    def limit(self) -> int:
+        return self._config.max_parallel
+
+    def _count(self, *states: str) -> int:
+        jobs = (db.get_job(self._conn, self._run_id, n) for n in self._tracked)
+        return sum(1 for job in jobs if job is not None and job["state"] in states)
+
+    @property
+    def running_count(self) -> int:
+        return self._count("leased", "running")
+
+    @property
+    def queued_count(self) -> int:
+        return self._count("queued")
+
+    @property
+    def tracked(self) -> list[ReviewedIssue]:
+        return list(self._tracked.values())
+
+    @property
+    def issue_numbers(self) -> set[int]:
+        return set(self._tracked)
+
+    def submit(self, reviewed: ReviewedIssue) -> None:
+        reviewed = _with_budget(self._conn, self._run_id, reviewed, self._config)
+        number = reviewed.triage.issue_number
+        payload = json.dumps(asdict(reviewed))
+        # Jobs that must wait are written held: a worker could claim a queued one before it is parked
+        refusal = self.admission_closed or self._budget_refusal(reviewed)
+        if refusal:
+            db.enqueue_job(self._conn, self._run_id, number, payload, state="held")
+            self.held.append(reviewed)
+            if not self.admission_closed:
+                self.admission_closed = refusal
+                _print_budget_hold(refusal, [reviewed], self._run_id)
+            return
+        # A stacked job waits for its prerequisite; _release_stacked() re-queues it with its base branch
+        waiting = self.stack is not None and self.stack.waiting(number)
+        db.enqueue_job(self._conn, self._run_id, number, payload, state="held" if waiting else "queued")
+        self._tracked[number] = reviewed
+
+    def _budget_refusal(self, reviewed: ReviewedIssue) -> str | None:
+        """Why the run budget refuses reviewed on top of every job already admitted, or None."""
+        if not self.budget.enabled:
+            return None
+        states = {n: db.get_job(self._conn, self._run_id, n) for n in self._tracked}
+        admitted = [r for n, r in self._tracked.items() if states[n] and states[n]["state"] in ("queued", "leased", "running")]
+        return self.budget.check(reviewed, admitted)
+
+    def discard(self, issue_number: int) -> bool:
+        job = db.get_job(self._conn, self._run_id, issue_number)
+        if issue_number not in self._tracked or job is None or job["state"] not in ("queued", "held"):
+            return False
+        db.delete_job(self._conn, self._run_id, issue_number)
+        del self._tracked[issue_number]
+        return True
+
+    def drop_queued(self) -> list[ReviewedIssue]:
+        return [self._tracked[n] for n in list(self._tracked) if self.discard(n)]
+
+    def recover(self) -> tuple[int, int]:
+        adopted = requeued = 0
+        for job in db.get_unfinished_jobs(self._conn, self._run_id):
+            number = job["issue_number"]
+            self._tracked[number] = _reviewed_from_dict(json.loads(job["payload"]))
+            if job["state"] == "queued":
+                requeued += 1
+            elif db.lease_expired(job):
+                db.requeue_job(self._conn, self._run_id, number)
+                requeued += 1
+            else:
+                adopted += 1
+        return adopted, requeued
+
+    def fill_slots(self) -> None:
+        self._release_stacked()
+        self._enforce_budget()
+        if self._tracked and not self._announced:
+            self._announced = True
+            print(
+                f"\n  Jobs queued for pull workers. On each worker host run:\n"
+                f"    python -m dispatcher.worker --pull --db-path {Path(self._config.db_path).resolve()}"
+                f" --run-id {self._run_id}\n"
+            )
+
+    def _release_stacked(self) -> None:
+        """Queue held stacked jobs whose prerequisite finished: on its branch if it opened a PR, else fail them."""
+        progress = self.stack is not None
+        while progress:
+            progress = False
+            for number, reviewed in list(self._tracked.items()):
+                job = db.get_job(self._conn, self._run_id, number)
+                if job is None or job["state"] != "held" or self.stack.waiting(number):
+                    continue
+                blocker = self.stack.blocker(number)
+                if blocker:
+                    del self._tracked[number]
+                    er = _not_started(self._conn, self._run_id, number, blocker)
+                    self.stack.record(er)
+                    self.results.append(er)
+                    progress = True
+                else:
+                    self._tracked[number] = self.stack.stacked(reviewed)
+                    db.release_job(self._conn, self._run_id, number, json.dumps(asdict(self._tracked[number])))
+
+    def _enforce_budget(self) -> None:
+        """Hold queued jobs, in submission order, from the first one the run budget refuses."""
+        if not self.budget.enabled or self.admission_closed:
+            return
+        states = {n: db.get_job(self._conn, self._run_id, n) for n in self._tracked}
+        in_flight = [r for n, r in self._tracked.items() if states[n] and states[n]["state"] in ("leased", "running")]
+        queued = [r for n, r in self._tracked.items() if states[n] and states[n]["state"] == "queued"]
+        for i, r in enumerate(queued):
+            refusal = self.budget.check(r, in_flight)
+            if refusal:
+                # Workers may have claimed some of these since; those run on
+                numbers = set(db.hold_jobs(self._conn, self._run_id, [h.triage.issue_number for h in queued[i:]]))
+                held = [h for h in queued[i:] if h.triage.issue_number in numbers]
+                for h in held:
+                    del self._tracked[h.triage.issue_number]
+                self.held.extend(held)
+                self.admission_closed = refusal
+                _print_budget_hold(refusal, held, self._run_id)
+                return
+            in_flight.append(r)
+
+    def poll(self) -> list[ExecutionResult]:
+        finished: list[ExecutionResult] = []
+        for number in list(self._tracked):
+            job = db.get_job(self._conn, self._run_id, number)
+            if job is None:
+                continue
+            if job["state"] in ("leased", "running") and db.lease_expired(job):
+                print(f"  Worker {job['worker']} lost its lease on #{number}; requeueing.")
+                db.requeue_job(self._conn, self._run_id, number)
+                continue
+            if job["state"] != "done":
+                continue
+            del self._tracked[number]
+            er = _result_or_failure(self._conn, self._run_id, number, "Job finished without a result")
+            if self.stack:
+                self.stack.record(er)
+            finished.append(er)
+            _print_execution_result(number, er.branch_name, er)
+        self.results.extend(finished)
+        return finished
+
+    def abandon(self) -> list[ExecutionResult]:
+        """Stop watching; workers on other hosts keep running and --resume re-adopts their jobs."""
+        if self._tracked:
+            print(f"\n  {len(self._tracked)} job(s) are still running on pull workers; their results will be recorded.")
+        self._tracked.clear()
+        return []
+
+    def close(self) -> None:
+        pass
+
+
+def _cleanup_worktrees(conn, repo_root: Path, config: Config) -> None:
+    """Apply the retention policy, then remove every worktree that isn't retained."""
+    evicted = worktree.evict_retained(
+        conn, repo_root, config.worktree_retention_days, config.worktree_retention_max_mb,
+    )
+    if evicted:
+        print(f"  Evicted {len(evicted)} retained worktree(s) past the retention limits.")
+    keep = {Path(row["path"]) for row in db.get_retained_worktrees(conn)}
+    worktree.cleanup_all(repo_root, keep=keep)
+
+
+def _retained_worktree(conn, issue_number: int) -> Path | None:
+    """The worktree kept from an earlier attempt at issue_number, if it still exists."""
+    row = db.get_retained_worktree(conn, issue_number)
+    if row is None:
+        return None
+    path = Path(row["path"])
+    if not path.exists():
+        db.release_worktree(conn, row["path"])
+        return None
+    return path
+
+
+def _reviewed_from_dict(data: dict[str, Any]) -> ReviewedIssue:
+    return ReviewedIssue(
+        triage=TriageResult(**data["triage"]),
+        final_tier=data["final_tier"],
+        skipped=data.get("skipped", False),
+        edited_comment=data.get("edited_comment"),
+        max_turns=data.get("max_turns"),
+        timeout_seconds=data.get("timeout_seconds"),
+        resume_session_id=data.get("resume_session_id"),
+        resume_branch=data.get("resume_branch"),
+        base_branch=data.get("base_branch"),
+        model=data.get("model"),
+    )
+
+
+def _with_budget(conn, run_id: str, reviewed: ReviewedIssue, config: Config) -> ReviewedIssue:
+    """Attach the issue's turn and wall-clock budget and record it on the issue row."""
+    budgeted = history.budget(conn, reviewed, config)
+    if budgeted is not reviewed:
+        db.set_issue_budget(
+            conn, run_id, reviewed.triage.issue_number, budgeted.max_turns, budgeted.timeout_seconds, budgeted.model,
+        )
+    return budgeted
+
+
+def _print_budget_hold(reason: str, held: list[ReviewedIssue], run_id: str) -> None:
+    if not held:
+        return
+    print(f"\n  Run budget reached ({reason}).")
+    print(
+        f"  Not starting {len(held)} issue(s): {', '.join(f'#{r.triage.issue_number}' for r in held)}."
+        f" Running sessions will finish. Raise the budget and --resume {run_id} to continue.\n"
+    )
+
+
+def _worker_failed(issue_number: int, message: str) -> ExecutionResult:
+    return ExecutionResult(
+        issue_number=issue_number,
+        branch_name="",
+        session_id=None,
+        num_turns=0,
+        is_error=True,
+        pr_number=None,
+        pr_url=None,
+        error_message=message,
+        outcome="failed",
+    )
+
+
+def _worker_env_prefix() -> str:
+    project_root = str(Path(__file__).resolve().parent.parent)
+    return (
+        "unset CLAUDECODE CLAUDE_CODE_SSE_PORT CLAUDE_CODE_ENTRYPOINT CLAUDE_CODE_EXPERIMENTAL_AGENT_TEAMS &&"
+        f" PYTHONPATH={project_root}:$PYTHONPATH exec {sys.executable} -m dispatcher.worker"
+    )
+
+
+def _build_persistent_worker_cmd(socket_path: Path, run_id: str, db_path: str) -> str:
+    return f"{_worker_env_prefix()} --socket {socket_path} --run-id {run_id} --db-path {db_path}"
 
 
 def _build_worker_cmd(
@@ -322,8 +1503,6 @@ def _build_worker_cmd(
     run_id: str,
     db_path: str,
 ) -> str:
-    import sys
-    import tempfile
     issue_fd = tempfile.NamedTemporaryFile(
         mode="w", suffix=".json", prefix=f"issue-{reviewed.triage.issue_number}-", delete=False,
     )
@@ -334,94 +1513,16 @@ def _build_worker_cmd(
     )
     config_fd.write(config_json)
     config_fd.close()
-    python = sys.executable
-    project_root = str(Path(__file__).resolve().parent.parent)
     return (
-        f"cd {wt_path} &&"
-        f" unset CLAUDECODE CLAUDE_CODE_SSE_PORT CLAUDE_CODE_ENTRYPOINT CLAUDE_CODE_EXPERIMENTAL_AGENT_TEAMS &&"
-        f" PYTHONPATH={project_root}:$PYTHONPATH exec {python} -m dispatcher.worker"
+        f"cd {wt_path} && {_worker_env_prefix()}"
         f" --issue-file {issue_fd.name}"
         f" --config-file {config_fd.name}"
         f" --run-id {run_id}"
         f" --db-path {db_path}"
+        f" --remove-input-files"
     )
 
 
-def _poll_for_completion(
-    conn,
-    run_id: str,
-    session_name: str,
-    to_execute: list[ReviewedIssue],
-    queue: list[tuple[int, ReviewedIssue]],
-    worktree_paths: list[Path],
-    pane_assignments: dict[int, int],
-    config_json: str,
-    db_path: str,
-    config: Config | None = None,
-) -> list[ExecutionResult]:
-    results: list[ExecutionResult] = []
-    completed_indices: set[int] = set()
-
-    while len(results) < len(to_execute):
-        time.sleep(5)
-        statuses = tmux.get_pane_status(session_name)
-
-        for pane_idx, is_alive, exit_code in statuses:
-            if pane_idx not in pane_assignments:
-                continue
-            if is_alive:
-                continue
-
-            qi = pane_assignments.pop(pane_idx)
-            if qi in completed_indices:
-                continue
-            completed_indices.add(qi)
-
-            reviewed = to_execute[qi]
-            er = _read_result_from_db(conn, run_id, reviewed.triage.issue_number)
-            if er is None:
-                er = ExecutionResult(
-                    issue_number=reviewed.triage.issue_number,
-                    branch_name="",
-                    session_id=None,
-                    num_turns=0,
-                    is_error=True,
-                    pr_number=None,
-                    pr_url=None,
-                    error_message=f"Worker exited with code {exit_code}",
-                    outcome="failed",
-                )
-            results.append(er)
-            _print_execution_result(
-                reviewed.triage.issue_number, er.branch_name, er,
-            )
-
-            # Launch next queued issue into freed pane
-            if queue:
-                next_qi, next_reviewed = queue.pop(0)
-                cmd = _build_worker_cmd(
-                    worktree_paths[next_qi], next_reviewed, config_json, run_id, db_path,
-                )
-                tmux.respawn_pane(session_name, pane_idx, cmd)
-                pane_assignments[pane_idx] = next_qi
-                # Send prompt after worker starts claude
-                if config is not None:
-                    time.sleep(5)
-                    tr = next_reviewed.triage
-                    prefix = config.branch_prefix_fix if tr.scope in ("quick-fix",) else config.branch_prefix_feat
-                    branch = f"{prefix}/{tr.issue_number}-issue-{tr.issue_number}"
-                    # Set model to Sonnet before sending the start prompt
-                    tmux.send_keys(session_name, pane_idx, "/model sonnet")
-                    time.sleep(2)
-                    tmux.send_keys(session_name, pane_idx, build_interactive_prompt(tr, branch))
-
-        # Safety: if no panes are assigned and queue is empty, break
-        if not pane_assignments and not queue:
-            break
-
-    return results
-
-
 def _read_result_from_db(conn, run_id: str, issue_number: int) -> ExecutionResult | None:
     row = conn.execute(
         "SELECT * FROM issues WHERE run_id = ? AND issue_number = ?",
@@ -442,13 +1543,29 @@ def _read_result_from_db(conn, run_id: str, issue_number: int) -> ExecutionResul
         pr_url=row["pr_url"],
         error_message=row["error_message"],
         outcome=row["outcome"],
+        input_tokens=row["input_tokens"] or 0,
+        output_tokens=row["output_tokens"] or 0,
+        cache_read_tokens=row["cache_read_tokens"] or 0,
+        cache_creation_tokens=row["cache_creation_tokens"] or 0,
+        cost_usd=row["cost_usd"] or 0.0,
+        usage_reported=row["usage_reported"] != 0,
     )
 
 
+def _result_or_failure(conn, run_id: str, issue_number: int, message: str) -> ExecutionResult:
+    """The result a worker recorded, or a recorded failure if it exited without one (so it stays resumable)."""
+    er = _read_result_from_db(conn, run_id, issue_number)
+    if er is None:
+        db.mark_issues_unfinished(conn, run_id, [issue_number], "failed", message)
+        er = _read_result_from_db(conn, run_id, issue_number) or _worker_failed(issue_number, message)
+    return er
+
+
 def _execute_single_issue(conn, run_id: str, r: ReviewedIssue, config: Config) -> ExecutionResult:
     print(f"\n  [#{r.triage.issue_number}] Executing...")
+    db.mark_issue_started(conn, run_id, r.triage.issue_number)
     try:
-        branch = create_branch(r.triage.issue_number, r.triage.scope, config)
+        branch = create_branch(r.triage.issue_number, r.triage.scope, config, r.base_branch)
     except Exception as exc:
         print(f"  Branch creation failed for #{r.triage.issue_number}: {exc}")
         er = ExecutionResult(
@@ -480,6 +1597,8 @@ def _print_execution_result(issue_number: int, branch: str, er: ExecutionResult)
         print(f"  [#{issue_number}] {branch} → PR #{er.pr_number} created")
     elif er.outcome == "leash_hit":
         print(f"  [#{issue_number}] Hit turn limit ({er.num_turns} turns). Use --resume to continue.")
+    elif er.outcome in ("timed_out", "stalled"):
+        print(f"  [#{issue_number}] {er.error_message}. Use --resume to continue.")
     else:
         print(f"  [#{issue_number}] Failed: {er.error_message}")
 
@@ -487,18 +1606,335 @@ def _print_execution_result(issue_number: int, branch: str, er: ExecutionResult)
 def _print_summary(
     results: list[ExecutionResult],
     parked: list[ReviewedIssue],
-    to_execute: list[ReviewedIssue],
+    turn_budget: int,
     total_turns: int,
     start_time: float,
     config: Config,
+    triage_cost: float = 0.0,
 ) -> None:
     duration = time.time() - start_time
     pr_count = sum(1 for er in results if er.outcome in ("pr_created", "pr_created_review"))
-    budget = len(to_execute) * config.execution_max_turns
     print(
         f"\nRun complete. {pr_count} PRs created, {len(parked)} parked. "
-        f"Duration: {duration / 60:.0f}m. Turns used: {total_turns}/{budget}"
+        f"Duration: {duration / 60:.0f}m. Turns used: {total_turns}/{turn_budget}"
     )
+    tokens = sum(er.total_tokens for er in results)
+    cost = sum(er.cost_usd for er in results)
+    unreported = sum(1 for er in results if not er.usage_reported)
+    if tokens or cost or triage_cost or unreported:
+        exec_cost = f"${cost:.2f}" if not unreported else f"${cost:.2f} + unknown" if cost else "unknown"
+        print(
+            f"Tokens used: {tokens:,} ({sum(er.cache_read_tokens for er in results):,} cache reads). "
+            f"Cost: execution {exec_cost}, triage ${triage_cost:.2f}"
+        )
+    if unreported:
+        print(f"  {unreported} execution(s) ran in interactive or killed sessions, which report no token usage or cost.")
+
+
+def _turn_budget(conn, run_id: str, issues: list[ReviewedIssue], config: Config) -> int:
+    """Total turn cap the issues ran with: the budget _with_budget stored on each row, else the configured one."""
+    total = 0
+    for r in issues:
+        row = db.get_issue(conn, run_id, r.triage.issue_number)
+        total += (row["max_turns"] if row else None) or r.max_turns or config.execution_max_turns
+    return total
+
+
+def _triage_cost(conn, run_id: str) -> float:
+    return float(sum(r["total_cost_usd"] or 0.0 for r in db.get_triage_stage_stats(conn, run_id)))
+
+
+def stats(config: Config, run_id: str | None = None) -> int:
+    """Print token and dollar spend per scope/tier and per triage stage from the history DB."""
+    conn = db.init_db(config.db_path)
+    try:
+        rows = db.get_usage_by_scope(conn, run_id)
+        if not rows:
+            print("No issues recorded" + (f" for run {run_id}." if run_id else "."))
+            return 0
+        print(f"Spend by scope/tier{f' for run {run_id}' if run_id else ''}:")
+        print(f"  {'scope':<16} {'tier':<16} {'issues':>6} {'exec':>5} {'tokens':>12} {'cache reads':>12} {'triage $':>9} {'exec $':>9}")
+        for r in rows:
+            tokens = r["input_tokens"] + r["output_tokens"] + r["cache_read_tokens"] + r["cache_creation_tokens"]
+            print(
+                f"  {r['scope'] or '-':<16} {r['tier'] or '-':<16} {r['issues']:>6} {r['executed']:>5} "
+                f"{tokens + r['triage_tokens']:>12,} {r['cache_read_tokens']:>12,} "
+                f"{r['triage_cost_usd']:>9.2f} {r['cost_usd']:>9.2f}"
+            )
+        total = sum(r["cost_usd"] + r["triage_cost_usd"] for r in rows)
+        print(f"  Total: ${total:.2f}")
+        unreported = sum(r["unreported"] or 0 for r in rows)
+        if unreported:
+            print(f"  Not included: {unreported} execution(s) in interactive or killed sessions, which report no usage.")
+
+        models = db.get_execution_model_stats(conn, run_id)
+        if models:
+            print("\nExecutions by model:")
+            for m in models:
+                print(
+                    f"  {m['model']:<24} {m['executions']:>5} runs, {m['prs']} PRs, "
+                    f"avg {m['avg_turns'] or 0:.0f} turns, {(m['avg_seconds'] or 0) / 60:.1f} min, ${m['cost_usd']:.2f}"
+                )
+
+        stages = db.get_triage_stage_stats(conn, run_id)
+        if stages:
+            print("\nTriage calls by stage/model:")
+            for s in stages:
+                print(
+                    f"  {s['stage']:<8} {s['model']:<24} {s['calls']:>5} calls, {s['accepted'] or 0} accepted, "
+                    f"avg {s['avg_latency_seconds'] or 0:.1f}s, ${s['total_cost_usd'] or 0:.2f}"
+                )
+        return 0
+    finally:
+        conn.close()
+
+
+def simulate(config: Config, run_id: str | None = None, slots: list[int] | None = None) -> int:
+    """Replay a recorded run's executions under alternative scheduling policies.
+
+    Each issue keeps the duration and outcome it had on the live run; the
+    simulator varies slot count, execution order, branch stacking and, on one
+    slot, the sequential path's rate-limit backoff, and reports makespan, slot utilisation and how many
+    issues sat downstream of a failure. Defaults to the latest run.
+    """
+    conn = db.init_db(config.db_path)
+    try:
+        run_row = db.get_run(conn, run_id) if run_id else db.get_latest_run(conn)
+        if run_row is None:
+            print(f"Run {run_id} not found." if run_id else "No runs recorded.")
+            return 1
+        rows = db.get_executed_issues(conn, run_row["id"])
+        if not rows:
+            print(f"No finished executions recorded for run {run_row['id']}.")
+            return 0
+        jobs = _simulation_jobs(conn, rows)
+        started = min(datetime.fromisoformat(r["exec_started_at"]) for r in rows)
+        finished = max(datetime.fromisoformat(r["exec_finished_at"]) for r in rows)
+        recorded_slots = json.loads(run_row["config"] or "{}").get("max_parallel", "?")
+        print(
+            f"Simulating run {run_row['id']}: {len(jobs)} execution(s), "
+            f"recorded {forecast.format_duration((finished - started).total_seconds())} on {recorded_slots} slot(s)"
+        )
+
+        policies = [
+            sim.Policy(slots=n, order=order, backoff=backoff, stack=stack)
+            for n in slots or sorted({1, 2, config.max_parallel, config.max_parallel * 2})
+            for order in sim.ORDERS
+            # Only the sequential path backs off, and it runs one issue at a time
+            for backoff in ((False, True) if n == 1 and any(not j.succeeded for j in jobs) else (False,))
+            for stack in ((False, True) if any(j.deps for j in jobs) else (False,))
+        ]
+        results = [sim.simulate(jobs, p, _RateLimitTracker) for p in policies]
+        for line in sim.report(results):
+            print(line)
+        return 0
+    finally:
+        conn.close()
+
+
+def _simulation_jobs(conn, rows) -> list[sim.SimJob]:
+    numbers = {r["issue_number"] for r in rows}
+    jobs = []
+    for row in rows:
+        snapshot = db.get_issue_snapshot(conn, row["issue_number"]) or {}
+        deps = [d for d in dep_module.extract_deps(snapshot.get("body")) if d in numbers]
+        estimate = row["estimated_seconds"] or history.estimate(conn, _build_reviewed_from_row(row)).seconds
+        jobs.append(sim.SimJob(
+            issue_number=row["issue_number"],
+            seconds=row["seconds"],
+            succeeded=row["outcome"] in ("pr_created", "pr_created_review"),
+            confidence=row["confidence"] or 0.5,
+            estimate_seconds=estimate,
+            deps=tuple(deps),
+        ))
+    return jobs
+
+
+# --- Serve mode ---
+
+class _ShutdownRequest:
+    """First SIGTERM/SIGINT asks serve() to drain; a second one aborts."""
+
+    def __init__(self) -> None:
+        self.requested = False
+        self._previous: dict[int, Any] = {}
+
+    def install(self) -> None:
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            self._previous[signum] = signal.signal(signum, self._handle)
+
+    def restore(self) -> None:
+        for signum, handler in self._previous.items():
+            signal.signal(signum, handler)
+        self._previous.clear()
+
+    def _handle(self, signum, _frame) -> None:
+        if self.requested:
+            raise KeyboardInterrupt
+        self.requested = True
+        print(f"\n  Received {signal.Signals(signum).name}: draining running executions (signal again to abort).")
+
+
+def serve(config: Config, shutdown: _ShutdownRequest | None = None) -> int:
+    """Continuously dispatch labeled issues until SIGTERM.
+
+    Polls the label every ``serve_poll_seconds``, triages issues that are new
+    or have changed since they were last triaged, and keeps up to
+    ``max_parallel`` executions running in tmux panes. With ``webhook_port``
+    set, GitHub `issues` webhooks are queued in the intake table and picked up
+    within one loop iteration. Intake pauses while the rate-limit tracker is
+    backing off. On SIGTERM no new work is started and the process exits once
+    running panes finish.
+    """
+    if not _can_run_parallel(config):
+        print("Error: serve mode requires tmux or execution_backend: pull.")
+        return 2
+    if config.webhook_port and not config.webhook_secret:
+        print("Error: webhook_port is set but no webhook secret is configured.")
+        return 2
+
+    conn = db.init_db(config.db_path)
+    run_id = str(uuid.uuid4())
+    db.insert_run(conn, run_id, [], _config_json(config))
+    db.update_run_stage(conn, run_id, "execution")
+    print(f"Serving label '{config.default_label}' on {config.repo} as run {run_id}.")
+
+    if shutdown is None:
+        shutdown = _ShutdownRequest()
+        shutdown.install()
+    listener = None
+    if config.webhook_port:
+        listener = webhook.WebhookServer(
+            (config.webhook_host, config.webhook_port), config.webhook_secret,
+            config.default_label, config.db_path,
+        )
+        listener.start()
+        print(f"Listening for GitHub webhooks on http://{config.webhook_host}:{config.webhook_port}/")
+    executor = _make_executor(conn, run_id, config)
+    tracker = _RateLimitTracker()
+    seen: dict[int, str | None] = {}  # issue number -> updatedAt when last handled
+    pending: list[tuple[int, str | None]] = []
+    next_poll = 0.0
+    paused_until = 0.0
+    try:
+        while not shutdown.requested:
+            _apply_intake(conn, pending, seen, executor)
+            for er in executor.poll():
+                if er.outcome in RESUMABLE_OUTCOMES:
+                    tracker.record_failure()
+                else:
+                    tracker.record_success()
+            now = time.time()
+            if tracker.should_backoff() and paused_until <= now:
+                paused_until = now + tracker.backoff_seconds()
+                print(f"  Rate limit backoff: pausing intake for {tracker.backoff_seconds()}s.")
+            if now >= next_poll:
+                busy = executor.issue_numbers | {n for n, _ in pending}
+                pending.extend(p for p in _poll_label(conn, config, seen) if p[0] not in busy)
+                next_poll = now + config.serve_poll_seconds
+
+            if now >= paused_until:
+                executor.fill_slots()
+                # Backpressure: only triage when there is room for the result to run soon
+                if pending and executor.queued_count < executor.limit and not executor.admission_closed:
+                    number, updated = pending.pop(0)
+                    _serve_triage_one(conn, run_id, number, updated, seen, executor, config)
+                    continue
+            executor.wait(5)
+
+        dropped = executor.drop_queued()
+        if dropped:
+            print(f"  Dropped {len(dropped)} queued issue(s); they will be picked up on the next start.")
+        while executor.busy:
+            executor.wait(5)
+            executor.poll()
+    except KeyboardInterrupt:
+        print("\n  Aborted. Cleaning up...")
+        # A second Ctrl-C: stop running sessions while the executor can still record them
+        stopped = executor.abandon()
+        if stopped:
+            print(f"  Stopped {len(stopped)} running issue(s); their worktrees are kept. Continue with --resume {run_id}.")
+        db.update_run_status(conn, run_id, "failed")
+        return 1
+    finally:
+        if listener is not None:
+            listener.shutdown()
+            listener.server_close()
+        executor.close()
+
+    db.update_run_status(conn, run_id, "completed")
+    print(f"Serve stopped. {len(executor.results)} execution(s) finished.")
+    return 0
+
+
+def _poll_label(conn, config: Config, seen: dict[int, str | None]) -> list[tuple[int, str | None]]:
+    """Return (number, updatedAt) for labeled issues that are new or changed since last handled."""
+    try:
+        issues = github.list_issues(config.default_label, config.selection_limit, config.repo)
+    except GithubError as exc:
+        print(f"  Warning: could not list issues: {exc}")
+        return []
+
+    changed = []
+    for issue in issues:
+        number, updated = issue["number"], issue.get("updatedAt")
+        if number in seen and seen[number] is None:
+            # Our own parked comment bumped updatedAt; take the new value as baseline
+            seen[number] = updated
+            continue
+        if number in seen and seen[number] == updated:
+            continue
+        if _has_pr(conn, number):
+            seen[number] = updated
+            continue
+        changed.append((number, updated))
+    return changed
+
+
+def _has_pr(conn, issue_number: int) -> bool:
+    prev = db.get_previous_triage(conn, issue_number)
+    return bool(prev and prev["outcome"] in ("pr_created", "pr_created_review"))
+
+
+def _apply_intake(
+    conn, pending: list[tuple[int, str | None]], seen: dict[int, str | None], executor: _PaneExecutor,
+) -> None:
+    """Fold queued webhook events into the serve loop's pending list."""
+    for row in db.claim_intake(conn):
+        number, action, updated = row["issue_number"], row["action"], row["updated_at"]
+        if action in ("closed", "unlabeled"):
+            pending[:] = [p for p in pending if p[0] != number]
+            if executor.discard(number):
+                print(f"  #{number} {action}; removed from the execution queue.")
+            continue
+        if number in executor.issue_numbers or any(p[0] == number for p in pending):
+            continue
+        if updated is not None and seen.get(number) == updated:
+            continue
+        if _has_pr(conn, number):
+            seen[number] = updated
+            continue
+        print(f"  Webhook: #{number} {action}; queued for triage.")
+        pending.append((number, updated))
+
+
+def _serve_triage_one(
+    conn, run_id: str, number: int, updated: str | None, seen: dict[int, str | None],
+    executor: _PaneExecutor, config: Config,
+) -> None:
+    outcome = _fetch_and_triage(number, config)
+    if outcome[0] is not None:
+        db.add_run_issue(conn, run_id, number)
+    tr = _record_triage(conn, run_id, number, outcome)
+    seen[number] = updated
+    if tr is None:
+        return
+    reviewed = ReviewedIssue(triage=tr, final_tier=tr.triage_tier, skipped=False, edited_comment=None)
+    if tr.triage_tier == "parked":
+        _post_parked_comments([reviewed], config)
+        seen[number] = None
+    elif not config.dry_run:
+        executor.submit(reviewed)
 
 
 # --- Task 12: Resume recovery ---
@@ -515,24 +1951,152 @@ def _resume_run(config: Config) -> int:
         print(f"Run '{config.resume}' not found in DB.")
         return 2
 
+    before_execution = dict(row).get("stage") in ("triage", "review")
+    if db.get_unfinished_jobs(conn, config.resume):
+        # A streamed run can die mid-triage with jobs in flight: finish those first
+        code = _resume_jobs(conn, row, config)
+        if not before_execution:
+            return code
+        triage_code = _resume_triage(conn, row, config)
+        return code if code == 1 else triage_code
+    if before_execution:
+        return _resume_triage(conn, row, config)
+
     resumable = db.get_resumable_issues(conn, config.resume)
     if not resumable:
         print("No resumable issues found.")
         return 3
+    resumable = _within_resume_attempts(resumable, config)
+    if not resumable:
+        return 3
+    if config.execution_backend == "pull" or (tmux.is_tmux_available() and len(resumable) > 1):
+        return _resume_parallel(conn, row, resumable, config)
 
-    stashed = stash_if_dirty()
+    # Issues resumed in a kept worktree never touch the main checkout
+    needs_checkout = any(_retained_worktree(conn, row["issue_number"]) is None for row in resumable)
+    stashed = stash_if_dirty() if needs_checkout else False
     results = _execute_resumable(conn, config.resume, resumable, config)
     if stashed:
         unstash()
 
     if not results:
         return 3
-    failed = sum(1 for er in results if er.outcome in ("failed", "leash_hit"))
+    failed = sum(1 for er in results if er.outcome in RESUMABLE_OUTCOMES)
     return 0 if failed == 0 else 1
 
 
-def _build_reviewed_from_row(row) -> ReviewedIssue:
-    tr = TriageResult(
+def _resume_parallel(conn, run_row, resumable, config: Config) -> int:
+    """Resume issues through the parallel executor, one worktree per issue on its recorded branch."""
+    start_time = time.time()
+    run_id = run_row["id"]
+    to_execute = [_resume_reviewed(row) for row in resumable]
+    # Stale outcomes would otherwise be read back as the result of a worker that died early
+    db.clear_issue_outcomes(conn, run_id, [r.triage.issue_number for r in to_execute])
+    db.update_run_status(conn, run_id, "running")
+    print(f"  Resuming {len(to_execute)} issue(s) of run {run_id}, up to {config.max_parallel} at a time.")
+    results, total_turns = _run_parallel_execution(conn, run_id, to_execute, config)
+    _print_summary(
+        results, [], _turn_budget(conn, run_id, to_execute, config), total_turns, start_time, config,
+        _triage_cost(conn, run_id),
+    )
+    failed_count = sum(1 for er in results if er.outcome in RESUMABLE_OUTCOMES)
+    db.update_run_status(conn, run_id, "completed" if failed_count == 0 else "failed")
+    return 0 if failed_count == 0 else 1
+
+
+def _resume_reviewed(row) -> ReviewedIssue:
+    """A ReviewedIssue that continues the row's recorded session on its recorded branch."""
+    return replace(
+        _build_reviewed_from_row(row),
+        resume_session_id=row["session_id"],
+        resume_branch=row["branch_name"] or None,
+    )
+
+
+def _within_resume_attempts(resumable, config: Config) -> list:
+    rows = []
+    for row in resumable:
+        resume_count = row["resume_count"] or 0
+        if resume_count >= config.max_resume_attempts:
+            print(f"  #{row['issue_number']}: max resume attempts reached ({resume_count}). Skipping.")
+            continue
+        rows.append(row)
+    return rows
+
+
+def _resume_jobs(conn, run_row, config: Config) -> int:
+    """Continue a run whose orchestrator died while jobs were queued or running."""
+    start_time = time.time()
+    run_id = run_row["id"]
+    executor = _make_executor(conn, run_id, config)
+    adopted, requeued = executor.recover()
+    to_execute = executor.tracked
+    print(f"  Resuming run {run_id}: re-adopted {adopted} running worker(s), {requeued} job(s) queued.")
+    db.update_run_status(conn, run_id, "running")
+    try:
+        results = _drive_executor(conn, run_id, executor)
+    finally:
+        executor.close()
+
+    total_turns = sum(r.num_turns for r in results)
+    _print_summary(
+        results, [], _turn_budget(conn, run_id, to_execute, config), total_turns, start_time, config,
+        _triage_cost(conn, run_id),
+    )
+    failed_count = sum(1 for er in results if er.outcome in RESUMABLE_OUTCOMES)
+    db.update_run_status(conn, run_id, "completed" if failed_count == 0 else "failed")
+    return 0 if failed_count == 0 else 1
+
+
+def _resume_triage(conn, run_row, config: Config) -> int:
+    """Resume a run that stopped before execution.
+
+    Issues already triaged for the run are reused from the DB (with their
+    cached issue snapshot for dependency analysis); only the remainder is
+    triaged before continuing into review and execution.
+    """
+    start_time = time.time()
+    run_id = run_row["id"]
+    selected_numbers: list[int] = json.loads(run_row["issue_list"])
+    done = {r["issue_number"]: r for r in db.get_triaged_issues(conn, run_id)}
+    remaining = [n for n in selected_numbers if n not in done]
+    print(
+        f"  Resuming run {run_id} from {run_row['stage']}: "
+        f"{len(done)} already triaged, {len(remaining)} remaining."
+    )
+    db.update_run_status(conn, run_id, "running")
+    db.update_run_stage(conn, run_id, "triage")
+
+    # Streaming runs may already have executed (or queued) some issues during triage
+    streamed = db.get_job_issue_numbers(conn, run_id)
+    triage_results = [
+        _build_triage_from_row(done[n]) for n in selected_numbers
+        if n in done and done[n]["outcome"] is None and n not in streamed
+    ]
+    issues_raw: list[dict[str, Any]] = []
+    for number in (n for n in selected_numbers if n in done):
+        snapshot = db.get_issue_snapshot(conn, number)
+        if snapshot is None:
+            try:
+                snapshot = github.view_issue(number, config.repo)
+            except GithubError as exc:
+                print(f"  Warning: could not fetch #{number} for dependency analysis: {exc}")
+                continue
+        issues_raw.append(snapshot)
+
+    new_results, new_raw = _run_triage(conn, run_id, remaining, config)
+    triage_results.extend(new_results)
+    issues_raw.extend(new_raw)
+    if not triage_results:
+        db.update_run_status(conn, run_id, "failed")
+        return 1
+
+    triage_results.sort(key=lambda t: t.confidence, reverse=True)
+    return _review_and_execute(conn, run_id, triage_results, issues_raw, start_time, config)
+
+
+def _build_triage_from_row(row) -> TriageResult:
+    return TriageResult(
         issue_number=row["issue_number"],
         issue_title=row["issue_title"],
         issue_url=row["issue_url"],
@@ -543,22 +2107,25 @@ def _build_reviewed_from_row(row) -> ReviewedIssue:
         confidence=row["confidence"] or 0.5,
         risk_flags=json.loads(row["risk_flags"] or "[]"),
         missing_info=json.loads(row["missing_info"] or "[]"),
-        reasoning=row["reasoning"] or "",
+        reasoning=row["triage_reasoning"] or "",
     )
+
+
+def _build_reviewed_from_row(row) -> ReviewedIssue:
+    tr = _build_triage_from_row(row)
     final_tier = row["reviewed_tier"] or row["triage_tier"] or "full-yolo"
-    return ReviewedIssue(triage=tr, final_tier=final_tier, skipped=False, edited_comment=None)
+    keys = row.keys()
+    return ReviewedIssue(
+        triage=tr, final_tier=final_tier, skipped=False, edited_comment=None,
+        max_turns=row["max_turns"] if "max_turns" in keys else None,
+        timeout_seconds=row["timeout_seconds"] if "timeout_seconds" in keys else None,
+    )
 
 
 def _execute_resumable(conn, run_id: str, resumable, config: Config) -> list[ExecutionResult]:
     results = []
     for row in resumable:
         issue_number = row["issue_number"]
-        resume_count = row["resume_count"] or 0
-
-        if resume_count >= config.max_resume_attempts:
-            print(f"  #{issue_number}: max resume attempts reached ({resume_count}). Skipping.")
-            continue
-
         session_id = row["session_id"]
         branch = row["branch_name"] or f"fix/{issue_number}-issue-{issue_number}"
 
@@ -570,11 +2137,19 @@ def _execute_resumable(conn, run_id: str, resumable, config: Config) -> list[Exe
 
 def _resume_single(row, session_id, branch, run_id, conn, config: Config) -> ExecutionResult | None:
     issue_number = row["issue_number"]
+    db.mark_issue_started(conn, run_id, issue_number)
+    kept = _retained_worktree(conn, issue_number)
+    reviewed = _with_budget(conn, run_id, _build_reviewed_from_row(row), config)
     if session_id:
-        raw = resume_issue(session_id, config)
-        er = _parse_resume_result(issue_number, branch, raw, config)
+        raw = resume_issue(
+            session_id, config, cwd=kept, model=reviewed.model,
+            max_turns=reviewed.max_turns, timeout_seconds=reviewed.timeout_seconds,
+        )
+        er = parse_resume_result(issue_number, branch, raw, config, reviewed.final_tier, reviewed.max_turns)
+    elif kept is not None:
+        # The kept checkout already has the branch and any partial work
+        er = execute_issue(reviewed, branch, config, cwd=kept)
     else:
-        reviewed = _build_reviewed_from_row(row)
         try:
             branch = create_branch(issue_number, reviewed.triage.scope, config)
         except Exception as exc:
@@ -584,28 +2159,10 @@ def _resume_single(row, session_id, branch, run_id, conn, config: Config) -> Exe
 
     db.increment_resume_count(conn, run_id, issue_number)
     db.update_issue_execution(conn, run_id, issue_number, er)
+    if kept is not None and er.outcome in RESUMABLE_OUTCOMES:
+        db.retain_worktree(conn, run_id, issue_number, str(kept), branch, er.outcome)
+    elif kept is not None:
+        worktree.remove_worktree(kept, Path.cwd())
+        db.release_worktree(conn, str(kept))
     _print_execution_result(issue_number, branch, er)
     return er
-
-
-def _parse_resume_result(issue_number: int, branch: str, raw: dict, config: Config) -> ExecutionResult:
-    is_error = raw.get("is_error", True)
-    num_turns = raw.get("num_turns", 0)
-    session_id = raw.get("session_id")
-
-    if is_error:
-        return ExecutionResult(
-            issue_number=issue_number, branch_name=branch,
-            session_id=session_id, num_turns=num_turns, is_error=True,
-            pr_number=None, pr_url=None, error_message="resume failed", outcome="failed",
-        )
-
-    from dispatcher.execute import _classify_outcome, _find_pr
-
-    pr_number, pr_url = _find_pr(branch, config)
-    outcome = _classify_outcome(pr_number, num_turns, "full-yolo", config)
-    return ExecutionResult(
-        issue_number=issue_number, branch_name=branch,
-        session_id=session_id, num_turns=num_turns, is_error=False,
-        pr_number=pr_number, pr_url=pr_url, error_message=None, outcome=outcome,
-    )
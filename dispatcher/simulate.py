@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+from typing import Callable, Protocol
+
+from dispatcher.forecast import format_duration
+
+ORDERS = ("confidence", "sjf")
+
+
+class _Backoff(Protocol):
+    def record_failure(self) -> None: ...
+    def record_success(self) -> None: ...
+    def should_backoff(self) -> bool: ...
+    def backoff_seconds(self) -> int: ...
+
+
+@dataclass(frozen=True)
+class SimJob:
+    """One recorded execution, replayed with its recorded duration and outcome."""
+
+    issue_number: int
+    seconds: float
+    succeeded: bool
+    confidence: float
+    estimate_seconds: float  # what shortest-job-first would have ranked it by
+    deps: tuple[int, ...] = ()  # in-batch prerequisites
+
+
+@dataclass(frozen=True)
+class Policy:
+    slots: int
+    order: str = "confidence"
+    backoff: bool = False  # only the sequential (no tmux) path backs off; model it with slots=1
+    stack: bool = False
+    launch_delay_seconds: float = 5.0  # fill_slots() waits this long before sending prompts
+    poll_seconds: float = 5.0  # finished panes are noticed on the next poll
+
+    @property
+    def label(self) -> str:
+        parts = [f"{self.slots} slot(s)", self.order]
+        if self.backoff:
+            parts.append("sequential with backoff")
+        if self.stack:
+            parts.append("stacked")
+        return ", ".join(parts)
+
+
+@dataclass(frozen=True)
+class SimResult:
+    policy: Policy
+    makespan_seconds: float
+    busy_seconds: float
+    backoff_seconds: float
+    failed: int
+    cascaded: int  # issues downstream of a failed prerequisite (not started when stacked)
+    unscheduled: int  # issues whose prerequisites never finished (dependency cycle)
+
+    @property
+    def utilisation(self) -> float:
+        capacity = self.policy.slots * self.makespan_seconds
+        return self.busy_seconds / capacity if capacity else 0.0
+
+
+def simulate(jobs: list[SimJob], policy: Policy, new_backoff: Callable[[], _Backoff]) -> SimResult:
+    """Replay jobs through a discrete-event model of the executor under policy.
+
+    Issues are launched in policy order into free slots. Each launch costs
+    ``launch_delay_seconds`` of slot time, and a finished issue frees its slot
+    at the next poll. Like the live executor, only ``stack`` makes an issue
+    wait for its in-batch prerequisites, and dependents of a failed
+    prerequisite are then recorded as not started instead of running.
+    ``backoff`` models the sequential path: after a failure the backoff
+    tracker (the live _RateLimitTracker) may pause launches.
+    """
+    if policy.order == "sjf":
+        pending = sorted(jobs, key=lambda j: j.estimate_seconds)
+    else:
+        pending = sorted(jobs, key=lambda j: j.confidence, reverse=True)
+    by_number = {j.issue_number: j for j in jobs}
+    finished: set[int] = set()
+    failed: set[int] = set()
+    skipped: set[int] = set()  # stacked on a failed prerequisite, so never started
+    running: list[tuple[float, int]] = []
+    backoff = new_backoff()
+    now = pause_until = busy = paused = 0.0
+
+    while pending or running:
+        while len(running) < policy.slots and now >= pause_until:
+            job = next((j for j in pending if not policy.stack or all(d in finished for d in j.deps)), None)
+            if job is None:
+                break
+            pending.remove(job)
+            if policy.stack and any(d in failed or d in skipped for d in job.deps):
+                skipped.add(job.issue_number)
+                finished.add(job.issue_number)
+                continue
+            end = now + policy.launch_delay_seconds + job.seconds
+            busy += end - now
+            heapq.heappush(running, (end, job.issue_number))
+        if not running:
+            if pending and now < pause_until:
+                now = pause_until
+                continue
+            break  # what's left waits on prerequisites that never finish
+
+        end, number = heapq.heappop(running)
+        now = max(now, math.ceil(end / policy.poll_seconds) * policy.poll_seconds)
+        finished.add(number)
+        if by_number[number].succeeded:
+            backoff.record_success()
+            continue
+        failed.add(number)
+        backoff.record_failure()
+        if policy.backoff and backoff.should_backoff():
+            wait = backoff.backoff_seconds()
+            pause_until = now + wait
+            paused += wait
+
+    return SimResult(
+        policy=policy, makespan_seconds=now, busy_seconds=busy, backoff_seconds=paused,
+        failed=len(failed), cascaded=len(_downstream(jobs, failed)), unscheduled=len(pending),
+    )
+
+
+def _downstream(jobs: list[SimJob], failed: set[int]) -> set[int]:
+    """Issues that depend, directly or through other issues, on a failed one."""
+    downstream: set[int] = set()
+    changed = True
+    while changed:
+        changed = False
+        for j in jobs:
+            if j.issue_number not in failed | downstream and any(d in failed | downstream for d in j.deps):
+                downstream.add(j.issue_number)
+                changed = True
+    return downstream
+
+
+def report(results: list[SimResult]) -> list[str]:
+    """One table row per policy, best makespan first."""
+    lines = [f"  {'policy':<40} {'makespan':>9} {'util':>5} {'backoff':>8} {'failed':>6} {'cascade':>7} {'stuck':>5}"]
+    for r in sorted(results, key=lambda r: (r.unscheduled, r.makespan_seconds)):
+        lines.append(
+            f"  {r.policy.label:<40} {format_duration(r.makespan_seconds):>9} {r.utilisation:>5.0%} "
+            f"{format_duration(r.backoff_seconds):>8} {r.failed:>6} {r.cascaded:>7} {r.unscheduled:>5}"
+        )
+    return lines
@@ -10,3 +10,4 @@ def db():
     conn = init_db(":memory:")
     yield conn
     conn.close()
+
@@ -0,0 +1,10 @@
+from dispatcher.models import ReviewedIssue, TriageResult
+
+
+def make_reviewed(number: int, scope: str = "quick-fix", richness: int = 4, tier: str = "full-yolo") -> ReviewedIssue:
+    tr = TriageResult(
+        issue_number=number, issue_title=f"Issue {number}", issue_url="url",
+        scope=scope, richness_score=richness, richness_signals={},
+        triage_tier=tier, confidence=0.9, risk_flags=[], missing_info=[], reasoning="ok",
+    )
+    return ReviewedIssue(triage=tr, final_tier=tier, skipped=False, edited_comment=None)
@@ -0,0 +1,48 @@
+import pytest
+
+from dispatcher.budget import RunBudget
+from dispatcher.db import get_run_spend, insert_issue, insert_run, insert_triage_attempts, update_issue_execution
+from dispatcher.models import Config, ExecutionResult, TriageAttempt
+from dispatcher.tests.helpers import make_reviewed
+
+
+def _cfg(**kw) -> Config:
+    return Config(plugin_path="/p", **kw)
+
+
+@pytest.fixture
+def conn(db):
+    insert_run(db, "run-1", [1, 2], "{}")
+    for n in (1, 2):
+        insert_issue(db, "run-1", make_reviewed(n).triage)
+    return db
+
+
+def _spend(conn, number: int, turns: int, tokens: int, cost: float) -> None:
+    update_issue_execution(conn, "run-1", number, ExecutionResult(
+        issue_number=number, branch_name="b", session_id="s", num_turns=turns, is_error=False,
+        pr_number=1, pr_url="u", error_message=None, outcome="pr_created",
+        input_tokens=tokens, cost_usd=cost,
+    ))
+
+
+def test_no_limits_admits_everything(conn):
+    assert RunBudget(conn, "run-1", _cfg()).check(make_reviewed(2), [make_reviewed(1)]) is None
+
+
+def test_refuses_when_spend_plus_expected_turns_exceeds_limit(conn):
+    _spend(conn, 1, turns=60, tokens=1000, cost=1.0)
+    # No history for the bucket: the quick-fix prior expects 30 turns
+    assert RunBudget(conn, "run-1", _cfg(run_max_turns=100)).check(make_reviewed(2), []) is None
+    refusal = RunBudget(conn, "run-1", _cfg(run_max_turns=100)).check(make_reviewed(2), [make_reviewed(3)])
+    assert refusal.startswith("turns budget")
+
+
+def test_cost_budget_counts_triage_and_execution_spend(conn):
+    insert_triage_attempts(conn, "run-1", 2, [
+        TriageAttempt(stage="primary", model="m", latency_seconds=1.0, cost_usd=0.75, confidence=0.9, accepted=True),
+    ])
+    _spend(conn, 1, turns=10, tokens=5000, cost=4.5)
+    assert get_run_spend(conn, "run-1")["cost_usd"] == pytest.approx(5.25)
+    refusal = RunBudget(conn, "run-1", _cfg(run_max_cost_usd=5.0)).check(make_reviewed(2), [])
+    assert "cost budget" in refusal and "$5.25" in refusal
@@ -1,3 +1,5 @@
+import pytest
+
 from dispatcher.cli import build_parser
 
 
@@ -49,3 +51,29 @@ def test_max_parallel_default():
     parser = build_parser()
     args = parser.parse_args([])
     assert args.max_parallel is None
+
+
+def test_stream_flag():
+    parser = build_parser()
+    assert parser.parse_args(["--auto", "--stream"]).stream is True
+    assert parser.parse_args([]).stream is False
+
+
+def test_command_defaults_to_run():
+    parser = build_parser()
+    assert parser.parse_args([]).command == "run"
+    assert parser.parse_args(["serve", "--label", "x"]).command == "serve"
+
+
+def test_stats_command():
+    args = build_parser().parse_args(["stats", "--run", "run-1"])
+    assert args.command == "stats"
+    assert args.run == "run-1"
+
+
+def test_simulate_command_parses_slot_list():
+    args = build_parser().parse_args(["simulate", "--slots", "1, 2,4"])
+    assert args.command == "simulate"
+    assert args.slots == [1, 2, 4]
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["simulate", "--slots", "two"])
@@ -11,6 +11,8 @@ def _args(**overrides):
         "issues": None, "label": None, "repo": None, "auto": False,
         "config": "nonexistent.yml", "dry_run": False, "resume": None,
         "limit": None, "verbose": False, "max_parallel": None,
+        "stream": False, "stack": False, "order": None,
+        "max_turns": None, "timeout_minutes": None, "max_cost": None,
     }
     defaults.update(overrides)
     return argparse.Namespace(**defaults)
@@ -81,3 +83,67 @@ def test_cli_max_parallel_overrides_yaml(tmp_path):
     with patch("dispatcher.config._detect_repo", return_value="owner/repo"):
         cfg = load_config(_args(config=str(cfg_file), max_parallel=6))
     assert cfg.max_parallel == 6
+
+
+def test_stream_settings_loaded(tmp_path):
+    cfg_file = tmp_path / "dispatcher.yml"
+    cfg_file.write_text(
+        "plugin_path: /test/path\nstream: true\nstream_confidence_threshold: 0.9\ntriage_concurrency: 3\n"
+    )
+    with patch("dispatcher.config._detect_repo", return_value="o/r"), patch("dispatcher.config._detect_base_branch", return_value="main"):
+        cfg = load_config(_args(config=str(cfg_file)))
+    assert cfg.stream is True
+    assert cfg.stream_confidence_threshold == 0.9
+    assert cfg.triage_concurrency == 3
+
+
+def test_execution_order_from_cli_and_deadline_validation(tmp_path):
+    cfg_file = tmp_path / "dispatcher.yml"
+    cfg_file.write_text("plugin_path: /test/path\nexecution_order: deadline\nrun_deadline_minutes: 90\n")
+    with patch("dispatcher.config._detect_repo", return_value="o/r"), patch("dispatcher.config._detect_base_branch", return_value="main"):
+        assert load_config(_args(config=str(cfg_file))).run_deadline_minutes == 90
+        assert load_config(_args(config=str(cfg_file), order="sjf")).execution_order == "sjf"
+        cfg_file.write_text("plugin_path: /test/path\nexecution_order: deadline\n")
+        with pytest.raises(SystemExit):
+            load_config(_args(config=str(cfg_file)))
+
+
+def test_token_and_cost_budgets_warn_on_tmux_backend(tmp_path, capsys):
+    cfg_file = tmp_path / "dispatcher.yml"
+    cfg_file.write_text("plugin_path: /test/path\nrun_max_cost_usd: 20\n")
+    with patch("dispatcher.config._detect_repo", return_value="o/r"), patch("dispatcher.config._detect_base_branch", return_value="main"):
+        load_config(_args(config=str(cfg_file)))
+        assert "interactive tmux sessions report no token usage or cost" in capsys.readouterr().err
+        cfg_file.write_text("plugin_path: /test/path\nrun_max_cost_usd: 20\nexecution_backend: pull\n")
+        load_config(_args(config=str(cfg_file)))
+        assert capsys.readouterr().err == ""
+        cfg_file.write_text("plugin_path: /test/path\nexecution_backend: pulll\n")
+        with pytest.raises(SystemExit):
+            load_config(_args(config=str(cfg_file)))
+
+
+def test_max_turns_flag_overrides_adaptive_budgets(tmp_path):
+    cfg_file = tmp_path / "dispatcher.yml"
+    cfg_file.write_text("plugin_path: /test/path\nadaptive_budgets: true\nexecution_timeout_minutes: 30\n")
+    with patch("dispatcher.config._detect_repo", return_value="o/r"), patch("dispatcher.config._detect_base_branch", return_value="main"):
+        assert load_config(_args(config=str(cfg_file))).adaptive_budgets is True
+        cfg = load_config(_args(config=str(cfg_file), max_turns=80))
+    assert cfg.adaptive_budgets is False
+    assert cfg.execution_max_turns == 80
+    assert cfg.execution_timeout_minutes == 30
+
+
+def test_execution_routes_loaded_and_validated(tmp_path):
+    cfg_file = tmp_path / "dispatcher.yml"
+    cfg_file.write_text(
+        "plugin_path: /test/path\nexecution_routes:\n"
+        "  - {scope: quick-fix, model: claude-haiku-4-5, max_turns: 60}\n"
+    )
+    with patch("dispatcher.config._detect_repo", return_value="o/r"), patch("dispatcher.config._detect_base_branch", return_value="main"):
+        cfg = load_config(_args(config=str(cfg_file)))
+        assert cfg.route("quick-fix", "full-yolo") == ("claude-haiku-4-5", 60)
+        # --max-turns wins over the route's turn cap
+        assert load_config(_args(config=str(cfg_file), max_turns=80)).route("quick-fix", "full-yolo") == ("claude-haiku-4-5", 80)
+        cfg_file.write_text("plugin_path: /test/path\nexecution_routes:\n  - {scope: quick-fix, modle: x}\n")
+        with pytest.raises(SystemExit):
+            load_config(_args(config=str(cfg_file)))
@@ -1,3 +1,5 @@
+import pytest
+
 from dispatcher.db import (
     get_previous_triage,
     get_resumable_issues,
@@ -70,6 +72,19 @@ def test_update_issue_execution(db):
     assert row["outcome"] == "pr_created"
     assert row["pr_number"] == 100
     assert row["session_id"] == "sess-1"
+    assert row["usage_reported"] == 1
+
+
+def test_execution_without_usage_marks_the_issue_unreported(db):
+    insert_run(db, "run-1", [42], "{}")
+    insert_issue(db, "run-1", _make_triage(42))
+    for reported in (False, True):  # a later headless resume doesn't make the first session's spend known
+        update_issue_execution(db, "run-1", 42, ExecutionResult(
+            issue_number=42, branch_name="b", session_id="s", num_turns=0, is_error=True,
+            pr_number=None, pr_url=None, error_message=None, outcome="failed", usage_reported=reported,
+        ))
+    row = db.execute("SELECT usage_reported FROM issues WHERE issue_number = 42").fetchone()
+    assert row["usage_reported"] == 0
 
 
 def test_get_resumable_issues(db):
@@ -121,3 +136,233 @@ def test_increment_resume_count(db):
     increment_resume_count(db, "run-1", 42)
     row = db.execute("SELECT resume_count FROM issues WHERE issue_number = 42").fetchone()
     assert row["resume_count"] == 2
+
+
+def test_triage_attempts_and_escalation_rate(db):
+    from dispatcher.db import get_escalation_rate, get_triage_stage_stats, insert_triage_attempts
+    from dispatcher.models import TriageAttempt
+
+    insert_run(db, "run-1", [42, 43], "{}")
+    insert_triage_attempts(db, "run-1", 42, [
+        TriageAttempt("cascade", "haiku", 1.0, 0.01, 0.95, True),
+    ])
+    insert_triage_attempts(db, "run-1", 43, [
+        TriageAttempt("cascade", "haiku", 1.5, 0.01, 0.4, False),
+        TriageAttempt("final", "sonnet", 6.0, 0.05, 0.9, True),
+    ])
+    assert get_escalation_rate(db, "run-1") == (1, 2)
+    stats = {(r["stage"], r["model"]): r for r in get_triage_stage_stats(db, "run-1")}
+    assert stats[("cascade", "haiku")]["calls"] == 2
+    assert stats[("cascade", "haiku")]["accepted"] == 1
+    assert stats[("final", "sonnet")]["total_cost_usd"] == 0.05
+
+
+def test_triage_usage_rolls_up_to_issue(db):
+    from dispatcher.db import get_usage_by_scope, insert_triage_attempts
+    from dispatcher.models import TriageAttempt
+
+    insert_run(db, "run-1", [42], "{}")
+    insert_triage_attempts(db, "run-1", 42, [
+        TriageAttempt("cascade", "haiku", 1.0, 0.01, 0.4, False, input_tokens=100, output_tokens=10),
+        TriageAttempt("final", "sonnet", 6.0, 0.05, 0.9, True, input_tokens=200, cache_read_tokens=50),
+    ])
+    insert_issue(db, "run-1", _make_triage(42))
+    update_issue_execution(db, "run-1", 42, ExecutionResult(
+        issue_number=42, branch_name="b", session_id="s", num_turns=3, is_error=False,
+        pr_number=1, pr_url="u", error_message=None, outcome="pr_created",
+        input_tokens=1000, output_tokens=300, cost_usd=0.4,
+    ))
+    row = db.execute("SELECT * FROM issues WHERE issue_number = 42").fetchone()
+    assert (row["triage_input_tokens"], row["triage_cache_read_tokens"]) == (300, 50)
+    assert row["triage_cost_usd"] == pytest.approx(0.06)
+
+    (usage,) = get_usage_by_scope(db, "run-1")
+    assert usage["triage_tokens"] == 360
+    assert usage["input_tokens"] == 1000
+    assert usage["cost_usd"] == pytest.approx(0.4)
+
+
+def test_execution_model_stats(db):
+    from dispatcher.db import get_execution_model_stats, set_issue_budget
+
+    insert_run(db, "run-1", [42, 43], "{}")
+    for n, model, outcome in ((42, "haiku", "pr_created"), (43, "opus", "leash_hit")):
+        insert_issue(db, "run-1", _make_triage(n))
+        set_issue_budget(db, "run-1", n, 50, None, model)
+        update_issue_execution(db, "run-1", n, ExecutionResult(
+            issue_number=n, branch_name="b", session_id="s", num_turns=10, is_error=False,
+            pr_number=None, pr_url=None, error_message=None, outcome=outcome, cost_usd=0.1 if model == "haiku" else 2.0,
+        ))
+
+    rows = get_execution_model_stats(db, "run-1")
+    assert [(r["model"], r["executions"], r["prs"]) for r in rows] == [("opus", 1, 0), ("haiku", 1, 1)]
+
+
+def test_migrates_runs_stage_column(tmp_path):
+    import sqlite3
+    db_path = str(tmp_path / "old.db")
+    old = sqlite3.connect(db_path)
+    old.execute(
+        "CREATE TABLE runs (id TEXT PRIMARY KEY, started_at TEXT NOT NULL, finished_at TEXT,"
+        " issue_list TEXT NOT NULL, config TEXT NOT NULL, status TEXT NOT NULL DEFAULT 'running')"
+    )
+    old.commit()
+    old.close()
+
+    conn = init_db(db_path)
+    insert_run(conn, "run-1", [42], "{}")
+    row = conn.execute("SELECT stage FROM runs WHERE id = 'run-1'").fetchone()
+    assert row["stage"] == "triage"
+    conn.close()
+
+
+def test_update_run_stage(db):
+    from dispatcher.db import update_run_stage
+    insert_run(db, "run-1", [42], "{}")
+    update_run_stage(db, "run-1", "review")
+    assert db.execute("SELECT stage FROM runs WHERE id = 'run-1'").fetchone()["stage"] == "review"
+
+
+def test_issue_snapshot_roundtrip(db):
+    from dispatcher.db import get_issue_snapshot, save_issue_snapshot
+    assert get_issue_snapshot(db, 42) is None
+    save_issue_snapshot(db, 42, {"number": 42, "body": "old"})
+    save_issue_snapshot(db, 42, {"number": 42, "body": "depends on #3"})
+    assert get_issue_snapshot(db, 42) == {"number": 42, "body": "depends on #3"}
+
+
+def test_get_triaged_issues(db):
+    from dispatcher.db import get_triaged_issues
+    insert_run(db, "run-1", [42, 43], "{}")
+    insert_run(db, "run-2", [44], "{}")
+    insert_issue(db, "run-1", _make_triage(42))
+    insert_issue(db, "run-2", _make_triage(44))
+    assert [r["issue_number"] for r in get_triaged_issues(db, "run-1")] == [42]
+
+
+def test_intake_dedupes_deliveries_and_claims_once(db):
+    from dispatcher.db import claim_intake, insert_intake
+
+    assert insert_intake(db, "d-1", 42, "labeled", "t1")
+    assert not insert_intake(db, "d-1", 42, "labeled", "t1")  # GitHub redelivery
+    assert insert_intake(db, "d-2", 42, "closed", "t2")
+    assert [r["action"] for r in claim_intake(db)] == ["labeled", "closed"]
+    assert claim_intake(db) == []
+
+
+def test_job_lifecycle_and_lease_expiry(db):
+    from dispatcher.db import (
+        enqueue_job, finish_job, get_unfinished_jobs, heartbeat_job, lease_expired,
+        lease_job, mark_job_running, requeue_job,
+    )
+
+    insert_run(db, "run-1", [42], "{}")
+    enqueue_job(db, "run-1", 42, "{}")
+    enqueue_job(db, "run-1", 42, "{}")  # already queued: no duplicate
+    [job] = get_unfinished_jobs(db, "run-1")
+    assert job["state"] == "queued" and lease_expired(job)
+
+    lease_job(db, "run-1", 42, "sess", 1, lease_seconds=60)
+    mark_job_running(db, "run-1", 42)
+    [job] = get_unfinished_jobs(db, "run-1")
+    assert (job["state"], job["pane_index"], job["attempts"]) == ("running", 1, 1)
+    assert not lease_expired(job)
+
+    heartbeat_job(db, "run-1", 42, lease_seconds=-1)
+    [job] = get_unfinished_jobs(db, "run-1")
+    assert job["heartbeat_at"] is not None and lease_expired(job)
+
+    requeue_job(db, "run-1", 42)
+    assert get_unfinished_jobs(db, "run-1")[0]["state"] == "queued"
+    finish_job(db, "run-1", 42)
+    assert get_unfinished_jobs(db, "run-1") == []
+
+    enqueue_job(db, "run-1", 42, '{"again": true}')  # done jobs can be queued again
+    assert get_unfinished_jobs(db, "run-1")[0]["payload"] == '{"again": true}'
+
+
+def test_claim_job_is_exclusive_across_processes(tmp_path):
+    import subprocess
+    import sys
+    from dispatcher.db import enqueue_job
+
+    db_path = str(tmp_path / "shared.db")
+    conn = init_db(db_path)
+    insert_run(conn, "run-1", list(range(1, 31)), "{}")
+    for n in range(1, 31):
+        enqueue_job(conn, "run-1", n, "{}")
+    conn.close()
+
+    claimer = (
+        "import sys\n"
+        "from dispatcher import db\n"
+        "conn = db.init_db(sys.argv[1])\n"
+        "while (job := db.claim_job(conn, sys.argv[2], 60)) is not None:\n"
+        "    print(job['issue_number'], flush=True)\n"
+    )
+    procs = [
+        subprocess.Popen([sys.executable, "-c", claimer, db_path, f"w{i}"], stdout=subprocess.PIPE, text=True)
+        for i in range(3)
+    ]
+    claimed = [int(line) for p in procs for line in p.communicate(timeout=60)[0].split()]
+    assert sorted(claimed) == list(range(1, 31))
+
+
+def test_exec_started_at_is_stamped_at_start(db):
+    from dispatcher.db import get_execution_stats, mark_issue_started
+
+    insert_run(db, "run-1", [42], "{}")
+    insert_issue(db, "run-1", _make_triage(42))
+    mark_issue_started(db, "run-1", 42)
+    db.execute("UPDATE issues SET exec_started_at = '2026-01-01T00:00:00+00:00' WHERE issue_number = 42")
+    update_issue_execution(db, "run-1", 42, ExecutionResult(
+        issue_number=42, branch_name="fix/42", session_id=None, num_turns=12, is_error=False,
+        pr_number=1, pr_url="u", error_message=None, outcome="pr_created",
+    ))
+    row = db.execute("SELECT * FROM issues WHERE issue_number = 42").fetchone()
+    assert row["exec_started_at"] == "2026-01-01T00:00:00+00:00"
+    stats = get_execution_stats(db, scope="quick-fix", tier="full-yolo")
+    assert stats["samples"] == 1
+    assert stats["avg_seconds"] > 0
+    assert stats["avg_turns"] == 12
+
+
+def test_timed_out_issues_are_resumable(db):
+    insert_run(db, "run-1", [42], "{}")
+    insert_issue(db, "run-1", _make_triage(42))
+    update_issue_execution(db, "run-1", 42, ExecutionResult(
+        issue_number=42, branch_name="fix/42", session_id="s1", num_turns=0, is_error=True,
+        pr_number=None, pr_url=None, error_message="Timed out after 15 min", outcome="timed_out",
+    ))
+    assert [r["issue_number"] for r in get_resumable_issues(db, "run-1")] == [42]
+
+
+def test_execution_usage_accumulates_on_issue_and_run(db):
+    from dispatcher.db import get_run_spend
+
+    insert_run(db, "run-1", [42], "{}")
+    insert_issue(db, "run-1", _make_triage(42))
+    for _ in range(2):  # first attempt, then a resume
+        update_issue_execution(db, "run-1", 42, ExecutionResult(
+            issue_number=42, branch_name="fix/42", session_id="s1", num_turns=10, is_error=False,
+            pr_number=None, pr_url=None, error_message=None, outcome="failed",
+            input_tokens=100, output_tokens=50, cache_read_tokens=1000, cache_creation_tokens=10, cost_usd=0.5,
+        ))
+    row = db.execute("SELECT * FROM issues WHERE issue_number = 42").fetchone()
+    assert (row["input_tokens"], row["cache_read_tokens"], row["cost_usd"]) == (200, 2000, 1.0)
+    spend = get_run_spend(db, "run-1")
+    assert (spend["turns"], spend["tokens"], spend["cost_usd"]) == (20, 2320, 1.0)
+
+
+def test_held_jobs_are_not_claimed(db):
+    from dispatcher.db import claim_job, enqueue_job, get_job, hold_jobs
+
+    insert_run(db, "run-1", [42, 43, 44], "{}")
+    enqueue_job(db, "run-1", 42, "{}")
+    enqueue_job(db, "run-1", 43, "{}")
+    enqueue_job(db, "run-1", 44, "{}", state="held")
+    assert claim_job(db, "w1", 60, "run-1")["issue_number"] == 42
+    # #42 was claimed before it could be held
+    assert hold_jobs(db, "run-1", [42, 43]) == [43]
+    assert get_job(db, "run-1", 43)["state"] == "held"
+    assert claim_job(db, "w1", 60, "run-1") is None
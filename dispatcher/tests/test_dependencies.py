@@ -1,6 +1,6 @@
 from __future__ import annotations
 import pytest
-from dispatcher.dependencies import CycleError, extract_deps, build_dep_graph, dep_waves, find_unmet
+from dispatcher.dependencies import CycleError, extract_deps, build_dep_graph, dep_waves, find_unmet, stack_parents
 
 
 class TestExtractDeps:
@@ -114,3 +114,22 @@ class TestFindUnmet:
 
     def test_empty(self):
         assert find_unmet({}, batch=set(), closed=set()) == {}
+
+
+class TestStackParents:
+    def test_chain_stacks_on_single_prerequisite(self):
+        # #7 depends on #5 depends on #3; #9 depends on #1, which is outside the batch
+        graph = {3: [], 5: [3], 7: [5], 9: [1]}
+        parents, ambiguous = stack_parents(graph, batch={3, 5, 7, 9})
+        assert parents == {5: 3, 7: 5}
+        assert ambiguous == {}
+
+    def test_several_prerequisites_are_ambiguous(self):
+        graph = {3: [], 4: [], 5: [3, 4]}
+        parents, ambiguous = stack_parents(graph, batch={3, 4, 5})
+        assert parents == {}
+        assert ambiguous == {5: [3, 4]}
+
+    def test_cycle_raises(self):
+        with pytest.raises(CycleError):
+            stack_parents({3: [5], 5: [3]}, batch={3, 5})
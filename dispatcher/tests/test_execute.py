@@ -42,6 +42,12 @@ class TestCreateBranch:
         name = create_branch(42, "feature", _cfg())
         assert name.startswith("feat/")
 
+    @patch("dispatcher.execute.subprocess.run")
+    def test_branches_from_given_base(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        create_branch(42, "quick-fix", _cfg(), "fix/41-issue-41")
+        assert mock_run.call_args_list[1][0][0] == ["git", "checkout", "-b", "fix/42-issue-42", "origin/fix/41-issue-41"]
+
 
 class TestStash:
     @patch("dispatcher.execute.subprocess.run")
@@ -95,6 +101,123 @@ class TestExecuteIssue:
         er = execute_issue(ri, "fix/42-test", _cfg(execution_max_turns=200))
         assert er.outcome == "leash_hit"
 
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_stacked_issue_targets_prerequisite_branch(self, mock_run, mock_gh):
+        result_json = {"is_error": False, "num_turns": 15, "session_id": "s1"}
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps(result_json), "")
+        mock_gh.list_prs.return_value = [{"number": 100, "url": "https://pr/100"}]
+
+        ri = ReviewedIssue(
+            triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None,
+            base_branch="fix/41-issue-41",
+        )
+        er = execute_issue(ri, "fix/42-test", _cfg())
+        assert er.outcome == "pr_created"
+        cmd = mock_run.call_args[0][0]
+        assert "against fix/41-issue-41" in cmd[cmd.index("-p") + 1]
+        mock_gh.set_pr_base.assert_called_once_with(100, "fix/41-issue-41", "o/r")
+
+
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_routed_model_used(self, mock_run, mock_gh):
+        result_json = {"is_error": False, "num_turns": 15, "session_id": "s1"}
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps(result_json), "")
+        mock_gh.list_prs.return_value = []
+
+        ri = ReviewedIssue(triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None, model="haiku")
+        execute_issue(ri, "fix/42-test", _cfg())
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("--model") + 1] == "haiku"
+
+    @patch("dispatcher.execute.subprocess.run")
+    def test_resume_uses_routed_model_and_turn_cap(self, mock_run):
+        from dispatcher.execute import resume_issue
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps({"is_error": False}), "")
+        resume_issue("sess-1", _cfg(), model="haiku", max_turns=40)
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("--model") + 1] == "haiku"
+        assert cmd[cmd.index("--max-turns") + 1] == "40"
+
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_resume_times_out_after_the_issue_budget(self, mock_run, mock_gh):
+        from dispatcher.execute import parse_resume_result, resume_issue
+        mock_run.side_effect = subprocess.TimeoutExpired(["claude"], 600)
+        mock_gh.list_prs.return_value = []
+        raw = resume_issue("sess-1", _cfg(), timeout_seconds=600)
+        assert mock_run.call_args[1]["timeout"] == 600
+        er = parse_resume_result(42, "fix/42", raw, _cfg())
+        assert er.outcome == "timed_out"
+        assert er.session_id == "sess-1"
+        assert er.error_message == "Timed out after 10 min"
+
+    @patch("dispatcher.execute.github")
+    def test_resume_result_uses_the_issue_turn_budget_and_tier(self, mock_gh):
+        from dispatcher.execute import parse_resume_result
+        mock_gh.list_prs.return_value = []
+        raw = {"is_error": False, "num_turns": 40, "session_id": "s1"}
+        assert parse_resume_result(42, "fix/42", raw, _cfg(), max_turns=40).outcome == "leash_hit"
+        assert parse_resume_result(42, "fix/42", raw, _cfg()).outcome == "failed"
+        mock_gh.list_prs.return_value = [{"number": 7, "url": "u"}]
+        assert parse_resume_result(42, "fix/42", raw, _cfg(), "supervised-yolo", 40).outcome == "pr_created_review"
+
+
+class TestUsage:
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_usage_and_cost_are_kept(self, mock_run, mock_gh):
+        result_json = {
+            "is_error": False, "num_turns": 12, "session_id": "s1", "total_cost_usd": 1.25,
+            "usage": {
+                "input_tokens": 300, "output_tokens": 4000,
+                "cache_read_input_tokens": 90000, "cache_creation_input_tokens": 1200,
+            },
+        }
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps(result_json), "")
+        mock_gh.list_prs.return_value = [{"number": 100, "url": "https://pr/100"}]
+
+        ri = ReviewedIssue(triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None)
+        er = execute_issue(ri, "fix/42-test", _cfg())
+
+        assert (er.input_tokens, er.output_tokens, er.cache_read_tokens, er.cache_creation_tokens) == (300, 4000, 90000, 1200)
+        assert er.total_tokens == 95500
+        assert er.cost_usd == 1.25
+
+
+class TestBudgets:
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_per_issue_turn_budget_sets_leash(self, mock_run, mock_gh):
+        result_json = {"is_error": False, "num_turns": 40, "session_id": "s1"}
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps(result_json), "")
+        mock_gh.list_prs.return_value = []
+
+        ri = ReviewedIssue(triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None, max_turns=40)
+        er = execute_issue(ri, "fix/42-test", _cfg(execution_max_turns=200))
+
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("--max-turns") + 1] == "40"
+        assert er.outcome == "leash_hit"
+
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_timeout_kills_session_and_marks_it_resumable(self, mock_run, mock_gh):
+        mock_run.side_effect = subprocess.TimeoutExpired(["claude"], 900)
+        mock_gh.list_prs.return_value = []
+
+        ri = ReviewedIssue(
+            triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None, timeout_seconds=900,
+        )
+        er = execute_issue(ri, "fix/42-test", _cfg())
+
+        assert er.outcome == "timed_out"
+        assert er.error_message == "Timed out after 15 min"
+        assert mock_run.call_args[1]["timeout"] == 900
+        cmd = mock_run.call_args[0][0]
+        assert er.session_id == cmd[cmd.index("--session-id") + 1]
+
 
 class TestBuildInteractivePrompt:
     def test_prompt_uses_start_prefix(self):
@@ -150,6 +273,19 @@ class TestRunClaudeInteractive:
         er = execute_issue(ri, "fix/42-test", _cfg(), interactive=True)
         assert er.outcome == "pr_created"
         assert er.pr_number == 100
+        assert not er.usage_reported
+
+    @patch("dispatcher.execute.github")
+    @patch("dispatcher.execute.subprocess.run")
+    def test_interactive_pins_given_session_id(self, mock_run, mock_gh):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        mock_gh.list_prs.return_value = []
+
+        ri = ReviewedIssue(triage=_triage(), final_tier="full-yolo", skipped=False, edited_comment=None)
+        er = execute_issue(ri, "fix/42-test", _cfg(), interactive=True, session_id="sess-9")
+        cmd = mock_run.call_args_list[0][0][0]
+        assert cmd[cmd.index("--session-id") + 1] == "sess-9"
+        assert er.session_id == "sess-9"
 
 
 class TestGenerateParkedComment:
@@ -0,0 +1,64 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from dispatcher.db import insert_issue, insert_run, set_issue_budget, update_issue_execution
+from dispatcher.forecast import format_duration, plan, report, summary
+from dispatcher.models import Config, ExecutionResult
+from dispatcher.tests.helpers import make_reviewed
+
+
+@pytest.fixture
+def conn(db):
+    insert_run(db, "hist", [], "{}")
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    # Three quick fixes on haiku: 20 minutes, 12 turns and $0.50 each
+    for n in (1, 2, 3):
+        insert_issue(db, "hist", make_reviewed(n).triage)
+        set_issue_budget(db, "hist", n, 60, None, "haiku")
+        update_issue_execution(db, "hist", n, ExecutionResult(
+            issue_number=n, branch_name="b", session_id="s", num_turns=12, is_error=False,
+            pr_number=n, pr_url="u", error_message=None, outcome="pr_created", cost_usd=0.5,
+        ))
+        db.execute(
+            "UPDATE issues SET exec_started_at = ?, exec_finished_at = ? WHERE issue_number = ?",
+            (start.isoformat(), (start + timedelta(minutes=20)).isoformat(), n),
+        )
+    db.commit()
+    return db
+
+
+def _cfg() -> Config:
+    return Config(plugin_path="/p", execution_routes=[{"scope": "quick-fix", "model": "haiku"}])
+
+
+def test_plan_uses_routed_model_history_and_waves(conn):
+    issues = [make_reviewed(41), make_reviewed(42), make_reviewed(43, scope="feature")]
+    forecast = plan(conn, issues, _cfg(), slots=2, dep_graph={42: [41]})
+
+    (r41, e41), _, (r43, e43) = forecast.issues
+    assert (r41.model, e41.basis, e41.cost_usd) == ("haiku", "scope+tier+model", pytest.approx(0.5))
+    assert (r43.model, e43.basis) == ("claude-opus-4-6", "prior")
+    # #41 and #42 start at once (20 min each); #43's 60 min prior takes the first free slot at 20 min
+    assert forecast.makespan_seconds == pytest.approx(4800, rel=1e-3)
+    assert forecast.cost_usd == pytest.approx(1.0)
+    assert forecast.unpriced == 1
+    # Stacked, #42 waits for #41, so #43 takes the second slot at once
+    stacked = plan(conn, issues, replace(_cfg(), stack_dependents=True), slots=2, dep_graph={42: [41]})
+    assert stacked.makespan_seconds == pytest.approx(3600, rel=1e-3)
+
+
+def test_report_and_summary(conn):
+    forecast = plan(conn, [make_reviewed(41), make_reviewed(42, scope="feature")], _cfg(), slots=1)
+    lines = report(forecast)
+    assert lines[0].startswith("  #41: ~20 min, ~12 turns, $0.50 (haiku; scope+tier+model, n=3)")
+    assert "$?" in lines[1]
+    assert lines[-1] == f"  {summary(forecast)}"
+    assert "1h20m" in summary(forecast)
+    assert "+1 issue(s) without cost history" in summary(forecast)
+
+
+def test_format_duration():
+    assert format_duration(45 * 60) == "45 min"
+    assert format_duration(125 * 60) == "2h05m"
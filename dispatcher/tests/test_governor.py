@@ -0,0 +1,105 @@
+from dispatcher import db
+from dispatcher.governor import Governor, SystemSample, is_rate_limited, sample_system
+from dispatcher.models import Config, ExecutionResult
+
+_CALM = SystemSample(load_per_cpu=0.2, mem_available_mb=16000, disk_free_mb=100000)
+
+
+def _cfg(**kw) -> Config:
+    defaults = {"plugin_path": "/p", "autoscale": True, "min_parallel": 1, "max_parallel": 4}
+    defaults.update(kw)
+    return Config(**defaults)
+
+
+def _result(outcome: str = "pr_created", error: str | None = None) -> ExecutionResult:
+    return ExecutionResult(
+        issue_number=42, branch_name="fix/42", session_id=None, num_turns=3, is_error=outcome == "failed",
+        pr_number=None, pr_url=None, error_message=error, outcome=outcome,
+    )
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _governor(tmp_path, samples, **kw):
+    conn = db.init_db(str(tmp_path / "test.db"))
+    db.insert_run(conn, "run-1", [], "{}")
+    clock = _Clock()
+    feed = iter(samples)
+    gov = Governor(conn, "run-1", _cfg(**kw), tmp_path, sampler=lambda path: next(feed), clock=clock)
+    return gov, conn, clock
+
+
+def test_ramps_up_while_saturated_until_max(tmp_path):
+    gov, conn, clock = _governor(tmp_path, [_CALM] * 5, max_parallel=3)
+    for _ in range(4):
+        gov.update(running=gov.limit, queued=5)
+        clock.now += 30
+    assert gov.limit == 3
+    decisions = db.get_concurrency_decisions(conn, "run-1")
+    assert [(d["previous_limit"], d["new_limit"]) for d in decisions] == [(1, 2), (2, 3)]
+    conn.close()
+
+
+def test_holds_when_not_saturated_and_between_checks(tmp_path):
+    gov, conn, clock = _governor(tmp_path, [_CALM] * 3)
+    assert gov.update(running=0, queued=0) == 1
+    clock.now += 30
+    gov.update(running=1, queued=2)
+    assert gov.limit == 2
+    clock.now += 5  # inside the interval: no new sample
+    assert gov.update(running=2, queued=2) == 2
+    conn.close()
+
+
+def test_backs_off_under_memory_and_disk_pressure(tmp_path):
+    tight = SystemSample(load_per_cpu=0.2, mem_available_mb=512, disk_free_mb=100)
+    gov, conn, clock = _governor(tmp_path, [_CALM, _CALM, tight], min_parallel=1)
+    for sample_running in (1, 2):
+        gov.update(running=sample_running, queued=3)
+        clock.now += 30
+    assert gov.limit == 3
+    gov.update(running=3, queued=3)
+    assert gov.limit == 2
+    reason = db.get_concurrency_decisions(conn, "run-1")[-1]["reason"]
+    assert "memory" in reason and "disk" in reason
+    conn.close()
+
+
+def test_rate_limited_result_halves_limit_but_not_below_min(tmp_path):
+    gov, conn, clock = _governor(tmp_path, [_CALM] * 5, min_parallel=2, max_parallel=8)
+    assert gov.limit == 2
+    for running in (2, 3, 4):
+        gov.update(running=running, queued=4)
+        clock.now += 30
+    assert gov.limit == 5
+    gov.record_result(_result("failed", "API Error: 429 rate limit exceeded"))
+    gov.update(running=5, queued=4)
+    assert gov.limit == 2
+    last = db.get_concurrency_decisions(conn, "run-1")[-1]
+    assert last["rate_limited"] == 1
+    conn.close()
+
+
+def test_missing_readings_are_ignored(tmp_path):
+    unknown = SystemSample(load_per_cpu=None, mem_available_mb=None, disk_free_mb=None)
+    gov, conn, _ = _governor(tmp_path, [unknown])
+    assert gov.update(running=1, queued=1) == 2
+    conn.close()
+
+
+def test_is_rate_limited():
+    assert is_rate_limited(_result("failed", "Claude usage: rate_limit_error"))
+    assert is_rate_limited(_result("failed", "529 Overloaded"))
+    assert not is_rate_limited(_result("failed", "Tests failed"))
+    assert not is_rate_limited(_result())
+
+
+def test_sample_system_measures_nearest_existing_dir(tmp_path):
+    sample = sample_system(tmp_path / "not" / "created" / "yet")
+    assert sample.disk_free_mb is not None and sample.disk_free_mb >= 0
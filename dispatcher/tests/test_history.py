@@ -0,0 +1,180 @@
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from dispatcher.db import insert_issue, insert_run, set_issue_budget
+from dispatcher.history import Estimate, budget, estimate, estimate_all, fit_deadline, makespan, shortest_first
+from dispatcher.models import Config
+from dispatcher.tests.helpers import make_reviewed
+
+
+def _record(conn, number: int, minutes: float, turns: int, **kw) -> None:
+    """Insert a finished execution that took `minutes` of wall-clock time."""
+    r = make_reviewed(number, **kw)
+    insert_issue(conn, "hist", r.triage)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    conn.execute(
+        """UPDATE issues SET outcome = 'pr_created', num_turns = ?, exec_started_at = ?, exec_finished_at = ?
+        WHERE run_id = 'hist' AND issue_number = ?""",
+        (turns, start.isoformat(), (start + timedelta(minutes=minutes)).isoformat(), number),
+    )
+    conn.commit()
+
+
+@pytest.fixture
+def conn(db):
+    insert_run(db, "hist", [], "{}")
+    return db
+
+
+def test_estimate_uses_most_specific_bucket_with_enough_samples(conn):
+    for n, minutes in ((1, 10), (2, 20), (3, 30)):
+        _record(conn, n, minutes, 20, richness=4)
+    _record(conn, 4, 90, 80, richness=1)
+
+    exact = estimate(conn, make_reviewed(99, richness=4))
+    assert exact.basis == "scope+tier+richness"
+    assert exact.seconds == pytest.approx(20 * 60, rel=1e-3)
+    assert exact.turns == 20
+
+    coarser = estimate(conn, make_reviewed(99, richness=1))
+    assert coarser.basis == "scope+tier"
+    assert coarser.samples == 4
+
+
+def test_executions_without_usage_only_inform_duration(conn):
+    for n in (1, 2, 3):
+        _record(conn, n, 20, 30)
+        conn.execute("UPDATE issues SET cost_usd = 1.5 WHERE issue_number = ?", (n,))
+    for n in (4, 5, 6):
+        _record(conn, n, 40, 0)
+        conn.execute("UPDATE issues SET usage_reported = 0 WHERE issue_number = ?", (n,))
+    conn.commit()
+
+    est = estimate(conn, make_reviewed(99))
+    assert (est.samples, est.usage_samples) == (6, 3)
+    assert est.seconds == pytest.approx(30 * 60, rel=1e-3)
+    assert (est.turns, est.cost_usd) == (30, pytest.approx(1.5))
+
+
+def test_estimate_falls_back_to_scope_prior(conn):
+    est = estimate(conn, make_reviewed(99, scope="major-feature", tier="supervised-yolo"))
+    assert est.basis == "prior"
+    assert est.samples == 0
+    assert est.seconds > estimate(conn, make_reviewed(98, scope="quick-fix")).seconds
+
+
+def test_estimate_all_stores_estimates(conn):
+    insert_run(conn, "run-1", [5], "{}")
+    r = make_reviewed(5)
+    insert_issue(conn, "run-1", r.triage)
+    estimate_all(conn, "run-1", [r])
+    row = conn.execute("SELECT * FROM issues WHERE run_id = 'run-1' AND issue_number = 5").fetchone()
+    assert row["estimated_seconds"] > 0
+    assert row["estimate_basis"] == "prior"
+
+
+def test_shortest_first_puts_quick_fixes_ahead():
+    issues = [make_reviewed(1, scope="major-feature"), make_reviewed(2), make_reviewed(3, scope="feature")]
+    estimates = {1: Estimate(5400, 180, 0, "prior"), 2: Estimate(600, 20, 5, "scope"), 3: Estimate(3000, 90, 4, "scope")}
+    assert [r.triage.issue_number for r in shortest_first(issues, estimates)] == [2, 3, 1]
+
+
+def test_fit_deadline_defers_late_issues_and_their_dependents():
+    issues = [make_reviewed(n) for n in (1, 2, 3, 4)]
+    estimates = {
+        1: Estimate(600, 0, 0, "prior"),
+        2: Estimate(1200, 0, 0, "prior"),
+        3: Estimate(3000, 0, 0, "prior"),
+        4: Estimate(300, 0, 0, "prior"),
+    }
+    # Two slots, 30 min: 1 and 2 start at once, 3 would end at 60 min, 4 depends on 3
+    kept, deferred = fit_deadline(issues, estimates, slots=2, deadline_seconds=1800, dep_graph={4: [3]})
+    assert [r.triage.issue_number for r in kept] == [1, 2]
+    assert [r.triage.issue_number for r in deferred] == [3, 4]
+
+
+def test_fit_deadline_keeps_what_makespan_forecasts_in_time():
+    issues = [make_reviewed(n) for n in (1, 2, 3)]
+    estimates = {n: Estimate(seconds, 0.0, 3, "scope") for n, seconds in ((1, 600), (2, 1200), (3, 600))}
+    # Unstacked, 3 takes 1's slot at 600s; stacked, it waits for 2 and would end at 1800s
+    kept, _ = fit_deadline(issues, estimates, slots=2, deadline_seconds=1500, dep_graph={3: [2]})
+    assert len(kept) == 3
+    kept, deferred = fit_deadline(issues, estimates, slots=2, deadline_seconds=1500, dep_graph={3: [2]}, stack=True)
+    assert [r.triage.issue_number for r in deferred] == [3]
+    assert makespan(kept, estimates, slots=2, dep_graph={3: [2]}, stack=True) <= 1500
+
+
+def test_makespan_fills_slots_and_waits_for_prerequisites_when_stacking():
+    issues = [make_reviewed(n) for n in (1, 2, 3, 4)]
+    estimates = {n: Estimate(seconds, 0.0, 3, "scope") for n, seconds in ((1, 600), (2, 1200), (3, 600), (4, 300))}
+    # Two slots: 1 and 2 start at once, 3 takes 1's slot at 600s and 4 the first slot free after that
+    assert makespan(issues, estimates, slots=2, dep_graph={3: [2]}) == 1500
+    # Stacked, 3 waits for 2: 4 takes 1's slot at 600s, and 3 starts when 2 finishes at 1200s
+    assert makespan(issues, estimates, slots=2, dep_graph={3: [2]}, stack=True) == 1800
+    assert makespan(issues, estimates, slots=1) == 2700
+    assert makespan(issues[:2], estimates, slots=2, dep_graph={1: [2], 2: [1]}, stack=True) == 0.0
+    assert makespan([], {}, slots=2) == 0.0
+
+
+def test_estimate_prefers_routed_model_bucket(conn):
+    for n, minutes in ((1, 10), (2, 10), (3, 10), (4, 60), (5, 60), (6, 60)):
+        _record(conn, n, minutes, 10)
+        set_issue_budget(conn, "hist", n, 50, None, "haiku" if n <= 3 else "opus")
+
+    assert estimate(conn, replace(make_reviewed(99), model="haiku")).basis == "scope+tier+model"
+    assert estimate(conn, replace(make_reviewed(99), model="haiku")).seconds == pytest.approx(600, rel=1e-3)
+    assert estimate(conn, make_reviewed(99)).seconds == pytest.approx(2100, rel=1e-3)
+
+
+def _cfg(**kw):
+    defaults = {"plugin_path": "/p", "adaptive_budgets": True, "budget_percentile": 0.9, "budget_margin": 0.5}
+    defaults.update(kw)
+    return Config(**defaults)
+
+
+def test_budget_from_turn_and_time_percentiles(conn):
+    for n, turns in enumerate((10, 12, 14, 16, 18, 20, 22, 24, 26, 40), start=1):
+        _record(conn, n, 20, turns)
+
+    r = budget(conn, make_reviewed(99), _cfg(budget_min_turns=5))
+
+    assert r.max_turns == 42  # p90 = 26 + 0.9 * 14 = 27.4 -> x1.5 -> 41.1 -> ceil
+    assert r.timeout_seconds == pytest.approx(30 * 60, rel=1e-3)
+
+
+def test_budget_is_clamped_and_capped(conn):
+    for n in (1, 2, 3):
+        _record(conn, n, 300, 5)
+
+    r = budget(conn, make_reviewed(99), _cfg(budget_min_turns=20, execution_timeout_minutes=60))
+
+    assert r.max_turns == 20
+    assert r.timeout_seconds == 3600
+
+
+def test_budget_without_history_or_adaptive_uses_config(conn):
+    r = budget(conn, make_reviewed(99), _cfg(execution_max_turns=150, execution_timeout_minutes=45))
+    assert (r.max_turns, r.timeout_seconds) == (150, 2700)
+
+    for n in (1, 2, 3):
+        _record(conn, n, 10, 10)
+    fixed = budget(conn, make_reviewed(99), _cfg(adaptive_budgets=False, execution_max_turns=150))
+    assert (fixed.max_turns, fixed.timeout_seconds) == (150, None)
+    assert budget(conn, fixed, _cfg()) is fixed
+
+
+def test_budget_follows_execution_routes(conn):
+    cfg = _cfg(adaptive_budgets=False, execution_model="opus", execution_routes=[
+        {"scope": "quick-fix", "model": "haiku", "max_turns": 40},
+        {"tier": "supervised-yolo", "max_turns": 300},
+    ])
+
+    quick = budget(conn, make_reviewed(1), cfg)
+    feature = budget(conn, make_reviewed(2, scope="major-feature", tier="supervised-yolo"), cfg)
+    other = budget(conn, make_reviewed(3, scope="major-feature"), cfg)
+
+    assert (quick.model, quick.max_turns) == ("haiku", 40)
+    assert (feature.model, feature.max_turns) == ("opus", 300)
+    assert (other.model, other.max_turns) == ("opus", 200)
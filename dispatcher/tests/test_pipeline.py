@@ -1,4 +1,5 @@
-from unittest.mock import MagicMock, patch
+import json
+from unittest.mock import ANY, MagicMock, patch
 
 from dispatcher.models import Config, ExecutionResult, ReviewedIssue, TriageResult
 from dispatcher.pipeline import run
@@ -32,6 +33,7 @@ def _exec_result(number: int = 42, outcome: str = "pr_created") -> ExecutionResu
 @patch("dispatcher.pipeline.triage_issue")
 def test_dry_run_no_execution(mock_triage, mock_gh, mock_db):
     mock_db.init_db.return_value = MagicMock()
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = {"samples": 0}  # no history
     mock_gh.view_issue.return_value = {"title": "Test", "body": "Body", "comments": []}
     mock_triage.return_value = _triage()
 
@@ -163,6 +165,7 @@ def test_no_issues_selected_returns_0(mock_triage, mock_gh, mock_db):
 @patch("dispatcher.pipeline.triage_issue")
 def test_auto_mode_calls_list_issues(mock_triage, mock_gh, mock_db):
     mock_db.init_db.return_value = MagicMock()
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = {"samples": 0}  # no history
     mock_gh.list_issues.return_value = [{"number": 42}]
     mock_gh.view_issue.return_value = {"title": "Test", "body": "Body", "comments": []}
     mock_triage.return_value = _triage()
@@ -215,10 +218,11 @@ def test_resume_re_executes_failed(mock_gh, mock_triage, mock_unstash, mock_stas
         "issue_title": "Test", "issue_url": "url",
         "scope": "quick-fix", "richness_score": 4,
         "richness_signals": "{}", "confidence": 0.9,
-        "risk_flags": "[]", "missing_info": "[]", "reasoning": "ok",
+        "risk_flags": "[]", "missing_info": "[]", "triage_reasoning": "ok",
     }[key]
 
     mock_db.get_resumable_issues.return_value = [resumable_row]
+    mock_db.get_unfinished_jobs.return_value = []
     mock_gh.view_issue.return_value = {"title": "Test", "body": "Body", "comments": []}
     mock_triage.return_value = _triage()
     mock_stash.return_value = False
@@ -247,10 +251,11 @@ def test_resume_uses_session_id(mock_unstash, mock_stash, mock_resume, mock_db):
         "issue_title": "Test", "issue_url": "url",
         "scope": "quick-fix", "richness_score": 4,
         "richness_signals": "{}", "confidence": 0.9,
-        "risk_flags": "[]", "missing_info": "[]", "reasoning": "ok",
+        "risk_flags": "[]", "missing_info": "[]", "triage_reasoning": "ok",
     }[key]
 
     mock_db.get_resumable_issues.return_value = [resumable_row]
+    mock_db.get_unfinished_jobs.return_value = []
     mock_stash.return_value = False
     mock_resume.return_value = {
         "is_error": False, "num_turns": 3, "session_id": "sess-abc",
@@ -261,6 +266,63 @@ def test_resume_uses_session_id(mock_unstash, mock_stash, mock_resume, mock_db):
     assert mock_resume.call_args[0][0] == "sess-abc"
 
 
+@patch("dispatcher.pipeline.resume_issue")
+@patch("dispatcher.pipeline.stash_if_dirty")
+def test_resume_reuses_retained_worktree_without_stashing(mock_stash, mock_resume, tmp_path):
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42], "{}")
+    real_db.update_run_stage(conn, "run-1", "execution")
+    real_db.insert_issue(conn, "run-1", _triage(42))
+    real_db.update_issue_execution(conn, "run-1", 42, _exec_result(42, outcome="leash_hit"))
+    kept = tmp_path / "issue-42"
+    kept.mkdir()
+    real_db.retain_worktree(conn, "run-1", 42, str(kept), "fix/42-issue-42", "leash_hit")
+    mock_resume.return_value = {"is_error": False, "num_turns": 3, "session_id": "sess-1"}
+
+    with patch("dispatcher.execute._find_pr", return_value=(7, "url")), \
+            patch("dispatcher.pipeline.worktree.remove_worktree") as mock_remove:
+        code = run(_cfg(resume="run-1", auto=True, dry_run=False, issues=[], db_path=db_path))
+
+    assert code == 0
+    mock_stash.assert_not_called()
+    assert mock_resume.call_args.kwargs["cwd"] == kept
+    mock_remove.assert_called_once_with(kept, ANY)
+    assert real_db.get_retained_worktrees(conn) == []
+    conn.close()
+
+
+@patch("dispatcher.pipeline._run_parallel_execution")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.stash_if_dirty")
+def test_resume_several_issues_runs_them_in_parallel(mock_stash, mock_tmux, mock_parallel, tmp_path):
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    real_db.update_run_stage(conn, "run-1", "execution")
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    real_db.update_issue_execution(conn, "run-1", 42, _exec_result(42, outcome="leash_hit"))
+    real_db.mark_issues_unfinished(conn, "run-1", [43], "interrupted", "Not started: run interrupted")
+    mock_tmux.is_tmux_available.return_value = True
+    mock_parallel.return_value = ([_exec_result(42), _exec_result(43)], 20)
+
+    code = run(_cfg(resume="run-1", auto=True, dry_run=False, issues=[], db_path=db_path))
+
+    assert code == 0
+    mock_stash.assert_not_called()
+    reviewed = {r.triage.issue_number: r for r in mock_parallel.call_args[0][2]}
+    assert (reviewed[42].resume_session_id, reviewed[42].resume_branch) == ("sess-1", "fix/42-issue-42")
+    assert (reviewed[43].resume_session_id, reviewed[43].resume_branch) == (None, None)
+    outcomes = conn.execute("SELECT outcome FROM issues WHERE run_id = 'run-1'").fetchall()
+    assert [row["outcome"] for row in outcomes] == [None, None]
+    conn.close()
+
+
 @patch("dispatcher.pipeline.db")
 @patch("dispatcher.pipeline.stash_if_dirty")
 def test_resume_max_attempts_skips(mock_stash, mock_db):
@@ -277,10 +339,11 @@ def test_resume_max_attempts_skips(mock_stash, mock_db):
         "issue_title": "Test", "issue_url": "url",
         "scope": "quick-fix", "richness_score": 4,
         "richness_signals": "{}", "confidence": 0.9,
-        "risk_flags": "[]", "missing_info": "[]", "reasoning": "ok",
+        "risk_flags": "[]", "missing_info": "[]", "triage_reasoning": "ok",
     }[key]
 
     mock_db.get_resumable_issues.return_value = [resumable_row]
+    mock_db.get_unfinished_jobs.return_value = []
     mock_stash.return_value = False
 
     # Should complete without executing (max attempts reached)
@@ -323,6 +386,33 @@ def test_rate_limit_tracker_progressive_backoff():
     assert tracker.backoff_seconds() == 900  # 15 minutes
 
 
+def test_summary_shows_unknown_cost_for_interactive_executions(capsys):
+    from dataclasses import replace
+    from dispatcher.pipeline import _print_summary
+
+    results = [replace(_exec_result(42), usage_reported=False)]
+    _print_summary(results, [], 0, 0, 0.0, _cfg(), triage_cost=0.25)
+    out = capsys.readouterr().out
+    assert "Cost: execution unknown, triage $0.25" in out
+    assert "1 execution(s) ran in interactive or killed sessions" in out
+
+
+def test_turn_budget_sums_the_budgets_stored_on_issue_rows():
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _turn_budget
+
+    conn = real_db.init_db(":memory:")
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    # #42 got an adaptive budget; #43 ran with the configured cap
+    real_db.set_issue_budget(conn, "run-1", 42, 35, 600)
+    issues = [ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None) for n in (42, 43)]
+
+    assert _turn_budget(conn, "run-1", issues, _cfg(execution_max_turns=200)) == 235
+    conn.close()
+
+
 # --- Task 6: Parallel execution tests ---
 
 from dispatcher.pipeline import _build_worker_cmd, _run_execution, _run_parallel_execution, _run_sequential_execution
@@ -362,6 +452,66 @@ def test_sequential_fallback_single_issue_with_tmux(mock_branch, mock_exec, mock
     mock_tmux.create_session.assert_not_called()
 
 
+@patch("dispatcher.pipeline.execute_issue")
+@patch("dispatcher.pipeline.create_branch")
+def test_sequential_stacks_dependents_on_prerequisite_pr(mock_branch, mock_exec, tmp_path):
+    """#42 branches from #41's PR branch; #43 is not started because #42 opened no PR."""
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _Stack
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [41, 42, 43], "{}")
+    for n in (41, 42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    mock_branch.side_effect = lambda n, scope, config, base=None: f"fix/{n}-issue-{n}"
+    mock_exec.side_effect = [
+        _exec_result(41),
+        ExecutionResult(
+            issue_number=42, branch_name="fix/42-issue-42", session_id="s", num_turns=5, is_error=True,
+            pr_number=None, pr_url=None, error_message="No PR created", outcome="failed",
+        ),
+    ]
+    to_execute = [
+        ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None)
+        for n in (41, 42, 43)
+    ]
+
+    results, _ = _run_sequential_execution(conn, "run-1", to_execute, _cfg(), _Stack({42: 41, 43: 42}))
+
+    assert mock_branch.call_args_list[1][0][3] == "fix/41-issue-41"
+    assert mock_exec.call_args_list[1][0][0].base_branch == "fix/41-issue-41"
+    assert mock_exec.call_count == 2
+    assert [er.outcome for er in results] == ["pr_created", "failed", "failed"]
+    assert "prerequisite #42" in results[2].error_message
+    assert real_db.get_resumable_issues(conn, "run-1")[-1]["issue_number"] == 43
+    conn.close()
+
+
+@patch("dispatcher.pipeline.execute_issue")
+@patch("dispatcher.pipeline.create_branch")
+def test_sequential_budget_hold_leaves_issues_resumable(mock_branch, mock_exec, tmp_path):
+    from dispatcher import db as real_db
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [41, 42, 43], "{}")
+    for n in (41, 42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    mock_branch.side_effect = lambda n, scope, config, base=None: f"fix/{n}-issue-{n}"
+    mock_exec.return_value = _exec_result(41)
+    to_execute = [
+        ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None)
+        for n in (41, 42, 43)
+    ]
+
+    with patch("dispatcher.pipeline.budget.RunBudget.check", side_effect=[None, "turns budget: spent 40 + expected 40 > 60"]):
+        results, _ = _run_sequential_execution(conn, "run-1", to_execute, _cfg())
+
+    assert mock_exec.call_count == 1
+    assert [er.outcome for er in results] == ["pr_created", "interrupted", "interrupted"]
+    assert [row["issue_number"] for row in real_db.get_resumable_issues(conn, "run-1")] == [42, 43]
+    conn.close()
+
+
 @patch("dispatcher.pipeline.time")
 @patch("dispatcher.pipeline.worktree")
 @patch("dispatcher.pipeline.tmux")
@@ -383,6 +533,8 @@ def test_parallel_execution_tmux_path(mock_tmux, mock_worktree, mock_time):
     conn = MagicMock()
     # Simulate DB returning execution results for both issues
     def fake_execute_row(sql, params):
+        if len(params) < 2:  # retained-worktree bookkeeping
+            return MagicMock(fetchall=MagicMock(return_value=[]))
         num = params[1]
         row = MagicMock()
         row.__getitem__ = lambda self, key: {
@@ -390,6 +542,8 @@ def test_parallel_execution_tmux_path(mock_tmux, mock_worktree, mock_time):
             "session_id": "sess-1", "num_turns": 5, "is_error": 0,
             "pr_number": 101, "pr_url": f"https://github.com/o/r/pull/101",
             "error_message": None, "outcome": "pr_created",
+            "input_tokens": 100, "output_tokens": 20, "cache_read_tokens": 0,
+            "cache_creation_tokens": 0, "cost_usd": 0.05, "usage_reported": 1,
         }[key]
         mock_fetchone = MagicMock(return_value=row)
         return MagicMock(fetchone=mock_fetchone)
@@ -426,11 +580,12 @@ def test_parallel_execution_tmux_path(mock_tmux, mock_worktree, mock_time):
 @patch("dispatcher.pipeline.db")
 @patch("dispatcher.pipeline.github")
 @patch("dispatcher.pipeline.triage_issue")
-def test_parallel_cleanup_on_interrupt(mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time):
-    """Verify worktrees and tmux are cleaned up even on interrupt."""
+def test_parallel_second_interrupt_keeps_worktrees(mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time):
+    """A hard interrupt stops the tmux session but keeps worktrees and records issues as resumable."""
     from pathlib import Path
 
     mock_db.init_db.return_value = MagicMock()
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None  # no outcome rows
     mock_gh.view_issue.return_value = {"title": "Test", "body": "Body", "comments": []}
     mock_triage.side_effect = [_triage(42), _triage(43)]
     mock_tmux.is_tmux_available.return_value = True
@@ -442,9 +597,14 @@ def test_parallel_cleanup_on_interrupt(mock_triage, mock_gh, mock_db, mock_wt, m
     mock_tmux.get_pane_status.return_value = []  # no panes finished yet
 
     code = run(_cfg(issues=[42, 43], auto=True, dry_run=False, max_parallel=4))
-    # Cleanup should still happen
-    mock_tmux.kill_session.assert_called_once()
-    mock_wt.cleanup_all.assert_called_once()
+    assert code == 1
+    mock_tmux.kill_session.assert_called()
+    mock_db.mark_issues_unfinished.assert_called_once_with(
+        mock_db.init_db.return_value, ANY, [42, 43], "interrupted", "Interrupted: session stopped",
+    )
+    retained = [c.args[2] for c in mock_db.retain_worktree.call_args_list]
+    assert retained == [42, 43]
+    mock_wt.remove_worktree.assert_not_called()
 
 
 @patch("dispatcher.pipeline.time")
@@ -453,11 +613,12 @@ def test_parallel_cleanup_on_interrupt(mock_triage, mock_gh, mock_db, mock_wt, m
 @patch("dispatcher.pipeline.db")
 @patch("dispatcher.pipeline.github")
 @patch("dispatcher.pipeline.triage_issue")
-def test_parallel_cleanup_when_kill_session_fails(mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time):
-    """worktree.cleanup_all runs even if tmux.kill_session raises."""
+def test_parallel_interrupt_survives_kill_session_failure(mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time):
+    """Running issues are still recorded as interrupted if tmux.kill_session raises."""
     from pathlib import Path
 
     mock_db.init_db.return_value = MagicMock()
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None  # no outcome rows
     mock_gh.view_issue.return_value = {"title": "Test", "body": "Body", "comments": []}
     mock_triage.side_effect = [_triage(42), _triage(43)]
     mock_tmux.is_tmux_available.return_value = True
@@ -468,9 +629,51 @@ def test_parallel_cleanup_when_kill_session_fails(mock_triage, mock_gh, mock_db,
     mock_tmux.get_pane_status.return_value = []
     mock_tmux.kill_session.side_effect = RuntimeError("tmux not found")
 
-    code = run(_cfg(issues=[42, 43], auto=True, dry_run=False, max_parallel=4))
-    # cleanup_all must still be called even though kill_session raised
+    run(_cfg(issues=[42, 43], auto=True, dry_run=False, max_parallel=4))
+    mock_db.mark_issues_unfinished.assert_called_once()
+    assert mock_db.retain_worktree.call_count == 2
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.tmux")
+def test_first_interrupt_drains_running_and_records_queued(mock_tmux, mock_wt, mock_time, tmp_path):
+    import signal
+    from pathlib import Path
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _run_parallel_execution
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [41, 42, 43], "{}")
+    for n in (41, 42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    mock_wt.create_worktree.side_effect = lambda n, *_: Path(f"/wt/{n}")
+    mock_tmux.launch_in_pane.side_effect = [0, 1]
+    mock_tmux.get_pane_status.return_value = []
+    sleeps = []
+
+    def sleep(_seconds):
+        sleeps.append(_seconds)
+        if len(sleeps) == 2:  # first sleep is fill_slots' launch delay
+            signal.raise_signal(signal.SIGINT)
+        elif len(sleeps) == 3:
+            for n in (41, 42):
+                real_db.update_issue_execution(conn, "run-1", n, _exec_result(n))
+            mock_tmux.get_pane_status.return_value = [(0, False, 0), (1, False, 0)]
+
+    mock_time.sleep.side_effect = sleep
+    to_execute = [ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None) for n in (41, 42, 43)]
+
+    results, _ = _run_parallel_execution(conn, "run-1", to_execute, _cfg(max_parallel=2))
+
+    assert sorted((er.issue_number, er.outcome) for er in results) == [
+        (41, "pr_created"), (42, "pr_created"), (43, "interrupted"),
+    ]
+    assert [r["issue_number"] for r in real_db.get_resumable_issues(conn, "run-1")] == [43]
+    assert real_db.get_unfinished_jobs(conn, "run-1") == []
     mock_wt.cleanup_all.assert_called_once()
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+    conn.close()
 
 
 @patch("dispatcher.pipeline.time")
@@ -497,13 +700,16 @@ def test_parallel_execution_batching(mock_tmux, mock_worktree, mock_time):
 
     conn = MagicMock()
     def fake_execute_row(sql, params):
+        if len(params) < 2:  # retained-worktree bookkeeping
+            return MagicMock(fetchall=MagicMock(return_value=[]))
         num = params[1]
         row = MagicMock()
         row.__getitem__ = lambda self, key: {
             "issue_number": num, "branch_name": f"fix/{num}",
             "session_id": "s", "num_turns": 3, "is_error": 0,
             "pr_number": 1, "pr_url": "url", "error_message": None,
-            "outcome": "pr_created",
+            "outcome": "pr_created", "input_tokens": 0, "output_tokens": 0,
+            "cache_read_tokens": 0, "cache_creation_tokens": 0, "cost_usd": 0.0, "usage_reported": 1,
         }[key]
         return MagicMock(fetchone=MagicMock(return_value=row))
 
@@ -576,3 +782,724 @@ def test_build_worker_cmd_unsets_all_claude_env_vars():
     assert "CLAUDE_CODE_SSE_PORT" in cmd
     assert "CLAUDE_CODE_ENTRYPOINT" in cmd
     assert "CLAUDE_CODE_EXPERIMENTAL_AGENT_TEAMS" in cmd
+    assert "--remove-input-files" in cmd
+
+
+def test_config_json_leaves_out_secrets():
+    from dispatcher.pipeline import _config_json
+    data = json.loads(_config_json(_cfg(webhook_secret="s3cret", webhook_port=8080)))
+    assert "webhook_secret" not in data
+    assert data["webhook_port"] == 8080
+
+
+# --- Resumable triage tests ---
+
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_resume_triage_stage_only_triages_remainder(mock_triage, mock_gh, tmp_path):
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    real_db.insert_issue(conn, "run-1", _triage(42))
+    real_db.save_issue_snapshot(conn, 42, {"number": 42, "title": "Issue 42", "body": "", "state": "open"})
+    conn.close()
+
+    mock_gh.view_issue.return_value = {"number": 43, "title": "Issue 43", "body": "", "state": "open", "comments": []}
+    mock_triage.return_value = _triage(43)
+
+    code = run(_cfg(resume="run-1", auto=True, dry_run=True, issues=[], db_path=db_path))
+    assert code == 0
+    # Only the untriaged issue is fetched and triaged again
+    mock_gh.view_issue.assert_called_once_with(43, "o/r")
+    assert mock_triage.call_count == 1
+
+    conn = real_db.init_db(db_path)
+    rows = real_db.get_triaged_issues(conn, "run-1")
+    assert sorted(r["issue_number"] for r in rows) == [42, 43]
+    run_row = conn.execute("SELECT * FROM runs WHERE id = 'run-1'").fetchone()
+    assert run_row["stage"] == "review"
+    assert run_row["status"] == "completed"
+    conn.close()
+
+
+@patch("dispatcher.pipeline._review_and_execute", return_value=0)
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_resume_review_stage_reuses_all_triage(mock_triage, mock_gh, mock_review, tmp_path):
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    real_db.insert_issue(conn, "run-1", _triage(42))
+    real_db.insert_issue(conn, "run-1", _triage(43))
+    real_db.update_run_stage(conn, "run-1", "review")
+    conn.close()
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+
+    code = run(_cfg(resume="run-1", auto=True, dry_run=True, issues=[], db_path=db_path))
+    assert code == 0
+    mock_triage.assert_not_called()
+    triage_results = mock_review.call_args[0][2]
+    assert sorted(tr.issue_number for tr in triage_results) == [42, 43]
+
+
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_resume_triage_skips_issues_executed_while_streaming(mock_triage, mock_gh, tmp_path):
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    real_db.insert_issue(conn, "run-1", _triage(42))
+    real_db.insert_issue(conn, "run-1", _triage(43))
+    real_db.update_issue_execution(conn, "run-1", 42, _exec_result(42))
+    conn.close()
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+
+    with patch("dispatcher.pipeline._review_and_execute", return_value=0) as mock_review:
+        run(_cfg(resume="run-1", auto=True, dry_run=True, issues=[], db_path=db_path))
+    mock_triage.assert_not_called()
+    triage_results = mock_review.call_args[0][2]
+    assert [tr.issue_number for tr in triage_results] == [43]
+
+
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_resume_mid_triage_finishes_streamed_jobs_before_triage(mock_triage, mock_gh, tmp_path):
+    from dataclasses import asdict
+    from dispatcher import db as real_db
+
+    db_path = str(tmp_path / "test.db")
+    conn = real_db.init_db(db_path)
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    real_db.update_run_stage(conn, "run-1", "triage")
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+    # #42 was streamed and is still running; #43 waited for review
+    real_db.enqueue_job(conn, "run-1", 42, json.dumps(asdict(
+        ReviewedIssue(triage=_triage(42), final_tier="full-yolo", skipped=False, edited_comment=None),
+    )))
+    real_db.lease_job(conn, "run-1", 42, "dispatcher-run-1", 0, lease_seconds=60)
+    conn.close()
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+
+    with patch("dispatcher.pipeline._resume_jobs", return_value=0) as mock_jobs, \
+         patch("dispatcher.pipeline._review_and_execute", return_value=0) as mock_review:
+        run(_cfg(resume="run-1", auto=True, dry_run=True, issues=[], db_path=db_path))
+    mock_jobs.assert_called_once()
+    assert [tr.issue_number for tr in mock_review.call_args[0][2]] == [43]
+
+
+# --- Streaming triage → execution tests ---
+
+def _stream_cfg(**kw) -> Config:
+    return _cfg(issues=[42, 43], dry_run=False, stream=True, **kw)
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_stream_launches_confident_issue_while_triage_continues(
+    mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time,
+):
+    import threading
+    from pathlib import Path
+
+    launched = threading.Event()
+    overlapped = []
+
+    def fake_triage(issue_data, number, url, config, attempts=None):
+        if number == 43:
+            # Triage of #43 only finishes once #42 has been launched
+            overlapped.append(launched.wait(timeout=5))
+        return _triage(number)
+
+    def fake_launch(session, pane_idx, cmd):
+        launched.set()
+        return pane_idx
+
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+    mock_triage.side_effect = fake_triage
+    mock_tmux.is_tmux_available.return_value = True
+    mock_tmux.launch_in_pane.side_effect = fake_launch
+    mock_tmux.get_pane_status.return_value = [(0, False, 1), (1, False, 1)]
+    mock_wt.create_worktree.side_effect = lambda n, base, root: Path(f"/wt/{n}")
+    mock_time.time.return_value = 1000.0
+
+    run(_stream_cfg())
+
+    assert overlapped == [True]
+    assert [c[0][0] for c in mock_wt.create_worktree.call_args_list] == [42, 43]
+    mock_tmux.create_session.assert_called_once()
+    mock_wt.cleanup_all.assert_called_once()
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_stream_holds_dependents_of_unreleased_issues(
+    mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time, capsys,
+):
+    from dataclasses import replace
+    from pathlib import Path
+
+    bodies = {42: "", 43: "Depends on #42"}
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": bodies[n], "state": "open"}
+    # #42 is below the streaming threshold, so #43 must wait for the wave ordering
+    mock_triage.side_effect = lambda data, n, url, cfg, attempts=None: (
+        replace(_triage(n), confidence=0.6) if n == 42 else _triage(n)
+    )
+    mock_tmux.is_tmux_available.return_value = True
+    mock_tmux.launch_in_pane.side_effect = lambda s, i, c: i
+    mock_tmux.get_pane_status.return_value = [(0, False, 1), (1, False, 1)]
+    mock_wt.create_worktree.side_effect = lambda n, base, root: Path(f"/wt/{n}")
+    mock_time.time.return_value = 1000.0
+
+    run(_stream_cfg())
+
+    assert "Streaming #" not in capsys.readouterr().out
+    assert [c[0][0] for c in mock_wt.create_worktree.call_args_list] == [42, 43]
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_stream_first_interrupt_stops_triage_and_waits_for_running(
+    mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time,
+):
+    import signal
+    import threading
+    from pathlib import Path
+
+    launched = threading.Event()
+    interrupted = threading.Event()
+
+    def fake_triage(issue_data, number, url, config, attempts=None):
+        if number == 43:
+            launched.wait(timeout=5)
+            interrupted.set()
+            signal.raise_signal(signal.SIGINT)  # Ctrl-C while #42 runs and #43 is in triage
+        return _triage(number)
+
+    def fake_launch(session, pane_idx, cmd):
+        launched.set()
+        return pane_idx
+
+    def sleep(_seconds):
+        if interrupted.is_set():  # #42 finishes while the dispatcher waits for it
+            mock_tmux.get_pane_status.return_value = [(0, False, 0)]
+
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+    mock_triage.side_effect = fake_triage
+    mock_tmux.is_tmux_available.return_value = True
+    mock_tmux.launch_in_pane.side_effect = fake_launch
+    mock_tmux.get_pane_status.return_value = [(0, True, None)]
+    mock_wt.create_worktree.side_effect = lambda n, base, root: Path(f"/wt/{n}")
+    mock_time.time.return_value = 1000.0
+    mock_time.sleep.side_effect = sleep
+
+    code = run(_stream_cfg())
+
+    assert code == 1
+    assert [c[0][0] for c in mock_wt.create_worktree.call_args_list] == [42]  # #43 never launched
+    assert not any(
+        c.args[4] == "Interrupted: session stopped" for c in mock_db.mark_issues_unfinished.call_args_list
+    )  # running session was not abandoned
+    mock_db.update_run_status.assert_called_with(mock_db.init_db.return_value, ANY, "failed")
+    assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
+
+
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_stream_falls_back_to_batch_without_tmux(mock_triage, mock_gh, mock_db, mock_tmux):
+    mock_db.init_db.return_value = MagicMock()
+    mock_gh.view_issue.return_value = {"title": "Test", "body": "", "comments": []}
+    mock_triage.side_effect = [_triage(42), _triage(43)]
+    mock_tmux.is_tmux_available.return_value = False
+
+    with patch("dispatcher.pipeline._run_streaming") as mock_stream, \
+         patch("dispatcher.pipeline.execute_issue", return_value=_exec_result()), \
+         patch("dispatcher.pipeline.create_branch"):
+        run(_stream_cfg())
+    mock_stream.assert_not_called()
+
+
+def test_release_ready_orders_prerequisites_first():
+    from dispatcher.pipeline import _release_ready
+
+    candidates = [_triage(43), _triage(42), _triage(44)]
+    graph = {43: [42], 42: [], 44: [41]}
+    ready = _release_ready(candidates, graph, batch={41, 42, 43, 44}, released={})
+    assert [tr.issue_number for tr in ready] == [42, 43]
+    # #44 waits for #41, which is still in triage
+    assert [tr.issue_number for tr in candidates] == [44]
+
+
+# --- Background triage prefetch tests ---
+
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_run_triage_reuses_prefetched_results(mock_triage, mock_gh, mock_db):
+    from dispatcher.pipeline import _TriagePrefetcher, _run_triage
+
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+    mock_triage.side_effect = lambda data, n, url, cfg, attempts=None: _triage(n)
+    prefetch = _TriagePrefetcher(_cfg())
+    prefetch.submit([42])
+
+    results, raw = _run_triage(MagicMock(), "run-1", [42, 43], _cfg(), prefetch)
+    prefetch.close()
+
+    assert [tr.issue_number for tr in results] == [42, 43]
+    # #42 came from the prefetcher, #43 was triaged in the foreground; neither twice
+    assert sorted(c[0][0] for c in mock_gh.view_issue.call_args_list) == [42, 43]
+    assert mock_triage.call_count == 2
+    assert mock_db.insert_issue.call_count == 2
+
+
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_prefetcher_predictions_skip_failures(mock_triage, mock_gh):
+    from concurrent.futures import wait
+    from dispatcher.pipeline import _TriagePrefetcher
+    from dispatcher.triage import TriageError
+
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+
+    def fake_triage(data, n, url, cfg, attempts=None):
+        if n == 43:
+            raise TriageError("bad output")
+        return _triage(n)
+
+    mock_triage.side_effect = fake_triage
+    prefetch = _TriagePrefetcher(_cfg())
+    prefetch.submit([42, 43])
+    wait(list(prefetch._futures.values()))
+    assert list(prefetch.predictions()) == [42]
+    prefetch.retain([42])
+    assert prefetch.take(43) is None
+    prefetch.close()
+
+
+# --- Serve mode tests ---
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+@patch("dispatcher.pipeline.triage_issue")
+def test_serve_dispatches_new_issues_and_drains(mock_triage, mock_gh, mock_db, mock_wt, mock_tmux, mock_time):
+    from dataclasses import replace
+    from pathlib import Path
+    from dispatcher.pipeline import _ShutdownRequest, serve
+
+    shutdown = _ShutdownRequest()
+    mock_db.init_db.return_value.execute.return_value.fetchone.return_value = None
+    mock_db.get_previous_triage.return_value = None
+    mock_gh.list_issues.return_value = [
+        {"number": 42, "title": "A", "updatedAt": "t1"},
+        {"number": 43, "title": "B", "updatedAt": "t1"},
+    ]
+    mock_gh.view_issue.side_effect = lambda n, repo: {"number": n, "body": "", "state": "open"}
+    mock_triage.side_effect = lambda data, n, url, cfg, attempts=None: (
+        replace(_triage(n), triage_tier="parked") if n == 43 else _triage(n)
+    )
+    mock_tmux.is_tmux_available.return_value = True
+    mock_tmux.launch_in_pane.return_value = 0
+    mock_tmux.get_pane_status.side_effect = lambda session: [(0, not shutdown.requested, 0)]
+    mock_wt.create_worktree.return_value = Path("/wt/42")
+    mock_time.time.return_value = 1000.0
+    # SIGTERM arrives once the first execution has been launched
+    mock_time.sleep.side_effect = lambda s: setattr(shutdown, "requested", True)
+
+    code = serve(_cfg(issues=[], auto=False, dry_run=False), shutdown=shutdown)
+
+    assert code == 0
+    mock_tmux.launch_in_pane.assert_called_once()
+    mock_gh.post_comment.assert_called_once()
+    assert mock_gh.post_comment.call_args[0][0] == 43
+    mock_db.add_run_issue.assert_any_call(mock_db.init_db.return_value, mock_db.insert_run.call_args[0][1], 42)
+    mock_db.update_run_status.assert_called_with(mock_db.init_db.return_value, mock_db.insert_run.call_args[0][1], "completed")
+    mock_wt.cleanup_all.assert_called_once()
+
+
+@patch("dispatcher.pipeline._make_executor")
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.tmux")
+def test_serve_abandons_running_sessions_on_second_interrupt(mock_tmux, mock_db, mock_make):
+    from dispatcher.pipeline import _ShutdownRequest, serve
+
+    mock_tmux.is_tmux_available.return_value = True
+    executor = mock_make.return_value
+    executor.poll.side_effect = KeyboardInterrupt
+    executor.abandon.return_value = [_exec_result(42, outcome="interrupted")]
+
+    assert serve(_cfg(issues=[]), shutdown=_ShutdownRequest()) == 1
+
+    assert [c[0] for c in executor.method_calls[-2:]] == ["abandon", "close"]
+    assert mock_db.update_run_status.call_args[0][2] == "failed"
+
+
+@patch("dispatcher.pipeline.tmux")
+def test_serve_requires_tmux(mock_tmux):
+    from dispatcher.pipeline import serve
+
+    mock_tmux.is_tmux_available.return_value = False
+    assert serve(_cfg()) == 2
+
+
+@patch("dispatcher.pipeline.db")
+@patch("dispatcher.pipeline.github")
+def test_poll_label_only_returns_new_or_updated_issues(mock_gh, mock_db):
+    from dispatcher.pipeline import _poll_label
+
+    mock_gh.list_issues.return_value = [
+        {"number": 1, "updatedAt": "t1"},  # unchanged
+        {"number": 2, "updatedAt": "t2"},  # updated since last triage
+        {"number": 3, "updatedAt": "t3"},  # parked comment just posted
+        {"number": 4, "updatedAt": "t1"},  # new, already has a PR
+        {"number": 5, "updatedAt": "t1"},  # new
+    ]
+    mock_db.get_previous_triage.side_effect = lambda conn, n: {"outcome": "pr_created" if n == 4 else None}
+    seen = {1: "t1", 2: "t1", 3: None}
+
+    changed = _poll_label(MagicMock(), _cfg(), seen)
+
+    assert changed == [(2, "t2"), (5, "t1")]
+    assert seen[3] == "t3"
+    assert seen[4] == "t1"
+
+
+def test_shutdown_request_aborts_on_second_signal():
+    import signal
+    import pytest
+    from dispatcher.pipeline import _ShutdownRequest
+
+    shutdown = _ShutdownRequest()
+    shutdown._handle(signal.SIGTERM, None)
+    assert shutdown.requested
+    with pytest.raises(KeyboardInterrupt):
+        shutdown._handle(signal.SIGTERM, None)
+
+
+@patch("dispatcher.pipeline.db")
+def test_apply_intake_queues_labeled_and_drops_closed(mock_db):
+    from dispatcher.pipeline import _PaneExecutor, _apply_intake
+
+    mock_db.claim_intake.return_value = [
+        {"issue_number": 42, "action": "labeled", "updated_at": "t1"},
+        {"issue_number": 43, "action": "edited", "updated_at": "t1"},  # unchanged since last triage
+        {"issue_number": 44, "action": "closed", "updated_at": "t2"},
+    ]
+    mock_db.get_previous_triage.return_value = None
+    executor = _PaneExecutor(MagicMock(), "run-1", _cfg())
+    executor.submit(ReviewedIssue(triage=_triage(44), final_tier="full-yolo", skipped=False, edited_comment=None))
+    pending = [(44, "t1")]
+
+    _apply_intake(MagicMock(), pending, {43: "t1"}, executor)
+
+    assert pending == [(42, "t1")]
+    assert executor.issue_numbers == set()
+
+
+# --- Job recovery tests ---
+
+@patch("dispatcher.pipeline.tmux")
+def test_executor_recover_adopts_live_and_requeues_expired(mock_tmux, tmp_path):
+    from dataclasses import asdict
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _PaneExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [41, 42, 43, 44], "{}")
+    for n in (41, 42, 43, 44):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+        real_db.enqueue_job(
+            conn, "run-1", n,
+            json.dumps(asdict(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))),
+        )
+    real_db.lease_job(conn, "run-1", 41, "dispatcher-run-1", 0, lease_seconds=60)  # live worker
+    real_db.lease_job(conn, "run-1", 42, "dispatcher-run-1", 1, lease_seconds=-1)  # pane alive, heartbeat stopped
+    real_db.lease_job(conn, "run-1", 43, "dispatcher-run-1", 2, lease_seconds=60)  # finished while we were down
+    real_db.update_issue_execution(conn, "run-1", 43, _exec_result(43))
+    # 44 was still queued
+    mock_tmux.get_pane_status.return_value = [(0, True, None), (1, True, None), (2, False, 0)]
+
+    executor = _PaneExecutor(conn, "run-1", _cfg())
+    assert executor.recover() == (1, 2)
+
+    mock_tmux.stop_pane.assert_called_once_with(executor.session_name, 1)
+    assert executor._free_panes == [1, 2]
+
+    assert {r.triage.issue_number for r in executor.tracked} == {41, 42, 44}
+    assert executor.running_count == 1
+    states = {j["issue_number"]: j["state"] for j in real_db.get_unfinished_jobs(conn, "run-1")}
+    assert states == {41: "leased", 42: "queued", 44: "queued"}
+    conn.close()
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.tmux")
+def test_executor_waits_on_tmux_control_connection(mock_tmux, mock_time, tmp_path):
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _PaneExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [], "{}")
+    mock_tmux.get_pane_status.return_value = [(0, True, None)]
+
+    polling = _PaneExecutor(conn, "run-1", _cfg())
+    polling.recover()
+    polling.wait(5)
+    mock_tmux.connect.assert_not_called()
+    mock_time.sleep.assert_called_once_with(5)
+
+    control = _PaneExecutor(conn, "run-1", _cfg(tmux_control_mode=True))
+    control.recover()  # re-attaches to the surviving session
+    mock_tmux.connect.assert_called_once_with("dispatcher-run-1")
+    control.wait(5)
+    mock_tmux.connect.return_value.wait.assert_called_once_with(5)
+    assert mock_time.sleep.call_count == 1
+    conn.close()
+
+
+@patch("dispatcher.pipeline.watchdog.activity_fingerprint", return_value="same")
+@patch("dispatcher.pipeline.tmux")
+def test_executor_reclaims_stalled_pane_as_resumable(mock_tmux, _fingerprint, tmp_path):
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _PaneExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [42], "{}")
+    real_db.insert_issue(conn, "run-1", _triage(42))
+    executor = _PaneExecutor(conn, "run-1", _cfg(stall_minutes=10, stall_grace_minutes=5))
+    executor.submit(ReviewedIssue(triage=_triage(42), final_tier="full-yolo", skipped=False, edited_comment=None))
+    executor._running[0] = executor._queue.pop()
+    executor.watchdog._clock = clock = MagicMock(return_value=0.0)
+    mock_tmux.get_pane_status.return_value = [(0, True, None)]
+    real_db.record_issue_session(conn, "run-1", 42, "fix/42-issue-42-2", "sess-42")  # worker started
+
+    executor.poll()
+    clock.return_value = 600.0
+    assert executor.poll() == []
+    assert real_db.get_job(conn, "run-1", 42)["stalled_at"] is not None
+    clock.return_value = 900.0
+    executor.poll()  # reclaim: result written, pane stopped
+    mock_tmux.stop_pane.assert_called_once_with(executor.session_name, 0)
+
+    mock_tmux.get_pane_status.return_value = [(0, False, 124)]
+    (er,) = executor.poll()
+    assert er.outcome == "stalled"
+    assert "no activity for 15 min" in er.error_message
+    assert executor.running_count == 0
+    (row,) = real_db.get_resumable_issues(conn, "run-1")
+    assert (row["issue_number"], row["session_id"], row["branch_name"]) == (42, "sess-42", "fix/42-issue-42-2")
+    conn.close()
+
+
+def test_pull_executor_collects_results_and_requeues_lost_leases(tmp_path):
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _PullExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    executor = _PullExecutor(conn, "run-1", _cfg(execution_backend="pull"))
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+        executor.submit(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))
+    executor.fill_slots()
+    assert executor.queued_count == 2
+
+    # One worker finishes #42; another claims #43 and then goes silent
+    real_db.claim_job(conn, "host-a:1", 60, "run-1")
+    real_db.update_issue_execution(conn, "run-1", 42, _exec_result(42))
+    real_db.finish_job(conn, "run-1", 42)
+    real_db.claim_job(conn, "host-b:1", -1, "run-1")
+
+    finished = executor.poll()
+
+    assert [er.issue_number for er in finished] == [42]
+    assert executor.issue_numbers == {43}
+    assert real_db.get_job(conn, "run-1", 43)["state"] == "queued"
+    conn.close()
+
+
+def test_pull_executor_writes_budget_refused_jobs_held(tmp_path):
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _PullExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-1", [42, 43], "{}")
+    # The quick-fix prior expects 30 turns, so only one issue fits
+    executor = _PullExecutor(conn, "run-1", _cfg(execution_backend="pull", run_max_turns=50))
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-1", _triage(n))
+        executor.submit(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))
+
+    # Held at submission, before any fill_slots() could park it
+    assert real_db.get_job(conn, "run-1", 43)["state"] == "held"
+    assert real_db.claim_job(conn, "host-a:1", 60, "run-1")["issue_number"] == 42
+    assert real_db.claim_job(conn, "host-a:1", 60, "run-1") is None
+    assert [r.triage.issue_number for r in executor.held] == [43]
+    assert executor.admission_closed.startswith("turns budget")
+    conn.close()
+
+
+# --- Persistent worker tests ---
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.tmux")
+def test_socket_executor_reuses_worker_pane_for_next_issue(mock_tmux, mock_wt, mock_time, tmp_path):
+    import socket
+    import threading
+    from dataclasses import asdict
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _make_executor, _SocketPaneExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-sock", [42, 43], "{}")
+    executor = _make_executor(conn, "run-sock", _cfg(persistent_workers=True, max_parallel=1))
+    assert isinstance(executor, _SocketPaneExecutor)
+    mock_wt.create_worktree.side_effect = lambda n, base, root: tmp_path / f"wt-{n}"
+    mock_tmux.get_pane_status.return_value = [(0, True, None)]
+    jobs = []
+
+    def fake_worker():
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(str(executor.socket_path))
+        stream = sock.makefile("rw", encoding="utf-8")
+        stream.write(json.dumps({"type": "hello", "pid": 1}) + "\n")
+        stream.flush()
+        for line in stream:
+            msg = json.loads(line)
+            if msg["type"] == "stop":
+                break
+            jobs.append(msg)
+            number = msg["issue"]["triage"]["issue_number"]
+            stream.write(json.dumps({"type": "result", "exit_code": 0, "result": asdict(_exec_result(number))}) + "\n")
+            stream.flush()
+        sock.close()
+
+    worker = threading.Thread(target=fake_worker)
+    mock_tmux.launch_in_pane.side_effect = lambda session, idx, cmd: worker.start() or idx
+
+    def run_one(number):
+        real_db.insert_issue(conn, "run-sock", _triage(number))
+        executor.submit(ReviewedIssue(triage=_triage(number), final_tier="full-yolo", skipped=False, edited_comment=None))
+        executor.fill_slots()
+        for _ in range(200):
+            finished = executor.poll()
+            if finished:
+                return finished
+            threading.Event().wait(0.01)
+        raise AssertionError("no result from worker")
+
+    try:
+        assert [er.issue_number for er in run_one(42)] == [42]
+        assert [er.issue_number for er in run_one(43)] == [43]
+    finally:
+        executor.close()
+        worker.join(timeout=5)
+
+    assert mock_tmux.launch_in_pane.call_count == 1
+    assert "--socket" in mock_tmux.launch_in_pane.call_args[0][2]
+    assert [job["cwd"] for job in jobs] == [str(tmp_path / "wt-42"), str(tmp_path / "wt-43")]
+    assert real_db.get_unfinished_jobs(conn, "run-sock") == []
+    assert not executor.socket_path.exists()
+    conn.close()
+
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.tmux")
+def test_socket_executor_records_worker_that_never_connects(mock_tmux, mock_wt, mock_time, tmp_path):
+    from dispatcher import db as real_db
+    from dispatcher.pipeline import _make_executor, _SocketPaneExecutor
+
+    conn = real_db.init_db(str(tmp_path / "test.db"))
+    real_db.insert_run(conn, "run-sock", [42, 43], "{}")
+    executor = _make_executor(conn, "run-sock", _cfg(persistent_workers=True, max_parallel=2))
+    mock_wt.create_worktree.side_effect = lambda n, base, root: tmp_path / f"wt-{n}"
+    mock_tmux.launch_in_pane.side_effect = lambda session, idx, cmd: idx
+    for n in (42, 43):
+        real_db.insert_issue(conn, "run-sock", _triage(n))
+        executor.submit(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))
+
+    link = MagicMock(closed=False)
+    with patch.object(_SocketPaneExecutor, "_accept", side_effect=[RuntimeError("Worker did not connect"), link]):
+        executor.fill_slots()
+
+    mock_tmux.stop_pane.assert_called_once_with(executor.session_name, 0)
+    assert [r.triage.issue_number for r in executor._running.values()] == [43]
+    assert [(er.issue_number, er.outcome) for er in executor.results] == [(42, "failed")]
+    assert [row["issue_number"] for row in real_db.get_resumable_issues(conn, "run-sock")] == [42]
+    assert link.send.call_args[0][0]["issue"]["triage"]["issue_number"] == 43
+    conn.close()
+
+
+# --- Autoscaling tests ---
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.db")
+def test_pane_executor_launches_up_to_governor_limit(mock_db, mock_tmux, mock_wt, mock_time):
+    from dispatcher.pipeline import _PaneExecutor
+
+    executor = _PaneExecutor(MagicMock(), "run-1", _cfg(autoscale=True, min_parallel=2, max_parallel=6))
+    executor.governor.update = MagicMock(return_value=2)
+    mock_tmux.launch_in_pane.side_effect = lambda session, idx, cmd: idx
+    for n in (41, 42, 43):
+        executor.submit(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))
+
+    executor.fill_slots()
+
+    assert executor.limit == 2
+    assert executor.running_count == 2
+    assert executor.queued_count == 1
+    executor.governor.update.assert_called_once_with(0, 3)
+
+
+# --- Run budget tests ---
+
+@patch("dispatcher.pipeline.time")
+@patch("dispatcher.pipeline.worktree")
+@patch("dispatcher.pipeline.tmux")
+@patch("dispatcher.pipeline.db")
+def test_pane_executor_holds_queue_when_run_budget_refuses(mock_db, mock_tmux, mock_wt, mock_time):
+    from dispatcher.pipeline import _PaneExecutor
+
+    executor = _PaneExecutor(MagicMock(), "run-1", _cfg(run_max_cost_usd=5.0))
+    executor.budget.check = MagicMock(side_effect=[None, "cost budget: spent $4.00 + expected $2.00 > $5.00"])
+    mock_tmux.launch_in_pane.side_effect = lambda session, idx, cmd: idx
+    for n in (41, 42, 43):
+        executor.submit(ReviewedIssue(triage=_triage(n), final_tier="full-yolo", skipped=False, edited_comment=None))
+
+    executor.fill_slots()
+
+    assert executor.running_count == 1
+    assert executor.queued_count == 0
+    assert [r.triage.issue_number for r in executor.held] == [42, 43]
+    assert executor.admission_closed.startswith("cost budget")
+    assert mock_db.hold_jobs.call_args[0][1:] == ("run-1", [42, 43])
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from dispatcher import db
+from dispatcher.models import Config, ExecutionResult, TriageResult
+from dispatcher.pipeline import _RateLimitTracker, simulate as simulate_run
+from dispatcher.simulate import Policy, SimJob, report, simulate
+
+
+def _job(n: int, minutes: float, succeeded: bool = True, confidence: float = 0.9, deps=()) -> SimJob:
+    return SimJob(n, minutes * 60, succeeded, confidence, estimate_seconds=minutes * 60, deps=tuple(deps))
+
+
+def _policy(slots: int, **kwargs) -> Policy:
+    return Policy(slots=slots, launch_delay_seconds=0, poll_seconds=1, **kwargs)
+
+
+class TestSimulate:
+    def test_parallel_slots_shorten_makespan(self):
+        jobs = [_job(1, 10), _job(2, 10), _job(3, 10)]
+        one = simulate(jobs, _policy(1), _RateLimitTracker)
+        three = simulate(jobs, _policy(3), _RateLimitTracker)
+        assert one.makespan_seconds == 1800
+        assert three.makespan_seconds == 600
+        assert three.utilisation == pytest.approx(1.0)
+
+    def test_shortest_first_ranks_by_estimate(self):
+        # #1 was expected to be quick, so sjf starts it alongside #2 instead of leaving it for last
+        jobs = [
+            SimJob(1, 1200, True, 0.1, estimate_seconds=300),
+            _job(2, 10, confidence=0.9),
+            _job(3, 10, confidence=0.8),
+        ]
+        assert simulate(jobs, _policy(2), _RateLimitTracker).makespan_seconds == 1800
+        assert simulate(jobs, _policy(2, order="sjf"), _RateLimitTracker).makespan_seconds == 1200
+
+    def test_launch_delay_and_poll_interval_cost_slot_time(self):
+        result = simulate([_job(1, 1)], Policy(slots=1, launch_delay_seconds=5, poll_seconds=10), _RateLimitTracker)
+        assert result.makespan_seconds == 70  # 5s launch + 60s run, noticed at the 70s poll
+        assert result.busy_seconds == 65
+
+    def test_only_stacked_dependents_wait_for_their_prerequisite(self):
+        jobs = [_job(1, 10), _job(2, 10, deps=[1]), _job(3, 10)]
+        assert simulate(jobs, _policy(3), _RateLimitTracker).makespan_seconds == 600
+        assert simulate(jobs, _policy(3, stack=True), _RateLimitTracker).makespan_seconds == 1200
+
+    def test_consecutive_failures_pause_launches(self):
+        jobs = [_job(1, 1, succeeded=False), _job(2, 1, succeeded=False), _job(3, 1)]
+        with_backoff = simulate(jobs, _policy(1, backoff=True), _RateLimitTracker)
+        without = simulate(jobs, _policy(1), _RateLimitTracker)
+        assert with_backoff.backoff_seconds == 300
+        assert with_backoff.makespan_seconds == 180 + 300
+        assert without.makespan_seconds == 180
+        assert with_backoff.failed == 2
+
+    def test_stacking_skips_dependents_of_a_failed_prerequisite(self):
+        jobs = [_job(1, 10, succeeded=False), _job(2, 10, deps=[1]), _job(3, 10, deps=[2])]
+        unstacked = simulate(jobs, _policy(1), _RateLimitTracker)
+        stacked = simulate(jobs, _policy(1, stack=True), _RateLimitTracker)
+        assert unstacked.cascaded == stacked.cascaded == 2
+        assert unstacked.makespan_seconds == 1800
+        assert stacked.makespan_seconds == 600
+
+    def test_cycle_leaves_issues_unscheduled(self):
+        jobs = [_job(1, 10, deps=[2]), _job(2, 10, deps=[1]), _job(3, 10)]
+        result = simulate(jobs, _policy(2, stack=True), _RateLimitTracker)
+        assert result.unscheduled == 2
+        assert result.makespan_seconds == 600
+
+    def test_report_lists_best_makespan_first(self):
+        jobs = [_job(1, 10), _job(2, 10)]
+        results = [simulate(jobs, _policy(n), _RateLimitTracker) for n in (1, 2)]
+        lines = report(results)
+        assert "2 slot(s), confidence" in lines[1]
+        assert "1 slot(s), confidence" in lines[2]
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = str(tmp_path / "test.db")
+    conn = db.init_db(path)
+    db.insert_run(conn, "run-1", [1, 2, 3], '{"max_parallel": 1}')
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    for i, (n, outcome) in enumerate([(1, "pr_created"), (2, "pr_created"), (3, "failed")]):
+        db.insert_issue(conn, "run-1", TriageResult(
+            issue_number=n, issue_title=f"Issue {n}", issue_url="url",
+            scope="quick-fix", richness_score=4, richness_signals={},
+            triage_tier="full-yolo", confidence=0.9, risk_flags=[], missing_info=[], reasoning="ok",
+        ))
+        db.update_issue_execution(conn, "run-1", n, ExecutionResult(
+            issue_number=n, branch_name="b", session_id="s", num_turns=10, is_error=outcome == "failed",
+            pr_number=None, pr_url=None, error_message=None, outcome=outcome,
+        ))
+        began = start + timedelta(minutes=10 * i)
+        conn.execute(
+            "UPDATE issues SET exec_started_at = ?, exec_finished_at = ? WHERE issue_number = ?",
+            (began.isoformat(), (began + timedelta(minutes=10)).isoformat(), n),
+        )
+    conn.commit()
+    db.save_issue_snapshot(conn, 2, {"number": 2, "body": "Depends on #1"})
+    conn.close()
+    return path
+
+
+class TestSimulateRun:
+    def test_replays_latest_run_under_each_policy(self, recorded, capsys):
+        assert simulate_run(Config(plugin_path="/p", db_path=recorded), slots=[1, 3]) == 0
+        out = capsys.readouterr().out
+        assert "Simulating run run-1: 3 execution(s), recorded 30 min on 1 slot(s)" in out
+        # 2 orders x stacking on/off (#2 depends on #1) for 3 slots, and x sequential backoff (a failure) for 1
+        assert out.count("slot(s),") == 12
+        assert "1 slot(s), confidence, sequential with backoff" in out
+        assert "3 slot(s), confidence, sequential with backoff" not in out
+        assert "3 slot(s), confidence, stacked" in out
+
+    def test_unknown_run(self, recorded, capsys):
+        assert simulate_run(Config(plugin_path="/p", db_path=recorded), run_id="nope") == 1
+        assert "Run nope not found." in capsys.readouterr().out
@@ -1,7 +1,17 @@
+import queue
+import shutil
 import subprocess
-from unittest.mock import patch
+import threading
+import time
+import uuid
+from unittest.mock import MagicMock, patch
 
+import pytest
+
+from dispatcher import tmux
 from dispatcher.tmux import (
+    capture_pane,
+    connect,
     create_session,
     get_pane_status,
     is_tmux_available,
@@ -9,6 +19,7 @@ from dispatcher.tmux import (
     launch_in_pane,
     respawn_pane,
     send_keys,
+    stop_pane,
 )
 
 
@@ -54,6 +65,32 @@ class TestLaunchInPane:
         assert "echo hello" in split_cmd
 
 
+class TestSlotsBeyondOneWindow:
+    @patch("dispatcher.tmux.subprocess.run")
+    def test_first_slot_of_a_window_opens_it(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        assert launch_in_pane("disp-abc", 4, "echo hello") == 4
+        cmds = [c[0][0] for c in mock_run.call_args_list]
+        assert cmds[0][:3] == ["tmux", "new-window", "-d"]
+        assert "disp-abc:1" in cmds[0]
+        assert "remain-on-exit" in cmds[1]
+        assert "disp-abc:1.0" in cmds[2] and "echo hello" in cmds[2]
+
+    @patch("dispatcher.tmux.subprocess.run")
+    def test_later_slots_split_their_own_window(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "2\n", "")
+        assert launch_in_pane("disp-abc", 6, "echo hello") == 6
+        split_cmd = mock_run.call_args_list[0][0][0]
+        assert "split-window" in split_cmd
+        assert "disp-abc:1" in split_cmd
+
+    @patch("dispatcher.tmux.subprocess.run")
+    def test_send_keys_addresses_the_slots_window(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        send_keys("disp-abc", 9, "hi", enter=False)
+        assert "disp-abc:2.1" in mock_run.call_args[0][0]
+
+
 class TestRespawnPane:
     @patch("dispatcher.tmux.subprocess.run")
     def test_respawns_dead_pane(self, mock_run):
@@ -69,12 +106,13 @@ class TestGetPaneStatus:
     @patch("dispatcher.tmux.subprocess.run")
     def test_parses_pane_output(self, mock_run):
         mock_run.return_value = subprocess.CompletedProcess(
-            [], 0, "0 0 \n1 1 0\n2 1 1\n", "",
+            [], 0, "0 0 0 \n0 1 1 0\n1 1 1 1\n", "",
         )
         statuses = get_pane_status("disp-abc")
         assert statuses[0] == (0, True, None)   # alive
         assert statuses[1] == (1, False, 0)      # dead, exit 0
-        assert statuses[2] == (2, False, 1)      # dead, exit 1
+        assert statuses[2] == (5, False, 1)      # window 1, pane 1: dead, exit 1
+        assert "-s" in mock_run.call_args[0][0]  # every window of the session
 
     @patch("dispatcher.tmux.subprocess.run")
     def test_returns_empty_on_error(self, mock_run):
@@ -115,3 +153,82 @@ class TestKillSession:
         cmd = mock_run.call_args[0][0]
         assert "kill-session" in cmd
         assert "disp-abc" in cmd
+
+
+class TestControlMode:
+    def test_commands_go_over_connected_client(self, monkeypatch):
+        client = MagicMock(connected=True)
+        client.command.return_value = "0 0 1 0\n"
+        monkeypatch.setitem(tmux._clients, "disp-abc", client)
+        with patch("dispatcher.tmux.subprocess.run") as mock_run:
+            assert get_pane_status("disp-abc") == [(0, False, 0)]
+            mock_run.assert_not_called()
+        assert client.command.call_args[0][0] == "list-panes"
+
+    @patch("dispatcher.tmux.subprocess.run")
+    def test_falls_back_to_subprocess_when_connection_dropped(self, mock_run, monkeypatch):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "", "")
+        monkeypatch.setitem(tmux._clients, "disp-abc", MagicMock(connected=False))
+        respawn_pane("disp-abc", 1, "echo hi")
+        assert "respawn-pane" in mock_run.call_args[0][0]
+
+    def test_reply_timeout_retires_the_connection(self, monkeypatch):
+        monkeypatch.setattr(tmux, "_TIMEOUT", 0.01)
+        client = tmux.ControlClient.__new__(tmux.ControlClient)
+        client._proc = MagicMock()
+        client._proc.poll.return_value = None
+        client._lock = threading.Lock()
+        client._replies = queue.Queue()
+        client._closed = False
+        with pytest.raises(subprocess.TimeoutExpired):
+            client.command("list-panes")
+        assert not client.connected
+        client._proc.stdin.close.assert_called_once()
+
+    @patch("dispatcher.tmux.subprocess.run")
+    def test_kill_session_closes_connection(self, mock_run, monkeypatch):
+        client = MagicMock()
+        monkeypatch.setitem(tmux._clients, "disp-abc", client)
+        kill_session("disp-abc")
+        client.close.assert_called_once()
+        assert "disp-abc" not in tmux._clients
+
+
+@pytest.mark.skipif(shutil.which("tmux") is None, reason="tmux not installed")
+class TestControlClientLive:
+    def test_pane_exit_wakes_wait_and_commands_round_trip(self):
+        name = f"dispatcher-test-{uuid.uuid4().hex[:8]}"
+        create_session(name)
+        try:
+            client = connect(name)
+            assert client is not None and client.connected
+            assert launch_in_pane(name, 1, "sleep 0.2; exit 3") == 1
+            send_keys(name, 0, "echo 'quoted; {braces} $HOME'", enter=False)
+
+            started = time.monotonic()
+            assert client.wait(10)
+            assert time.monotonic() - started < 5
+            # tmux doesn't always record the exit status of a pane that dies this fast
+            assert (1, False) in [(idx, alive) for idx, alive, _ in get_pane_status(name)]
+            assert "echo 'quoted; {braces} $HOME'" in capture_pane(name, 0)
+            with pytest.raises(subprocess.CalledProcessError):
+                tmux._run(name, ["no-such-command"])
+        finally:
+            kill_session(name)
+        assert not client.connected
+
+    def test_sixteen_slots_fit_a_detached_session(self):
+        name = f"dispatcher-test-{uuid.uuid4().hex[:8]}"
+        create_session(name)
+        try:
+            slots = [launch_in_pane(name, n, "sleep 30") for n in range(16)]
+            assert slots == list(range(16))
+            assert sorted(idx for idx, alive, _ in get_pane_status(name) if alive) == slots
+            stop_pane(name, 13)
+            time.sleep(0.5)
+            assert (13, False) in [(idx, alive) for idx, alive, _ in get_pane_status(name)]
+        finally:
+            kill_session(name)
+
+    def test_connect_to_missing_session_returns_none(self):
+        assert connect(f"dispatcher-missing-{uuid.uuid4().hex[:8]}") is None
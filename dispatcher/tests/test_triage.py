@@ -5,7 +5,14 @@ from unittest.mock import patch
 import pytest
 
 from dispatcher.models import Config
-from dispatcher.triage import TriageError, build_triage_prompt, triage_issue, validate_tier
+from dispatcher.triage import (
+    TRIAGE_SCHEMA,
+    TriageError,
+    build_triage_prompt,
+    triage_issue,
+    validate_schema,
+    validate_tier,
+)
 
 
 class TestValidateTier:
@@ -58,8 +65,9 @@ class TestTriageIssue:
         assert tr.triage_tier == "full-yolo"
         assert tr.issue_number == 42
 
+    @patch("dispatcher.triage.time.sleep")
     @patch("dispatcher.triage.subprocess.run")
-    def test_invalid_json(self, mock_run):
+    def test_invalid_json(self, mock_run, mock_sleep):
         mock_run.return_value = subprocess.CompletedProcess(
             args=[], returncode=0, stdout="not json",
         )
@@ -84,3 +92,167 @@ class TestTriageIssue:
         cfg = Config(plugin_path="/p", repo="o/r")
         tr = triage_issue(issue_data, 42, "url", cfg)
         assert tr.triage_tier == "parked"  # Matrix overrides model's full-yolo
+
+
+def _claude_stdout(triage_json: dict, cost: float = 0.01) -> str:
+    return json.dumps({
+        "is_error": False, "result": json.dumps(triage_json), "num_turns": 1,
+        "session_id": "s1", "total_cost_usd": cost,
+        "usage": {"input_tokens": 120, "output_tokens": 30, "cache_read_input_tokens": 400},
+    })
+
+
+def _triage_json(scope: str = "quick-fix", richness: int = 4, tier: str = "full-yolo", confidence: float = 0.95) -> dict:
+    return {
+        "scope": scope, "richness_score": richness,
+        "richness_signals": {"acceptance_criteria": True, "resolved_discussion": True, "concrete_examples": True, "structured_content": True},
+        "triage_tier": tier, "confidence": confidence,
+        "risk_flags": [], "missing_info": [], "reasoning": "ok",
+    }
+
+
+class TestTriageCascade:
+    _ISSUE = {"title": "Fix typo", "body": "Typo in README", "comments": []}
+
+    def _cfg(self, **kw) -> Config:
+        defaults = {"plugin_path": "/p", "repo": "o/r", "triage_cascade_model": "claude-haiku-4-5"}
+        defaults.update(kw)
+        return Config(**defaults)
+
+    @patch("dispatcher.triage.subprocess.run")
+    def test_confident_cascade_result_accepted(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(confidence=0.95)))
+        attempts = []
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg(), attempts=attempts)
+        assert tr.triage_tier == "full-yolo"
+        assert mock_run.call_count == 1
+        assert "claude-haiku-4-5" in mock_run.call_args[0][0]
+        assert [(a.stage, a.accepted) for a in attempts] == [("cascade", True)]
+        assert attempts[0].cost_usd == 0.01
+        assert (attempts[0].input_tokens, attempts[0].output_tokens, attempts[0].cache_read_tokens) == (120, 30, 400)
+
+    @patch("dispatcher.triage.subprocess.run")
+    def test_low_confidence_escalates(self, mock_run):
+        mock_run.side_effect = [
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(confidence=0.6))),
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(confidence=0.9), cost=0.05)),
+        ]
+        attempts = []
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg(), attempts=attempts)
+        assert tr.confidence == 0.9
+        assert "claude-sonnet-4-6" in mock_run.call_args_list[1][0][0]
+        assert [(a.stage, a.accepted) for a in attempts] == [("cascade", False), ("final", True)]
+
+    @patch("dispatcher.triage.subprocess.run")
+    def test_tier_inconsistent_with_matrix_escalates(self, mock_run):
+        # Confident, but the matrix overrides the model's tier -> escalate.
+        mock_run.side_effect = [
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(scope="feature", richness=1, confidence=0.95))),
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(scope="feature", richness=1, tier="parked"))),
+        ]
+        attempts = []
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg(), attempts=attempts)
+        assert tr.triage_tier == "parked"
+        assert mock_run.call_count == 2
+        assert attempts[0].accepted is False
+
+    @patch("dispatcher.triage.time.sleep")
+    @patch("dispatcher.triage.subprocess.run")
+    def test_cascade_error_escalates(self, mock_run, mock_sleep):
+        mock_run.side_effect = [
+            subprocess.CompletedProcess([], 0, "not json"),
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json())),
+        ]
+        attempts = []
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg(triage_max_retries=0), attempts=attempts)
+        assert tr.triage_tier == "full-yolo"
+        assert attempts[0].error_message is not None
+        assert (attempts[1].stage, attempts[1].accepted) == ("final", True)
+
+    @patch("dispatcher.triage.subprocess.run")
+    def test_no_cascade_model_uses_triage_model_only(self, mock_run):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json(confidence=0.5)))
+        attempts = []
+        triage_issue(self._ISSUE, 42, "url", self._cfg(triage_cascade_model=""), attempts=attempts)
+        assert mock_run.call_count == 1
+        assert [(a.stage, a.model) for a in attempts] == [("final", "claude-sonnet-4-6")]
+
+
+class TestValidateSchema:
+    def test_valid_triage_object(self):
+        assert validate_schema(_triage_json(), json.loads(TRIAGE_SCHEMA)) == []
+
+    def test_reports_enum_range_and_missing_keys(self):
+        data = _triage_json(tier="yolo", confidence=1.5)
+        del data["reasoning"]
+        errors = validate_schema(data, json.loads(TRIAGE_SCHEMA))
+        assert any("triage_tier" in e for e in errors)
+        assert any("confidence" in e and "maximum" in e for e in errors)
+        assert any("reasoning" in e and "missing" in e for e in errors)
+
+    def test_bool_is_not_an_integer(self):
+        data = _triage_json()
+        data["richness_score"] = True
+        assert validate_schema(data, json.loads(TRIAGE_SCHEMA)) == ["$.richness_score: expected integer, got bool"]
+
+
+class TestTriageRetries:
+    _ISSUE = {"title": "Fix typo", "body": "Typo in README", "comments": []}
+
+    def _cfg(self, **kw) -> Config:
+        defaults = {"plugin_path": "/p", "repo": "o/r"}
+        defaults.update(kw)
+        return Config(**defaults)
+
+    @patch("dispatcher.triage.subprocess.run")
+    def test_requests_schema_constrained_output(self, mock_run):
+        envelope = {"is_error": False, "result": "", "structured_output": _triage_json(), "total_cost_usd": 0.02}
+        mock_run.return_value = subprocess.CompletedProcess([], 0, json.dumps(envelope))
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg())
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("--json-schema") + 1] == TRIAGE_SCHEMA
+        assert tr.scope == "quick-fix"
+
+    @patch("dispatcher.triage.time.sleep")
+    @patch("dispatcher.triage.subprocess.run")
+    def test_schema_violation_retried_with_repair_prompt(self, mock_run, mock_sleep):
+        bad = _triage_json()
+        del bad["risk_flags"]
+        mock_run.side_effect = [
+            subprocess.CompletedProcess([], 0, _claude_stdout(bad)),
+            subprocess.CompletedProcess([], 0, _claude_stdout(_triage_json())),
+        ]
+        attempts = []
+        tr = triage_issue(self._ISSUE, 42, "url", self._cfg(triage_retry_backoff_seconds=1.5), attempts=attempts)
+        assert tr.triage_tier == "full-yolo"
+        repair_prompt = mock_run.call_args_list[1][0][0][2]
+        assert "Previous Answer Rejected" in repair_prompt
+        assert "risk_flags" in repair_prompt
+        mock_sleep.assert_called_once_with(1.5)
+        assert [(a.retry, a.accepted) for a in attempts] == [(0, False), (1, True)]
+        assert "risk_flags" in attempts[0].error_message
+
+    @patch("dispatcher.triage.time.sleep")
+    @patch("dispatcher.triage.subprocess.run")
+    def test_retries_are_bounded_with_backoff(self, mock_run, mock_sleep):
+        mock_run.return_value = subprocess.CompletedProcess([], 0, "not json")
+        attempts = []
+        with pytest.raises(TriageError):
+            triage_issue(self._ISSUE, 42, "url", self._cfg(triage_max_retries=2), attempts=attempts)
+        assert mock_run.call_count == 3
+        assert [c[0][0] for c in mock_sleep.call_args_list] == [2.0, 4.0]
+        assert [a.retry for a in attempts] == [0, 1, 2]
+        assert all(a.error_message for a in attempts)
+
+    @patch("dispatcher.triage.time.sleep")
+    @patch("dispatcher.triage.subprocess.run")
+    def test_claude_error_not_retried(self, mock_run, mock_sleep):
+        mock_run.return_value = subprocess.CompletedProcess(
+            [], 0, json.dumps({"is_error": True, "subtype": "error_during_execution"}),
+        )
+        attempts = []
+        with pytest.raises(TriageError):
+            triage_issue(self._ISSUE, 42, "url", self._cfg(), attempts=attempts)
+        assert mock_run.call_count == 1
+        mock_sleep.assert_not_called()
+        assert len(attempts) == 1
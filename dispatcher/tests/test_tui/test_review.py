@@ -89,3 +89,20 @@ async def test_review_dep_warning_banner_hidden_when_no_unmet():
     async with app.run_test() as pilot:
         banner = app.query_one("#dep-warning")
         assert banner.visible is False
+
+
+@pytest.mark.asyncio
+async def test_review_forecast_footer_follows_skips():
+    seen = []
+
+    def forecast(reviewed):
+        planned = [r for r in reviewed if not r.skipped]
+        seen.append(len(planned))
+        return f"Forecast: {len(planned)} issue(s)"
+
+    app = ReviewApp(triage_results=[_triage(42), _triage(43)], forecast=forecast)
+    async with app.run_test() as pilot:
+        assert "2 issue(s)" in str(app.query_one("#forecast").content)
+        await pilot.press("s")
+        assert "1 issue(s)" in str(app.query_one("#forecast").content)
+    assert seen == [2, 1]
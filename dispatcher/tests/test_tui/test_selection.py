@@ -64,3 +64,25 @@ async def test_selection_no_dep_suffix_when_no_unmet():
         sl = app.query_one(SelectionList)
         labels = [str(opt.prompt) for opt in sl._options]
         assert not any("needs" in label for label in labels)
+
+
+@pytest.mark.asyncio
+async def test_selection_shows_predicted_tier():
+    from dispatcher.models import TriageResult
+
+    issues = [{"number": 5, "title": "Implement login"}, {"number": 6, "title": "Fix typo"}]
+    predictions: dict = {}
+    app = SelectionApp(issues=issues, parked_numbers=set(), label="test", predictions=lambda: predictions)
+    async with app.run_test():
+        sl = app.query_one(SelectionList)
+        assert all("triaging" in str(opt.prompt) for opt in sl._options)
+
+        predictions[6] = TriageResult(
+            issue_number=6, issue_title="Fix typo", issue_url="u", scope="quick-fix",
+            richness_score=3, richness_signals={}, triage_tier="full-yolo", confidence=0.91,
+            risk_flags=[], missing_info=[], reasoning="",
+        )
+        app.refresh_predictions()
+        labels = [str(opt.prompt) for opt in sl._options]
+        assert "triaging" in labels[0]
+        assert labels[1].endswith("full-yolo (0.91)")
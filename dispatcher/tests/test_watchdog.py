@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+from dispatcher.watchdog import FLAG, RECLAIM, RESUMED, Watchdog, activity_fingerprint
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_flags_then_reclaims_idle_session():
+    clock = _Clock()
+    dog = Watchdog(stall_seconds=600, grace_seconds=300, sample_seconds=30, clock=clock)
+    assert dog.observe(42, "a") is None
+    clock.now = 599
+    assert dog.observe(42, "a") is None
+    clock.now = 600
+    assert dog.observe(42, "a") == FLAG
+    clock.now = 700
+    assert dog.observe(42, "a") is None  # flagged once
+    clock.now = 900
+    assert dog.observe(42, "a") == RECLAIM
+    assert dog.idle_seconds(42) == 900
+
+
+def test_activity_resets_the_clock_and_clears_flag():
+    clock = _Clock()
+    dog = Watchdog(stall_seconds=60, grace_seconds=60, clock=clock)
+    dog.observe(42, "a")
+    clock.now = 60
+    assert dog.observe(42, "a") == FLAG
+    clock.now = 90
+    assert dog.observe(42, "b") == RESUMED
+    clock.now = 140
+    assert dog.observe(42, "b") is None
+    assert dog.idle_seconds(42) == 50
+
+
+def test_due_respects_sample_interval():
+    clock = _Clock()
+    dog = Watchdog(stall_seconds=60, grace_seconds=60, sample_seconds=30, clock=clock)
+    assert dog.due(42)
+    dog.observe(42, "a")
+    clock.now = 29
+    assert not dog.due(42)
+    clock.now = 30
+    assert dog.due(42)
+    dog.forget(42)
+    assert dog.due(42)
+
+
+@patch("dispatcher.watchdog.tmux")
+def test_fingerprint_tracks_pane_output_and_worktree(mock_tmux, tmp_path):
+    mock_tmux.capture_pane.return_value = "thinking..."
+    first = activity_fingerprint("s", 0, tmp_path)
+    assert activity_fingerprint("s", 0, tmp_path) == first
+    mock_tmux.capture_pane.return_value = "Edited file.py"
+    assert activity_fingerprint("s", 0, tmp_path) != first
@@ -0,0 +1,83 @@
+from pathlib import Path
+
+import pytest
+
+from dispatcher import db
+from dispatcher.webhook import WebhookServer, main, parse_issue_event, replay, sign, verify_signature
+
+FIXTURE = Path(__file__).parent / "fixtures" / "issues_labeled.json"
+
+
+def _payload(action="labeled", label="dispatcher-ready", issue_labels=("dispatcher-ready",)):
+    return {
+        "action": action,
+        "label": {"name": label},
+        "issue": {"number": 7, "updated_at": "t1", "labels": [{"name": n} for n in issue_labels]},
+    }
+
+
+def test_verify_signature():
+    body = b'{"a": 1}'
+    assert verify_signature("s3cret", body, sign("s3cret", body))
+    assert not verify_signature("s3cret", body, sign("other", body))
+    assert not verify_signature("s3cret", body, None)
+
+
+def test_parse_labeled_with_our_label():
+    assert parse_issue_event(_payload(), "dispatcher-ready") == (7, "labeled", "t1")
+
+
+def test_parse_ignores_other_labels():
+    assert parse_issue_event(_payload(label="bug"), "dispatcher-ready") is None
+
+
+def test_parse_edited_requires_label_on_issue():
+    assert parse_issue_event(_payload("edited"), "dispatcher-ready") == (7, "edited", "t1")
+    assert parse_issue_event(_payload("edited", issue_labels=()), "dispatcher-ready") is None
+
+
+def test_parse_ignores_unknown_actions():
+    assert parse_issue_event(_payload("assigned"), "dispatcher-ready") is None
+
+
+@pytest.fixture
+def listener(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    server = WebhookServer(("127.0.0.1", 0), "s3cret", "dispatcher-ready", db_path)
+    server.start()
+    yield server, db_path
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def test_replay_enqueues_intake(listener):
+    server, db_path = listener
+    status, _ = replay(_url(server), FIXTURE, "s3cret")
+    assert status == 202
+
+    conn = db.init_db(db_path)
+    rows = db.claim_intake(conn)
+    assert [(r["issue_number"], r["action"], r["updated_at"]) for r in rows] == [
+        (42, "labeled", "2026-10-19T08:00:00Z"),
+    ]
+    conn.close()
+
+
+def test_bad_signature_rejected(listener):
+    server, db_path = listener
+    status, _ = replay(_url(server), FIXTURE, "wrong")
+    assert status == 401
+    conn = db.init_db(db_path)
+    assert db.claim_intake(conn) == []
+    conn.close()
+
+
+def test_replay_cli_reports_failures(listener, capsys):
+    server, _ = listener
+    assert main([str(FIXTURE), "--url", _url(server), "--secret", "s3cret"]) == 0
+    assert main([str(FIXTURE), "--url", _url(server), "--secret", "wrong"]) == 1
+    assert "401" in capsys.readouterr().out
@@ -1,9 +1,10 @@
 import json
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
 
-from dispatcher.models import ExecutionResult
+from dispatcher.models import ExecutionResult, TriageResult
 
 
 def _sample_triage_dict() -> dict:
@@ -94,6 +95,9 @@ class TestWorkerRun:
             _sample_issue_dict(), _sample_config_dict(), "run-1", "/tmp/test.db",
         )
         assert code == 1
+        recorded = mock_db.update_issue_execution.call_args[0][3]
+        assert (recorded.outcome, recorded.error_message) == ("failed", "Branch creation failed: branch exists")
+        assert mock_db.finish_job.call_args[0][1:] == ("run-1", 42)
 
     @patch("dispatcher.worker.db")
     @patch("dispatcher.worker.execute_issue")
@@ -131,6 +135,46 @@ class TestWorkerRun:
         )
         assert code == 0
 
+    @patch("dispatcher.worker.db")
+    @patch("dispatcher.worker.execute_issue")
+    @patch("dispatcher.worker.resume_issue")
+    @patch("dispatcher.worker.create_branch")
+    @patch("dispatcher.worker.checkout_branch")
+    def test_resumed_issue_continues_recorded_session(
+        self, mock_checkout, mock_create, mock_resume, mock_exec, mock_db,
+    ):
+        from dispatcher.worker import run_worker
+        mock_checkout.return_value = "fix/42-issue-42"
+        mock_resume.return_value = {"is_error": False, "num_turns": 4, "session_id": "s1"}
+        mock_db.init_db.return_value = MagicMock()
+        issue = {**_sample_issue_dict(), "resume_session_id": "s1", "resume_branch": "fix/42-issue-42"}
+
+        with patch("dispatcher.execute._find_pr", return_value=(100, "url")):
+            code = run_worker(issue, _sample_config_dict(), "run-1", "/tmp/test.db")
+
+        assert code == 0
+        mock_checkout.assert_called_once_with("fix/42-issue-42")
+        mock_create.assert_not_called()
+        mock_exec.assert_not_called()
+        assert mock_resume.call_args[0][0] == "s1"
+        mock_db.increment_resume_count.assert_called_once_with(ANY, "run-1", 42)
+        assert mock_db.update_issue_execution.call_args[0][3].outcome == "pr_created"
+
+    @patch("dispatcher.worker.db")
+    @patch("dispatcher.worker.resume_issue")
+    @patch("dispatcher.worker.create_branch", return_value="fix/42-issue-42")
+    def test_resumed_session_without_branch_counts_as_resume(self, mock_create, mock_resume, mock_db):
+        from dispatcher.worker import run_worker
+        mock_resume.return_value = {"is_error": False, "num_turns": 4, "session_id": "s1"}
+        mock_db.init_db.return_value = MagicMock()
+        issue = {**_sample_issue_dict(), "resume_session_id": "s1"}
+
+        with patch("dispatcher.execute._find_pr", return_value=(100, "url")):
+            run_worker(issue, _sample_config_dict(), "run-1", "/tmp/test.db")
+
+        mock_create.assert_called_once()
+        mock_db.increment_resume_count.assert_called_once_with(ANY, "run-1", 42)
+
 
 class TestWorkerMain:
     @patch("dispatcher.worker.run_worker", return_value=0)
@@ -144,6 +188,9 @@ class TestWorkerMain:
                 config_file=None,
                 run_id="run-1",
                 db_path="/tmp/test.db",
+                pull=False,
+                socket=None,
+                remove_input_files=False,
             )
             with pytest.raises(SystemExit) as exc_info:
                 main()
@@ -159,7 +206,203 @@ class TestWorkerMain:
                 config_file=None,
                 run_id="run-1",
                 db_path="/tmp/test.db",
+                pull=False,
+                socket=None,
+                remove_input_files=False,
             )
             with pytest.raises(SystemExit) as exc_info:
                 main()
             assert exc_info.value.code == 1
+
+    def test_config_secrets_come_from_the_environment(self, monkeypatch):
+        from dispatcher.worker import _build_config
+        monkeypatch.setenv("DISPATCHER_WEBHOOK_SECRET", "from-env")
+        config = _build_config({**_sample_config_dict(), "webhook_secret": "from-json"})
+        assert config.webhook_secret == "from-env"
+
+
+class TestWorkerJobs:
+    @patch("dispatcher.worker.db")
+    @patch("dispatcher.worker.execute_issue")
+    @patch("dispatcher.worker.create_branch")
+    def test_heartbeats_and_finishes_job(self, mock_branch, mock_exec, mock_db):
+        from dispatcher.worker import run_worker
+        mock_branch.return_value = "fix/42-issue-42"
+        mock_exec.return_value = ExecutionResult(
+            issue_number=42, branch_name="fix/42-issue-42",
+            session_id="s1", num_turns=10, is_error=False,
+            pr_number=100, pr_url="url", error_message=None, outcome="pr_created",
+        )
+        config = {**_sample_config_dict(), "job_lease_seconds": 40}
+
+        run_worker(_sample_issue_dict(), config, "run-1", "/tmp/test.db")
+
+        heartbeat_args = mock_db.heartbeat_job.call_args[0]
+        assert heartbeat_args[1:] == ("run-1", 42, 40)
+        assert mock_db.finish_job.call_args[0][1:] == ("run-1", 42)
+
+
+class TestPullMode:
+    def test_run_id_required_without_pull(self):
+        from dispatcher.worker import parse_args
+        with pytest.raises(SystemExit):
+            parse_args(["--db-path", "/tmp/x.db"])
+        assert parse_args(["--pull", "--db-path", "/tmp/x.db"]).pull is True
+
+    @patch("dispatcher.worker.worktree")
+    @patch("dispatcher.worker.subprocess")
+    def test_pull_runs_queued_jobs_then_exits_when_idle(self, mock_subprocess, mock_wt, tmp_path):
+        from dispatcher import db
+        from dispatcher.worker import pull_jobs
+
+        db_path = str(tmp_path / "shared.db")
+        conn = db.init_db(db_path)
+        db.insert_run(conn, "run-1", [42, 43], json.dumps(_sample_config_dict()))
+        for n in (42, 43):
+            issue = _sample_issue_dict()
+            issue["triage"]["issue_number"] = n
+            db.insert_issue(conn, "run-1", TriageResult(**issue["triage"]))
+            db.enqueue_job(conn, "run-1", n, json.dumps(issue))
+        mock_wt.create_worktree.side_effect = lambda n, base, root: tmp_path / f"wt-{n}"
+
+        def fake_child(cmd, cwd):
+            # #42's worker records its own completion; #43's crashes
+            if cwd.name == "wt-42":
+                db.finish_job(conn, "run-1", 42)
+            return MagicMock(returncode=0 if cwd.name == "wt-42" else 1)
+
+        mock_subprocess.run.side_effect = fake_child
+
+        assert pull_jobs(db_path, idle_exit=0.01, poll_seconds=0, repo_root=tmp_path) == 0
+
+        assert mock_subprocess.run.call_count == 2
+        assert db.get_unfinished_jobs(conn, "run-1") == []
+        # #43 failed, so its worktree is kept for --resume
+        mock_wt.remove_worktree.assert_called_once_with(tmp_path / "wt-42", tmp_path)
+        assert [r["issue_number"] for r in db.get_retained_worktrees(conn)] == [43]
+        conn.close()
+
+    @patch("dispatcher.worker.worktree")
+    @patch("dispatcher.worker.subprocess")
+    def test_pulled_job_uses_run_lease_and_fails_when_worktree_cannot_be_created(self, mock_subprocess, mock_wt, tmp_path):
+        from dispatcher import db
+        from dispatcher.worker import _run_pulled_job
+
+        conn = db.init_db(str(tmp_path / "shared.db"))
+        db.insert_run(conn, "run-1", [42], json.dumps({**_sample_config_dict(), "job_lease_seconds": 900}))
+        db.insert_issue(conn, "run-1", TriageResult(**_sample_triage_dict()))
+        db.enqueue_job(conn, "run-1", 42, json.dumps(_sample_issue_dict()))
+        job = db.claim_job(conn, "host:1", 120)
+        mock_wt.create_worktree.side_effect = RuntimeError("bad ref")
+
+        with patch("dispatcher.worker.db.heartbeat_job", wraps=db.heartbeat_job) as beat:
+            _run_pulled_job(conn, job, str(tmp_path / "shared.db"), None, tmp_path)
+
+        beat.assert_called_once_with(conn, "run-1", 42, 900)
+        mock_subprocess.run.assert_not_called()
+        assert db.get_job(conn, "run-1", 42)["state"] == "done"
+        assert db.get_issue(conn, "run-1", 42)["error_message"] == "Worktree creation failed: bad ref"
+        conn.close()
+
+
+    @patch("dispatcher.worker.db")
+    @patch("dispatcher.worker.execute_issue")
+    @patch("dispatcher.worker.create_branch", return_value="fix/42-issue-42")
+    def test_pulled_job_runs_headless_from_a_terminal(self, _branch, mock_exec, mock_db, tmp_path):
+        from dispatcher import worker
+
+        mock_exec.return_value = ExecutionResult(
+            issue_number=42, branch_name="fix/42-issue-42", session_id="s1", num_turns=10, is_error=False,
+            pr_number=100, pr_url="url", error_message=None, outcome="pr_created",
+        )
+        mock_db.init_db.return_value = MagicMock()
+        children = []
+
+        def child(cmd, cwd):
+            # Run the child worker in-process with the pull worker's terminal on stdout
+            children.append(cmd)
+            args = worker.parse_args(cmd[3:])
+            with patch("dispatcher.worker.sys.stdout.isatty", return_value=True):
+                code = worker.run_worker(
+                    json.loads(Path(args.issue_file).read_text()), json.loads(Path(args.config_file).read_text()),
+                    args.run_id, args.db_path, args.headless,
+                )
+            return MagicMock(returncode=code)
+
+        conn = MagicMock()
+        job = {"run_id": "run-1", "issue_number": 42, "payload": json.dumps(_sample_issue_dict())}
+        with patch("dispatcher.worker.subprocess.run", side_effect=child), \
+                patch("dispatcher.worker.worktree") as mock_wt:
+            mock_wt.create_worktree.return_value = tmp_path
+            worker.db.get_run.return_value = {"config": json.dumps(_sample_config_dict())}
+            worker._run_pulled_job(conn, job, str(tmp_path / "shared.db"), None, tmp_path)
+
+        assert "--headless" in children[0]
+        assert mock_exec.call_args.kwargs["interactive"] is False
+
+
+class TestSocketMode:
+    @patch("dispatcher.worker.db")
+    @patch("dispatcher.worker.execute_issue")
+    @patch("dispatcher.worker.create_branch")
+    def test_runs_jobs_from_socket_until_stop(self, mock_branch, mock_exec, mock_db, tmp_path, monkeypatch):
+        import os
+        import socket
+        import tempfile
+        import threading
+        from dispatcher.worker import serve_socket
+
+        monkeypatch.chdir(tmp_path)
+        mock_branch.return_value = "fix/42-issue-42"
+        mock_exec.return_value = ExecutionResult(
+            issue_number=42, branch_name="fix/42-issue-42",
+            session_id="s1", num_turns=10, is_error=False,
+            pr_number=100, pr_url="url", error_message=None, outcome="pr_created",
+        )
+        sock_path = os.path.join(tempfile.mkdtemp(), "w.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(sock_path)
+        server.listen()
+        codes = []
+        thread = threading.Thread(target=lambda: codes.append(serve_socket(sock_path, "run-1", "/tmp/test.db")))
+        thread.start()
+
+        conn, _ = server.accept()
+        stream = conn.makefile("rw", encoding="utf-8")
+        assert json.loads(stream.readline())["type"] == "hello"
+        for _ in range(2):
+            stream.write(json.dumps({
+                "type": "job", "cwd": str(tmp_path), "issue": _sample_issue_dict(), "config": _sample_config_dict(),
+            }) + "\n")
+            stream.flush()
+            reply = json.loads(stream.readline())
+            assert reply["type"] == "result"
+            assert reply["exit_code"] == 0
+            assert reply["result"]["pr_number"] == 100
+        stream.write(json.dumps({"type": "stop"}) + "\n")
+        stream.flush()
+        thread.join(timeout=5)
+
+        assert codes == [0]
+        assert mock_exec.call_count == 2  # both jobs ran in this one process
+        assert mock_db.finish_job.call_count == 2
+        conn.close()
+        server.close()
+
+    @patch("dispatcher.worker.run_worker", return_value=0)
+    def test_main_removes_input_files(self, mock_run, tmp_path):
+        from dispatcher.worker import main
+        issue_file = tmp_path / "issue.json"
+        config_file = tmp_path / "config.json"
+        issue_file.write_text(json.dumps(_sample_issue_dict()))
+        config_file.write_text(json.dumps(_sample_config_dict()))
+        argv = [
+            "worker", "--issue-file", str(issue_file), "--config-file", str(config_file),
+            "--run-id", "run-1", "--db-path", "/tmp/test.db", "--remove-input-files",
+        ]
+        with patch("sys.argv", argv):
+            with pytest.raises(SystemExit):
+                main()
+        assert mock_run.called
+        assert not issue_file.exists()
+        assert not config_file.exists()
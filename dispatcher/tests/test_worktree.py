@@ -65,3 +65,42 @@ class TestCleanupAll:
         mock_rmtree.assert_called_once_with(
             repo_root / ".dispatcher-worktrees", ignore_errors=True,
         )
+
+
+class TestRetention:
+    def _db(self, tmp_path):
+        from dispatcher import db
+        conn = db.init_db(str(tmp_path / "test.db"))
+        db.insert_run(conn, "run-1", [], "{}")
+        return conn
+
+    def test_cleanup_all_keeps_retained(self, tmp_path):
+        root = tmp_path / ".dispatcher-worktrees"
+        for n in (41, 42):
+            (root / f"issue-{n}").mkdir(parents=True)
+        with patch("dispatcher.worktree.subprocess.run"):
+            cleanup_all(tmp_path, keep={root / "issue-42"})
+        assert [p.name for p in root.iterdir()] == ["issue-42"]
+
+    @patch("dispatcher.worktree.subprocess.run")
+    def test_evicts_stale_then_least_recently_used_over_size(self, _run, tmp_path):
+        from dispatcher import db
+        from dispatcher.worktree import evict_retained
+
+        conn = self._db(tmp_path)
+        paths = {}
+        for n in (41, 42, 43):
+            paths[n] = tmp_path / f"issue-{n}"
+            paths[n].mkdir()
+            (paths[n] / "blob").write_bytes(b"x" * 1024 * 1024)
+            db.retain_worktree(conn, "run-1", n, str(paths[n]), f"fix/{n}", "leash_hit")
+        conn.execute("UPDATE worktrees SET updated_at = '2020-01-01T00:00:00+00:00' WHERE issue_number = 41")
+        conn.execute("UPDATE worktrees SET updated_at = '2099-01-01T00:00:00+00:00' WHERE issue_number = 43")
+        db.retain_worktree(conn, "run-1", 44, str(tmp_path / "gone"), "fix/44", "failed")
+
+        evicted = evict_retained(conn, tmp_path, max_age_days=7, max_total_mb=1)
+
+        assert evicted == [paths[41], paths[42]]
+        assert not paths[41].exists() and not paths[42].exists() and paths[43].exists()
+        assert [r["issue_number"] for r in db.get_retained_worktrees(conn)] == [43]
+        conn.close()
@@ -1,13 +1,156 @@
 from __future__ import annotations
 
+import queue
 import shutil
 import subprocess
+import threading
+
+_TIMEOUT = 10
+PANES_PER_WINDOW = 4  # a tiled 2x2 grid; one window refuses further splits on an ordinary terminal
+_DEAD_SUBSCRIPTION = "dispatcher-dead"
 
 
 def is_tmux_available() -> bool:
     return shutil.which("tmux") is not None
 
 
+def _quote(arg: str) -> str:
+    """Quote one argument for tmux's command parser (sh-style single quotes)."""
+    return "'" + arg.replace("'", "'\\''") + "'"
+
+
+class ControlClient:
+    """A persistent ``tmux -C`` connection to one session.
+
+    Commands are written to the connection instead of forking a tmux process
+    each, and a format subscription on ``pane_dead`` lets wait() return as
+    soon as a pane's process exits rather than at the next poll. The client
+    attaches with ``no-output``: nothing here reads pane output as a stream
+    (the watchdog fingerprints the rendered screen), so tmux doesn't send it.
+    Subscriptions need tmux 3.2 or later.
+    """
+
+    def __init__(self, session_name: str) -> None:
+        self.session_name = session_name
+        self._proc = subprocess.Popen(
+            ["tmux", "-C", "attach-session", "-t", session_name, "-f", "ignore-size,no-output"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._lock = threading.Lock()  # one command in flight; replies arrive in order
+        self._replies: queue.Queue[tuple[bool, list[str]]] = queue.Queue()
+        self._pane_exited = threading.Event()
+        self._attached = threading.Event()
+        self._closed = False
+        threading.Thread(target=self._read, name=f"tmux-control-{session_name}", daemon=True).start()
+        # Commands sent before the attach completes fail with "no current client"
+        if not self._attached.wait(_TIMEOUT) or self._closed:
+            self.close()
+            raise subprocess.CalledProcessError(1, ["tmux", "-C", "attach-session", "-t", session_name])
+        self.command("refresh-client", "-B", f"{_DEAD_SUBSCRIPTION}:%*:#{{pane_dead}}")
+
+    @property
+    def connected(self) -> bool:
+        return not self._closed and self._proc.poll() is None
+
+    def command(self, *args: str, check: bool = True) -> str:
+        """Run one tmux command over the connection and return its output."""
+        with self._lock:
+            self._proc.stdin.write((" ".join(_quote(a) for a in args) + "\n").encode())
+            self._proc.stdin.flush()
+            try:
+                ok, lines = self._replies.get(timeout=_TIMEOUT)
+            except queue.Empty:
+                # A late reply would be read as the next command's: retire the connection instead
+                self.close()
+                raise subprocess.TimeoutExpired(["tmux", *args], _TIMEOUT) from None
+        if not ok and check:
+            raise subprocess.CalledProcessError(1, ["tmux", *args], stderr="\n".join(lines))
+        return "".join(f"{line}\n" for line in lines) if ok else ""
+
+    def wait(self, timeout: float) -> bool:
+        """Block until a pane's process exits or timeout passes; True if one exited."""
+        exited = self._pane_exited.wait(timeout)
+        self._pane_exited.clear()
+        return exited
+
+    def close(self) -> None:
+        self._closed = True
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            try:
+                self._proc.wait(timeout=_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+    def _read(self) -> None:
+        block: list[str] | None = None
+        block_id: list[str] = []
+        for raw in self._proc.stdout:
+            line = raw.decode(errors="replace").rstrip("\n")
+            if block is not None:
+                # Output lines are passed through verbatim; only the matching guard ends the block
+                if line.startswith(("%end ", "%error ")) and line.split()[1:] == block_id:
+                    if block_id[2] == "1":  # flag 1: a command this client sent
+                        self._replies.put((line.startswith("%end "), block))
+                    else:  # the attach itself
+                        self._attached.set()
+                    block = None
+                else:
+                    block.append(line)
+            elif line.startswith("%begin "):
+                block, block_id = [], line.split()[1:]
+            elif line.startswith(f"%subscription-changed {_DEAD_SUBSCRIPTION} "):
+                if line.rpartition(" : ")[2].strip() == "1":
+                    self._pane_exited.set()
+            elif line.startswith("%exit"):
+                break
+        self._closed = True
+        self._attached.set()
+        self._pane_exited.set()
+        self._replies.put((False, ["tmux control connection closed"]))
+
+
+_clients: dict[str, ControlClient] = {}
+
+
+def connect(session_name: str) -> ControlClient | None:
+    """Route session_name's tmux commands over a control-mode connection.
+
+    Returns None when the connection can't be opened (tmux older than 3.2,
+    session gone); commands then keep running as one-off tmux processes.
+    """
+    try:
+        client = ControlClient(session_name)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    _clients[session_name] = client
+    return client
+
+
+def disconnect(session_name: str) -> None:
+    client = _clients.pop(session_name, None)
+    if client is not None:
+        client.close()
+
+
+def _run(session_name: str, args: list[str], check: bool = True) -> str:
+    """Run a tmux command for session_name: over its control connection if open, else as a subprocess."""
+    client = _clients.get(session_name)
+    if client is not None and client.connected:
+        try:
+            return client.command(*args, check=check)
+        except OSError:
+            pass  # connection dropped before the command was written; fall back to a one-off process
+    result = subprocess.run(["tmux", *args], capture_output=True, text=True, timeout=_TIMEOUT, check=check)
+    return result.stdout if result.returncode == 0 else ""
+
+
+def _target(session_name: str, slot: int) -> str:
+    """tmux target of a slot: slots fill PANES_PER_WINDOW panes of window 0, then window 1, and so on."""
+    window, pane = divmod(slot, PANES_PER_WINDOW)
+    return f"{session_name}:{window}.{pane}"
+
+
 def create_session(name: str) -> None:
     """Create a detached tmux session with remain-on-exit enabled."""
     subprocess.run(
@@ -21,76 +164,84 @@ def create_session(name: str) -> None:
 
 
 def launch_in_pane(session_name: str, pane_index: int, command: str) -> int:
-    """Launch a command as the pane's process so pane_dead fires on exit.
+    """Launch a command as the slot's pane process so pane_dead fires on exit.
 
-    For pane 0 (the initial pane created with the session), uses respawn-pane.
-    For additional panes, uses split-window to create a new pane.
-    Returns the pane index of the launched command.
+    Slot 0 reuses the pane created with the session (respawn-pane). The first
+    slot of every further PANES_PER_WINDOW opens a new window; the others
+    split their window and re-tile it. Returns the slot of the launched command.
     """
+    window, pane = divmod(pane_index, PANES_PER_WINDOW)
     if pane_index == 0:
         # Pane 0 already exists from create_session; replace its shell
-        subprocess.run(
-            ["tmux", "respawn-pane", "-t", f"{session_name}:0.0", "-k", command],
-            capture_output=True, text=True, timeout=10, check=True,
-        )
+        _run(session_name, ["respawn-pane", "-t", _target(session_name, 0), "-k", command])
         return 0
+    elif pane == 0:
+        # remain-on-exit is per window, so set it before the command can exit
+        _run(session_name, ["new-window", "-d", "-t", f"{session_name}:{window}"])
+        _run(session_name, ["set-option", "-w", "-t", f"{session_name}:{window}", "remain-on-exit", "on"])
+        _run(session_name, ["respawn-pane", "-t", _target(session_name, pane_index), "-k", command])
+        return pane_index
     else:
         # Create a new pane with the command as its process
-        result = subprocess.run(
-            [
-                "tmux", "split-window", "-t", session_name,
-                "-PF", "#{pane_index}", command,
-            ],
-            capture_output=True, text=True, timeout=10, check=True,
+        output = _run(
+            session_name, ["split-window", "-t", f"{session_name}:{window}", "-PF", "#{pane_index}", command],
         )
-        subprocess.run(
-            ["tmux", "select-layout", "-t", session_name, "tiled"],
-            capture_output=True, text=True, timeout=10,
-        )
-        return int(result.stdout.strip())
+        _run(session_name, ["select-layout", "-t", f"{session_name}:{window}", "tiled"], check=False)
+        return window * PANES_PER_WINDOW + int(output.strip())
 
 
 def respawn_pane(session_name: str, pane_index: int, command: str) -> None:
     """Respawn a dead pane with a new command (for batching)."""
-    subprocess.run(
-        ["tmux", "respawn-pane", "-t", f"{session_name}:0.{pane_index}", command],
-        capture_output=True, text=True, timeout=10, check=True,
-    )
+    _run(session_name, ["respawn-pane", "-t", _target(session_name, pane_index), command])
 
 
 def send_keys(session_name: str, pane_index: int, text: str, enter: bool = True) -> None:
     """Send keystrokes to a pane. Use -l for literal text, then optionally Enter."""
-    cmd = ["tmux", "send-keys", "-t", f"{session_name}:0.{pane_index}", "-l", text]
-    subprocess.run(cmd, capture_output=True, text=True, timeout=10, check=True)
+    _run(session_name, ["send-keys", "-t", _target(session_name, pane_index), "-l", text])
     if enter:
-        subprocess.run(
-            ["tmux", "send-keys", "-t", f"{session_name}:0.{pane_index}", "Enter"],
-            capture_output=True, text=True, timeout=10, check=True,
-        )
+        _run(session_name, ["send-keys", "-t", _target(session_name, pane_index), "Enter"])
+
+
+def capture_pane(session_name: str, pane_index: int) -> str:
+    """Return the pane's visible text, or "" if it can't be read."""
+    return _run(session_name, ["capture-pane", "-p", "-t", _target(session_name, pane_index)], check=False)
+
+
+def stop_pane(session_name: str, pane_index: int) -> None:
+    """Kill the pane's process tree but keep the (now dead) pane for reuse.
+
+    respawn-pane -k hangs up everything running in the pane; the replacement
+    exits at once, so with remain-on-exit the pane reads as dead and can be
+    respawned like any finished pane.
+    """
+    _run(session_name, ["respawn-pane", "-k", "-t", _target(session_name, pane_index), "exit 124"])
 
 
 def get_pane_status(session_name: str) -> list[tuple[int, bool, int | None]]:
-    result = subprocess.run(
+    """(slot, alive, exit code) of every pane in every window of the session."""
+    output = _run(
+        session_name,
         [
-            "tmux", "list-panes", "-t", session_name,
-            "-F", "#{pane_index} #{pane_dead} #{pane_dead_status}",
+            "list-panes", "-s", "-t", session_name,
+            "-F", "#{window_index} #{pane_index} #{pane_dead} #{pane_dead_status}",
         ],
-        capture_output=True, text=True, timeout=10,
+        check=False,
     )
-    if result.returncode != 0 or not result.stdout.strip():
+    if not output.strip():
         return []
     statuses: list[tuple[int, bool, int | None]] = []
-    for line in result.stdout.strip().splitlines():
+    for line in output.strip().splitlines():
         parts = line.split()
-        idx = int(parts[0])
-        is_dead = parts[1] == "1"
-        exit_code = int(parts[2]) if is_dead and len(parts) > 2 else None
+        idx = int(parts[0]) * PANES_PER_WINDOW + int(parts[1])
+        is_dead = parts[2] == "1"
+        exit_code = int(parts[3]) if is_dead and len(parts) > 3 else None
         is_alive = not is_dead
         statuses.append((idx, is_alive, exit_code))
     return statuses
 
 
 def kill_session(session_name: str) -> None:
+    disconnect(session_name)
     subprocess.run(
         ["tmux", "kill-session", "-t", session_name],
         capture_output=True, text=True, timeout=10,
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import json
 import subprocess
+import time
 
-from dispatcher.models import Config, TriageResult
+from dispatcher.execute import usage_fields
+from dispatcher.models import Config, TriageAttempt, TriageResult
 
 TRIAGE_SCHEMA = json.dumps({
     "type": "object",
@@ -29,6 +31,17 @@ TRIAGE_SCHEMA = json.dumps({
     "required": ["scope", "richness_score", "richness_signals", "triage_tier", "confidence", "risk_flags", "missing_info", "reasoning"],
 })
 
+_SCHEMA: dict = json.loads(TRIAGE_SCHEMA)
+
+_JSON_TYPES: dict[str, type | tuple[type, ...]] = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "integer": int,
+    "number": (int, float),
+}
+
 _TIER_MATRIX: dict[tuple[str, bool], str] = {
     ("quick-fix", False): "full-yolo",
     ("quick-fix", True): "full-yolo",
@@ -45,6 +58,11 @@ class TriageError(Exception):
     pass
 
 
+class TriageFormatError(TriageError):
+    """Claude answered, but not with JSON matching TRIAGE_SCHEMA. Retryable."""
+    pass
+
+
 def validate_tier(scope: str, richness_score: int, model_tier: str) -> str:
     key = (scope, richness_score >= 3)
     if key not in _TIER_MATRIX:
@@ -85,11 +103,53 @@ Return ONLY a raw JSON object (no markdown fencing, no explanation) with these e
 - reasoning: string"""
 
 
-def _call_claude_triage(prompt: str, issue_number: int, config: Config) -> dict:
+def build_repair_prompt(prompt: str, error: str) -> str:
+    return f"""{prompt}
+
+## Previous Answer Rejected
+Your previous answer could not be used: {error}
+
+Answer again with ONLY a JSON object that satisfies the schema above."""
+
+
+def validate_schema(value: object, schema: dict, path: str = "$") -> list[str]:
+    """Validate value against the JSON Schema subset TRIAGE_SCHEMA uses.
+
+    Supports type, enum, minimum/maximum, required, properties and items.
+    Returns a list of human-readable errors (empty when valid).
+    """
+    expected = schema.get("type")
+    if expected:
+        is_bool_number = isinstance(value, bool) and expected in ("integer", "number")
+        if is_bool_number or not isinstance(value, _JSON_TYPES[expected]):
+            return [f"{path}: expected {expected}, got {type(value).__name__}"]
+    errors: list[str] = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if "minimum" in schema and value < schema["minimum"]:
+        errors.append(f"{path}: {value!r} is below minimum {schema['minimum']}")
+    if "maximum" in schema and value > schema["maximum"]:
+        errors.append(f"{path}: {value!r} is above maximum {schema['maximum']}")
+    if isinstance(value, dict):
+        for key in schema.get("required", []):
+            if key not in value:
+                errors.append(f"{path}.{key}: missing required key")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate_schema(value[key], sub_schema, f"{path}.{key}"))
+    if isinstance(value, list) and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate_schema(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def _call_claude_triage(prompt: str, issue_number: int, config: Config, model: str | None = None) -> dict:
+    """Run one schema-constrained triage call and return claude's JSON envelope."""
     cmd = [
         "claude", "-p", prompt,
-        "--model", config.triage_model,
+        "--model", model or config.triage_model,
         "--output-format", "json",
+        "--json-schema", TRIAGE_SCHEMA,
         "--max-turns", str(config.triage_max_turns),
     ]
     try:
@@ -101,27 +161,43 @@ def _call_claude_triage(prompt: str, issue_number: int, config: Config) -> dict:
         print(f"  [triage #{issue_number}] stdout={result.stdout[:500]}")
         if result.stderr.strip():
             print(f"  [triage #{issue_number}] stderr={result.stderr[:300]}")
-    return _parse_triage_output(result.stdout, issue_number)
+    return _parse_envelope(result.stdout, issue_number)
 
 
-def _parse_triage_output(stdout: str, issue_number: int) -> dict:
+def _parse_envelope(stdout: str, issue_number: int) -> dict:
     try:
         outer = json.loads(stdout)
     except (json.JSONDecodeError, TypeError) as exc:
-        raise TriageError(f"Invalid JSON from claude -p for issue #{issue_number}: {stdout[:200]}") from exc
+        raise TriageFormatError(f"Invalid JSON from claude -p for issue #{issue_number}: {stdout[:200]}") from exc
+    if not isinstance(outer, dict):
+        raise TriageFormatError(f"Unexpected claude -p output for issue #{issue_number}: {stdout[:200]}")
 
     if outer.get("is_error") or outer.get("subtype") == "error_max_turns":
         raise TriageError(f"claude -p error for issue #{issue_number}: {outer.get('subtype', 'unknown')}")
+    return outer
 
-    result = outer.get("result", "")
+
+def _parse_triage_output(outer: dict, issue_number: int) -> dict:
+    """Pull the triage object out of the envelope and validate it against TRIAGE_SCHEMA."""
+    structured = outer.get("structured_output")
+    result = structured if isinstance(structured, dict) else outer.get("result", "")
     if isinstance(result, dict):
-        return result
-    if not isinstance(result, str) or not result.strip():
-        raise TriageError(f"Empty triage result for issue #{issue_number}")
-    return _extract_json(result, issue_number)
+        data = result
+    elif not isinstance(result, str) or not result.strip():
+        raise TriageFormatError(f"Empty triage result for issue #{issue_number}")
+    else:
+        data = _extract_json(result, issue_number)
+
+    errors = validate_schema(data, _SCHEMA)
+    if errors:
+        raise TriageFormatError(
+            f"Triage JSON for issue #{issue_number} does not match schema: {'; '.join(errors[:5])}"
+        )
+    return data
 
 
 def _extract_json(text: str, issue_number: int) -> dict:
+    """Fallback for CLIs that ignore --json-schema and answer in plain text."""
     text = text.strip()
     if text.startswith("```"):
         lines = text.split("\n")
@@ -130,14 +206,96 @@ def _extract_json(text: str, issue_number: int) -> dict:
     try:
         return json.loads(text)
     except (json.JSONDecodeError, TypeError) as exc:
-        raise TriageError(f"Invalid triage JSON for issue #{issue_number}: {text[:200]}") from exc
+        raise TriageFormatError(f"Invalid triage JSON for issue #{issue_number}: {text[:200]}") from exc
 
 
-def triage_issue(issue_data: dict, issue_number: int, issue_url: str, config: Config) -> TriageResult:
+def triage_issue(
+    issue_data: dict,
+    issue_number: int,
+    issue_url: str,
+    config: Config,
+    attempts: list[TriageAttempt] | None = None,
+) -> TriageResult:
+    """Triage an issue, trying the cheap cascade model first when configured.
+
+    The cascade result is accepted only when its confidence meets
+    ``triage_cascade_threshold`` and its tier already agrees with the tier
+    matrix; otherwise the issue is re-triaged with ``triage_model``. Every
+    model call is appended to ``attempts`` (when given), including failed ones.
+    """
     comments = [c["body"] for c in issue_data.get("comments", [])]
     prompt = build_triage_prompt(issue_data["title"], issue_data["body"] or "", comments)
-    triage_data = _call_claude_triage(prompt, issue_number, config)
-    return _build_triage_result(triage_data, issue_data, issue_number, issue_url)
+    if attempts is None:
+        attempts = []
+
+    if config.triage_cascade_model:
+        try:
+            tr = _triage_stage(
+                "cascade", config.triage_cascade_model, prompt,
+                issue_data, issue_number, issue_url, config, attempts,
+            )
+        except TriageError as exc:
+            if config.verbose:
+                print(f"  [triage #{issue_number}] cascade failed, escalating: {exc}")
+        else:
+            if attempts[-1].accepted:
+                return tr
+
+    return _triage_stage("final", config.triage_model, prompt, issue_data, issue_number, issue_url, config, attempts)
+
+
+def _triage_stage(
+    stage: str,
+    model: str,
+    prompt: str,
+    issue_data: dict,
+    issue_number: int,
+    issue_url: str,
+    config: Config,
+    attempts: list[TriageAttempt],
+) -> TriageResult:
+    """Run one cascade stage, retrying format errors with a repair prompt.
+
+    Each call is recorded as a TriageAttempt. Format errors are retried up to
+    ``triage_max_retries`` times with exponential backoff; any other
+    TriageError (timeout, claude error) is raised immediately.
+    """
+    current_prompt = prompt
+    retry = 0
+    while True:
+        started = time.monotonic()
+        outer: dict = {}
+        try:
+            outer = _call_claude_triage(current_prompt, issue_number, config, model=model)
+            triage_data = _parse_triage_output(outer, issue_number)
+            tr = _build_triage_result(triage_data, issue_data, issue_number, issue_url)
+        except TriageError as exc:
+            attempts.append(TriageAttempt(
+                stage=stage, model=model, latency_seconds=time.monotonic() - started,
+                confidence=None, accepted=False, error_message=str(exc), retry=retry,
+                **usage_fields(outer),
+            ))
+            if not isinstance(exc, TriageFormatError) or retry == config.triage_max_retries:
+                raise
+            if config.verbose:
+                print(f"  [triage #{issue_number}] {exc} — retrying ({retry + 1}/{config.triage_max_retries})")
+            time.sleep(config.triage_retry_backoff_seconds * (2 ** retry))
+            current_prompt = build_repair_prompt(prompt, str(exc))
+            retry += 1
+            continue
+
+        accepted = stage != "cascade" or _cascade_accepts(tr, triage_data, config)
+        attempts.append(TriageAttempt(
+            stage=stage, model=model, latency_seconds=time.monotonic() - started,
+            confidence=tr.confidence, accepted=accepted, retry=retry,
+            **usage_fields(outer),
+        ))
+        return tr
+
+
+def _cascade_accepts(tr: TriageResult, triage_data: dict, config: Config) -> bool:
+    """Accept a cheap-model result only if it is confident and the matrix agrees with it."""
+    return tr.confidence >= config.triage_cascade_threshold and triage_data.get("triage_tier") == tr.triage_tier
 
 
 def _build_triage_result(triage_data: dict, issue_data: dict, issue_number: int, issue_url: str) -> TriageResult:
@@ -159,4 +317,4 @@ def _build_triage_result(triage_data: dict, issue_data: dict, issue_number: int,
             reasoning=triage_data["reasoning"],
         )
     except KeyError as exc:
-        raise TriageError(f"Missing required key in triage response for issue #{issue_number}: {exc}") from exc
+        raise TriageFormatError(f"Missing required key in triage response for issue #{issue_number}: {exc}") from exc
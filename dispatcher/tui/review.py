@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from importlib.metadata import version
+from typing import Callable
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
@@ -29,10 +30,12 @@ class ReviewApp(App[list[ReviewedIssue]]):
         self,
         triage_results: list[TriageResult],
         unmet: dict[int, list[int]] | None = None,
+        forecast: Callable[[list[ReviewedIssue]], str] | None = None,
     ) -> None:
         super().__init__()
         self._results = triage_results
         self._unmet = unmet or {}
+        self._forecast = forecast
         self._tiers: dict[int, str] = {tr.issue_number: tr.triage_tier for tr in triage_results}
         self._skipped: set[int] = set()
         self._comments: dict[int, str | None] = {}
@@ -58,6 +61,7 @@ class ReviewApp(App[list[ReviewedIssue]]):
             )
         yield table
         yield Static("", id="detail-panel")
+        yield Static("", id="forecast", markup=False)
         yield Footer()
 
     def on_mount(self) -> None:
@@ -72,6 +76,11 @@ class ReviewApp(App[list[ReviewedIssue]]):
             banner.visible = True
         else:
             banner.visible = False
+        self._refresh_forecast()
+
+    def _refresh_forecast(self) -> None:
+        if self._forecast is not None:
+            self.query_one("#forecast", Static).update(self._forecast(self._current_reviewed()))
 
     def _current_issue_number(self) -> int | None:
         table = self.query_one(DataTable)
@@ -89,6 +98,7 @@ class ReviewApp(App[list[ReviewedIssue]]):
         table = self.query_one(DataTable)
         row_key = str(num)
         table.update_cell(row_key, "Tier", self._tiers[num])
+        self._refresh_forecast()
 
     def action_skip_issue(self) -> None:
         num = self._current_issue_number()
@@ -98,20 +108,25 @@ class ReviewApp(App[list[ReviewedIssue]]):
             self._skipped.discard(num)
         else:
             self._skipped.add(num)
+        self._refresh_forecast()
 
     def action_approve_all(self) -> None:
         self._skipped.clear()
         self.action_execute()
 
-    def action_execute(self) -> None:
-        self.reviewed = []
-        for tr in self._results:
-            self.reviewed.append(ReviewedIssue(
+    def _current_reviewed(self) -> list[ReviewedIssue]:
+        return [
+            ReviewedIssue(
                 triage=tr,
                 final_tier=self._tiers[tr.issue_number],
                 skipped=tr.issue_number in self._skipped,
                 edited_comment=self._comments.get(tr.issue_number),
-            ))
+            )
+            for tr in self._results
+        ]
+
+    def action_execute(self) -> None:
+        self.reviewed = self._current_reviewed()
         self.exit(self.reviewed)
 
     def action_quit_app(self) -> None:
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 from importlib.metadata import version
+from typing import Callable
 
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.widgets import Footer, Header, SelectionList, Static
 
+from dispatcher.models import TriageResult
+
 _VERSION = version("feature-flow-dispatcher")
 
 
@@ -24,12 +27,16 @@ class SelectionApp(App[list[int]]):
         parked_numbers: set[int],
         label: str,
         unmet_deps: dict[int, list[int]] | None = None,
+        predictions: Callable[[], dict[int, TriageResult]] | None = None,
     ) -> None:
         super().__init__()
         self._issues = issues
         self._parked = parked_numbers
         self._label = label
         self._unmet_deps = unmet_deps or {}
+        self._predictions = predictions
+        self._predicted: set[int] = set()
+        self._label_width = max((len(self._base_label(i)) for i in issues), default=0)
         self.selected: list[int] = []
 
     def compose(self) -> ComposeResult:
@@ -38,21 +45,41 @@ class SelectionApp(App[list[int]]):
             yield Static(f"No open issues with label '{self._label}' found.")
             yield Static("Press any key to close.")
         else:
-            items = []
-            for issue in self._issues:
-                number = issue["number"]
-                title = issue["title"]
-                parked_mark = " ↻ parked" if number in self._parked else ""
-                dep_mark = (
-                    f" → needs #{', #'.join(str(d) for d in self._unmet_deps[number])}"
-                    if number in self._unmet_deps
-                    else ""
-                )
-                label = f"#{number} {title}{parked_mark}{dep_mark}"
-                items.append((label, number))
+            items = [(self._option_label(issue), issue["number"]) for issue in self._issues]
             yield SelectionList(*items)
         yield Footer()
 
+    def on_mount(self) -> None:
+        if self._predictions is not None and self._issues:
+            self.set_interval(1.0, self.refresh_predictions)
+
+    def refresh_predictions(self) -> None:
+        """Show the predicted tier for issues whose background triage has finished."""
+        predictions = self._predictions() if self._predictions else {}
+        sl = self.query_one(SelectionList)
+        for idx, issue in enumerate(self._issues):
+            number = issue["number"]
+            if number in predictions and number not in self._predicted:
+                self._predicted.add(number)
+                sl.replace_option_prompt_at_index(idx, self._option_label(issue, predictions[number]))
+
+    def _base_label(self, issue: dict) -> str:
+        number = issue["number"]
+        parked_mark = " ↻ parked" if number in self._parked else ""
+        dep_mark = (
+            f" → needs #{', #'.join(str(d) for d in self._unmet_deps[number])}"
+            if number in self._unmet_deps
+            else ""
+        )
+        return f"#{number} {issue['title']}{parked_mark}{dep_mark}"
+
+    def _option_label(self, issue: dict, prediction: TriageResult | None = None) -> str:
+        label = self._base_label(issue)
+        if self._predictions is None:
+            return label
+        predicted = f"{prediction.triage_tier} ({prediction.confidence:.2f})" if prediction else "triaging…"
+        return f"{label:<{self._label_width}}  {predicted}"
+
     def on_key(self, _event) -> None:
         if not self._issues:
             self.exit([])
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from dispatcher import tmux
+
+FLAG = "flag"
+RECLAIM = "reclaim"
+RESUMED = "resumed"
+
+
+def activity_fingerprint(session_name: str, pane_index: int, worktree_path: Path) -> str:
+    """Hash of everything that changes while a session makes progress.
+
+    Covers the pane's visible output (stream events and tool calls show up
+    there), the worktree's HEAD commit and its uncommitted changes. Signals
+    that can't be read (pane gone, worktree not created yet) hash as empty.
+    """
+    digest = hashlib.sha1(tmux.capture_pane(session_name, pane_index).encode())
+    for args in (["rev-parse", "HEAD"], ["status", "--porcelain"]):
+        try:
+            result = subprocess.run(
+                ["git", *args], capture_output=True, text=True, timeout=10, cwd=worktree_path,
+            )
+            digest.update(result.stdout.encode())
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    return digest.hexdigest()
+
+
+@dataclass
+class _Activity:
+    fingerprint: str | None
+    changed_at: float
+    sampled_at: float
+    flagged: bool = False
+
+
+class Watchdog:
+    """Tracks per-issue activity and decides when an idle session is stalled.
+
+    ``observe()`` is fed a fingerprint of the session's activity signals. Once
+    the fingerprint has not changed for ``stall_seconds`` it returns ``FLAG``
+    (once); after a further ``grace_seconds`` it returns ``RECLAIM`` and the
+    caller should kill the session. A change after a flag returns ``RESUMED``.
+    """
+
+    def __init__(
+        self,
+        stall_seconds: float,
+        grace_seconds: float,
+        sample_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.stall_seconds = stall_seconds
+        self.grace_seconds = grace_seconds
+        self._sample_seconds = sample_seconds
+        self._clock = clock
+        self._activity: dict[int, _Activity] = {}
+
+    def due(self, issue_number: int) -> bool:
+        """Whether issue_number should be sampled now (sampling shells out to tmux and git)."""
+        activity = self._activity.get(issue_number)
+        return activity is None or self._clock() - activity.sampled_at >= self._sample_seconds
+
+    def observe(self, issue_number: int, fingerprint: str) -> str | None:
+        now = self._clock()
+        activity = self._activity.get(issue_number)
+        if activity is None or activity.fingerprint != fingerprint:
+            self._activity[issue_number] = _Activity(fingerprint, changed_at=now, sampled_at=now)
+            return RESUMED if activity and activity.flagged else None
+        activity.sampled_at = now
+        idle = now - activity.changed_at
+        if idle >= self.stall_seconds + self.grace_seconds:
+            return RECLAIM
+        if idle >= self.stall_seconds and not activity.flagged:
+            activity.flagged = True
+            return FLAG
+        return None
+
+    def idle_seconds(self, issue_number: int) -> float:
+        activity = self._activity.get(issue_number)
+        return self._clock() - activity.changed_at if activity else 0.0
+
+    def forget(self, issue_number: int) -> None:
+        self._activity.pop(issue_number, None)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from dispatcher import db
+
+# Issue actions the dispatcher reacts to; everything else is acknowledged and dropped.
+_ACTIONS = ("labeled", "unlabeled", "edited", "closed", "reopened")
+
+
+def sign(secret: str, body: bytes) -> str:
+    """Return the X-Hub-Signature-256 header value GitHub would send for body."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(secret: str, body: bytes, header: str | None) -> bool:
+    if not header:
+        return False
+    return hmac.compare_digest(sign(secret, body), header)
+
+
+def parse_issue_event(payload: dict[str, Any], label: str) -> tuple[int, str, str | None] | None:
+    """Map an `issues` webhook payload to (issue_number, action, updated_at).
+
+    Returns None for events that don't concern issues carrying ``label``.
+    Label changes only count when they add or remove ``label`` itself.
+    """
+    action = payload.get("action")
+    issue = payload.get("issue") or {}
+    number = issue.get("number")
+    if action not in _ACTIONS or not isinstance(number, int):
+        return None
+    labels = {lbl.get("name") for lbl in issue.get("labels", [])}
+    if action in ("labeled", "unlabeled"):
+        if (payload.get("label") or {}).get("name") != label:
+            return None
+    elif label not in labels:
+        return None
+    return number, action, issue.get("updated_at")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: WebhookServer
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        if not verify_signature(self.server.secret, body, self.headers.get("X-Hub-Signature-256")):
+            self._reply(401, "invalid signature")
+            return
+
+        event = self.headers.get("X-GitHub-Event", "")
+        if event == "ping":
+            self._reply(200, "pong")
+            return
+        if event != "issues":
+            self._reply(202, f"ignored event {event!r}")
+            return
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError:
+            self._reply(400, "invalid JSON")
+            return
+
+        parsed = parse_issue_event(payload, self.server.label)
+        if parsed is None:
+            self._reply(202, "ignored")
+            return
+        number, action, updated_at = parsed
+        conn = db.init_db(self.server.db_path)
+        try:
+            db.insert_intake(conn, self.headers.get("X-GitHub-Delivery"), number, action, updated_at)
+        finally:
+            conn.close()
+        self._reply(202, f"queued #{number} {action}")
+
+    def _reply(self, status: int, message: str) -> None:
+        data = message.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # keep serve output readable; intake rows are the audit trail
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """HTTP listener that validates GitHub `issues` webhooks and queues them in the intake table."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], secret: str, label: str, db_path: str) -> None:
+        super().__init__(address, _Handler)
+        self.secret = secret
+        self.label = label
+        self.db_path = db_path
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="webhook", daemon=True)
+        thread.start()
+        return thread
+
+
+def replay(url: str, path: Path, secret: str, event: str = "issues") -> tuple[int, str]:
+    """POST a recorded payload file to a listener, signed the way GitHub signs it."""
+    body = path.read_bytes()
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-GitHub-Event": event,
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+        "X-Hub-Signature-256": sign(secret, body),
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=10) as resp:
+            return resp.status, resp.read().decode()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read().decode()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m dispatcher.webhook",
+        description="Replay recorded GitHub webhook payloads against a running dispatcher listener",
+    )
+    parser.add_argument("payloads", nargs="+", type=Path, help="Recorded payload JSON files, posted in order")
+    parser.add_argument("--url", default="http://127.0.0.1:8787/", help="Listener URL")
+    parser.add_argument("--secret", required=True, help="Webhook secret the listener was started with")
+    parser.add_argument("--event", default="issues", help="X-GitHub-Event header to send")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.payloads:
+        try:
+            status, message = replay(args.url, path, args.secret, args.event)
+        except (OSError, urllib.error.URLError) as exc:
+            status, message = 0, str(exc)
+        print(f"{path}: {status} {message}")
+        failed += not 200 <= status < 300
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
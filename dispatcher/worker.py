@@ -2,11 +2,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import socket
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from pathlib import Path
 
-from dispatcher import db
-from dispatcher.execute import create_branch, execute_issue
-from dispatcher.models import Config, ReviewedIssue, TriageResult
+from dispatcher import db, worktree
+from dispatcher.execute import checkout_branch, create_branch, execute_issue, parse_resume_result, resume_issue
+from dispatcher.models import RESUMABLE_OUTCOMES, SECRET_FIELDS, Config, ExecutionResult, ReviewedIssue, TriageResult
 
 
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
@@ -15,9 +24,21 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument("--issue-file", help="Path to file containing ReviewedIssue JSON")
     parser.add_argument("--config-json", help="Config fields as JSON string")
     parser.add_argument("--config-file", help="Path to file containing Config JSON")
-    parser.add_argument("--run-id", required=True, help="Dispatcher run ID")
+    parser.add_argument("--run-id", help="Dispatcher run ID (with --pull: only claim jobs from this run)")
     parser.add_argument("--db-path", required=True, help="Path to SQLite DB")
-    return parser.parse_args(argv)
+    parser.add_argument("--pull", action="store_true", help="Claim queued jobs from the DB until idle")
+    parser.add_argument("--idle-exit", type=float, default=300, help="With --pull: exit after this many idle seconds (0 = never)")
+    parser.add_argument("--poll-seconds", type=float, default=5, help="With --pull: delay between claim attempts when idle")
+    parser.add_argument("--plugin-path", help="With --pull: override the run's plugin_path on this host")
+    parser.add_argument("--socket", help="Stay alive and take jobs from the orchestrator's Unix socket")
+    parser.add_argument("--remove-input-files", action="store_true", help="Delete --issue-file/--config-file once read")
+    parser.add_argument("--headless", action="store_true", help="Run claude -p even when stdout is a terminal")
+    args = parser.parse_args(argv)
+    if not args.pull and not args.run_id:
+        parser.error("--run-id is required unless --pull is given")
+    if args.socket and args.pull:
+        parser.error("--socket and --pull are mutually exclusive")
+    return args
 
 
 def _build_reviewed(data: dict) -> ReviewedIssue:
@@ -28,42 +49,254 @@ def _build_reviewed(data: dict) -> ReviewedIssue:
         final_tier=data["final_tier"],
         skipped=data.get("skipped", False),
         edited_comment=data.get("edited_comment"),
+        max_turns=data.get("max_turns"),
+        timeout_seconds=data.get("timeout_seconds"),
+        resume_session_id=data.get("resume_session_id"),
+        resume_branch=data.get("resume_branch"),
+        base_branch=data.get("base_branch"),
+        model=data.get("model"),
     )
 
 
 def _build_config(data: dict) -> Config:
-    return Config(**{k: v for k, v in data.items() if k in Config.__dataclass_fields__})
+    fields = {k: v for k, v in data.items() if k in Config.__dataclass_fields__ and k not in SECRET_FIELDS}
+    # Secrets are never serialized into the config a worker receives
+    fields.update({k: os.environ[env] for k, env in SECRET_FIELDS.items() if env in os.environ})
+    return Config(**fields)
+
+
+class _Heartbeat:
+    """Extends this worker's job lease from a background thread until stopped."""
+
+    def __init__(self, db_path: str, run_id: str, issue_number: int, lease_seconds: float) -> None:
+        self._args = (db_path, run_id, issue_number, lease_seconds)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name="heartbeat", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _beat(self) -> None:
+        db_path, run_id, issue_number, lease_seconds = self._args
+        conn = db.init_db(db_path)  # sqlite connections can't cross threads
+        try:
+            while True:
+                try:
+                    db.heartbeat_job(conn, run_id, issue_number, lease_seconds)
+                except Exception as exc:
+                    print(f"Heartbeat failed: {exc}")
+                if self._stop.wait(lease_seconds / 4):
+                    return
+        finally:
+            conn.close()
 
 
 def run_worker(
-    issue_data: dict, config_data: dict, run_id: str, db_path: str,
+    issue_data: dict, config_data: dict, run_id: str, db_path: str, headless: bool = False,
 ) -> int:
     reviewed = _build_reviewed(issue_data)
     config = _build_config(config_data)
     conn = db.init_db(db_path)
-
     try:
-        branch = create_branch(reviewed.triage.issue_number, reviewed.triage.scope, config)
-    except Exception as exc:
-        print(f"Branch creation failed: {exc}")
+        code, _ = _run_issue(conn, reviewed, config, run_id, db_path, headless)
+    finally:
         conn.close()
-        return 1
+    return code
+
+
+def _run_issue(
+    conn, reviewed: ReviewedIssue, config: Config, run_id: str, db_path: str, headless: bool = False,
+) -> tuple[int, ExecutionResult]:
+    """Branch, execute and record one issue in the current directory. Returns (exit_code, result).
 
-    interactive = sys.stdout.isatty()
-    er = execute_issue(reviewed, branch, config, interactive=interactive)
-    db.update_issue_execution(conn, run_id, reviewed.triage.issue_number, er)
-    conn.close()
+    A resumed issue checks out its recorded branch and continues its recorded
+    session (or re-runs on that branch when no session was recorded). Without
+    ``headless``, a terminal on stdout (a tmux pane) gets an interactive session.
+    """
+    number = reviewed.triage.issue_number
+    db.mark_issue_started(conn, run_id, number)
+    heartbeat = _Heartbeat(db_path, run_id, number, config.job_lease_seconds)
+    heartbeat.start()
+    try:
+        try:
+            if reviewed.resume_branch:
+                branch = checkout_branch(reviewed.resume_branch)
+            else:
+                branch = create_branch(number, reviewed.triage.scope, config, reviewed.base_branch)
+        except Exception as exc:
+            print(f"Branch creation failed: {exc}")
+            er = ExecutionResult(
+                issue_number=number, branch_name=reviewed.resume_branch or "", session_id=reviewed.resume_session_id,
+                num_turns=0, is_error=True, pr_number=None, pr_url=None,
+                error_message=f"Branch creation failed: {exc}", outcome="failed",
+            )
+            # Recorded like any other result, so stats and --resume see the failure
+            db.update_issue_execution(conn, run_id, number, er)
+            db.finish_job(conn, run_id, number)
+            return 1, er
+
+        if reviewed.resume_session_id:
+            er = parse_resume_result(number, branch, resume_issue(
+                reviewed.resume_session_id, config, model=reviewed.model, max_turns=reviewed.max_turns,
+                timeout_seconds=reviewed.timeout_seconds,
+            ), config, reviewed.final_tier, reviewed.max_turns)
+        else:
+            session_id = str(uuid.uuid4())
+            db.record_issue_session(conn, run_id, number, branch, session_id)
+            interactive = not headless and sys.stdout.isatty()
+            er = execute_issue(reviewed, branch, config, interactive=interactive, session_id=session_id)
+        if reviewed.resume_session_id or reviewed.resume_branch:
+            db.increment_resume_count(conn, run_id, number)
+        db.update_issue_execution(conn, run_id, number, er)
+        db.finish_job(conn, run_id, number)
+    finally:
+        heartbeat.stop()
 
     if er.outcome in ("pr_created", "pr_created_review"):
-        print(f"[#{reviewed.triage.issue_number}] {branch} -> PR #{er.pr_number}")
-        return 0
+        print(f"[#{number}] {branch} -> PR #{er.pr_number}")
+        return 0, er
     elif er.outcome == "leash_hit":
-        print(f"[#{reviewed.triage.issue_number}] Hit turn limit ({er.num_turns} turns)")
-        return 1
+        print(f"[#{number}] Hit turn limit ({er.num_turns} turns)")
+        return 1, er
+    elif er.outcome == "timed_out":
+        print(f"[#{number}] {er.error_message}")
+        return 1, er
     else:
         msg = er.error_message or f"No PR created (outcome: {er.outcome})"
-        print(f"[#{reviewed.triage.issue_number}] Failed: {msg}")
-        return 1
+        print(f"[#{number}] Failed: {msg}")
+        return 1, er
+
+
+def serve_socket(socket_path: str, run_id: str, db_path: str) -> int:
+    """Long-lived worker: run jobs sent by the orchestrator over a Unix socket.
+
+    Protocol is newline-delimited JSON. The worker says ``hello``, then
+    receives ``job`` messages (issue, config, cwd) and answers each with a
+    ``result``; ``stop`` or a closed socket ends the loop.
+    """
+    conn = db.init_db(db_path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(socket_path)
+    stream = sock.makefile("rw", encoding="utf-8")
+    try:
+        _send(stream, {"type": "hello", "pid": os.getpid()})
+        for line in stream:
+            msg = json.loads(line)
+            if msg.get("type") == "stop":
+                break
+            if msg.get("type") != "job":
+                continue
+            os.chdir(msg["cwd"])
+            code, er = _run_issue(conn, _build_reviewed(msg["issue"]), _build_config(msg["config"]), run_id, db_path)
+            _send(stream, {"type": "result", "exit_code": code, "result": asdict(er)})
+    except OSError as exc:
+        # Orchestrator went away; results are already in the DB for recovery
+        print(f"Lost orchestrator connection: {exc}")
+    finally:
+        sock.close()
+        conn.close()
+    return 0
+
+
+def _send(stream, msg: dict) -> None:
+    stream.write(json.dumps(msg) + "\n")
+    stream.flush()
+
+
+def pull_jobs(
+    db_path: str,
+    run_id: str | None = None,
+    idle_exit: float = 300,
+    poll_seconds: float = 5,
+    plugin_path: str | None = None,
+    repo_root: Path | None = None,
+) -> int:
+    """Claim and execute queued jobs one at a time until idle for idle_exit seconds.
+
+    Each job runs in its own worktree of repo_root (default: cwd) through a
+    child ``dispatcher.worker`` process, which heartbeats and records the
+    result exactly as a tmux-launched worker does.
+    """
+    repo_root = repo_root or Path.cwd()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    conn = db.init_db(db_path)
+    idle_since = time.monotonic()
+    handled = 0
+    try:
+        while True:
+            job = db.claim_job(conn, worker_id, Config.job_lease_seconds, run_id)
+            if job is None:
+                if idle_exit and time.monotonic() - idle_since >= idle_exit:
+                    print(f"[{worker_id}] Idle for {idle_exit:.0f}s; exiting after {handled} job(s).")
+                    return 0
+                time.sleep(poll_seconds)
+                continue
+            _run_pulled_job(conn, job, db_path, plugin_path, repo_root)
+            handled += 1
+            idle_since = time.monotonic()
+    finally:
+        conn.close()
+
+
+def _run_pulled_job(conn, job, db_path: str, plugin_path: str | None, repo_root: Path) -> None:
+    run_id, number = job["run_id"], job["issue_number"]
+    run = db.get_run(conn, run_id)
+    config_data = json.loads(run["config"]) if run else {}
+    if plugin_path:
+        config_data["plugin_path"] = plugin_path
+    if "plugin_path" not in config_data:
+        _fail_job(conn, run_id, number, "Run has no stored config; start it with a current dispatcher")
+        return
+
+    config = _build_config(config_data)
+    # The claim used the default lease; hold the job for as long as this run's workers expect
+    db.heartbeat_job(conn, run_id, number, config.job_lease_seconds)
+
+    print(f"Claimed #{number} from run {run_id}")
+    try:
+        wt_path = worktree.create_worktree(number, config.base_branch, repo_root)
+    except Exception as exc:
+        _fail_job(conn, run_id, number, f"Worktree creation failed: {exc}")
+        return
+    files = []
+    retain = False
+    try:
+        for prefix, data in ((f"issue-{number}-", job["payload"]), ("config-", json.dumps(config_data))):
+            with tempfile.NamedTemporaryFile("w", suffix=".json", prefix=prefix, delete=False) as fh:
+                fh.write(data)
+            files.append(fh.name)
+        # Always headless: a pull worker started from a terminal would otherwise
+        # open an interactive session that nobody sends a prompt to
+        proc = subprocess.run([
+            sys.executable, "-m", "dispatcher.worker",
+            "--issue-file", files[0], "--config-file", files[1],
+            "--run-id", run_id, "--db-path", str(Path(db_path).resolve()), "--headless",
+        ], cwd=wt_path)
+        if db.get_job(conn, run_id, number)["state"] != "done":
+            _fail_job(conn, run_id, number, f"Worker exited with code {proc.returncode}")
+        issue = db.get_issue(conn, run_id, number)
+        if issue and config.retain_worktrees and issue["outcome"] in RESUMABLE_OUTCOMES:
+            db.retain_worktree(conn, run_id, number, str(wt_path), issue["branch_name"] or "", issue["outcome"])
+            retain = True
+    finally:
+        for name in files:
+            Path(name).unlink(missing_ok=True)
+        if not retain:
+            worktree.remove_worktree(wt_path, repo_root)
+            db.release_worktree(conn, str(wt_path))
+
+
+def _fail_job(conn, run_id: str, issue_number: int, message: str) -> None:
+    print(f"[#{issue_number}] Failed: {message}")
+    db.update_issue_execution(conn, run_id, issue_number, ExecutionResult(
+        issue_number=issue_number, branch_name="", session_id=None, num_turns=0, is_error=True,
+        pr_number=None, pr_url=None, error_message=message, outcome="failed",
+    ))
+    db.finish_job(conn, run_id, issue_number)
 
 
 def _load_json(inline: str | None, filepath: str | None, label: str) -> dict:
@@ -78,6 +311,13 @@ def _load_json(inline: str | None, filepath: str | None, label: str) -> dict:
 def main() -> None:
     args = parse_args()
 
+    if args.pull:
+        sys.exit(pull_jobs(
+            args.db_path, args.run_id, args.idle_exit, args.poll_seconds, args.plugin_path,
+        ))
+    if args.socket:
+        sys.exit(serve_socket(args.socket, args.run_id, args.db_path))
+
     try:
         issue_data = _load_json(args.issue_json, args.issue_file, "issue")
     except (json.JSONDecodeError, TypeError, FileNotFoundError) as exc:
@@ -90,7 +330,12 @@ def main() -> None:
         print(f"Invalid config data: {exc}")
         sys.exit(1)
 
-    code = run_worker(issue_data, config_data, args.run_id, args.db_path)
+    if args.remove_input_files:
+        for name in (args.issue_file, args.config_file):
+            if name:
+                Path(name).unlink(missing_ok=True)
+
+    code = run_worker(issue_data, config_data, args.run_id, args.db_path, args.headless)
     sys.exit(code)
 
 
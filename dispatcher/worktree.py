@@ -1,14 +1,26 @@
 from __future__ import annotations
 
+import os
 import shutil
 import subprocess
+from datetime import datetime, timezone
 from pathlib import Path
 
+from dispatcher import db
+
 _WORKTREE_DIR = ".dispatcher-worktrees"
 
 
+def worktrees_dir(repo_root: Path) -> Path:
+    return repo_root / _WORKTREE_DIR
+
+
+def worktree_path(issue_number: int, repo_root: Path) -> Path:
+    return repo_root / _WORKTREE_DIR / f"issue-{issue_number}"
+
+
 def create_worktree(issue_number: int, base_branch: str, repo_root: Path) -> Path:
-    path = repo_root / _WORKTREE_DIR / f"issue-{issue_number}"
+    path = worktree_path(issue_number, repo_root)
     # Prune stale worktree refs that would block re-creation
     subprocess.run(
         ["git", "worktree", "prune"],
@@ -32,9 +44,60 @@ def remove_worktree(path: Path, repo_root: Path | None = None) -> None:
     )
 
 
-def cleanup_all(repo_root: Path) -> None:
+def cleanup_all(repo_root: Path, keep: set[Path] = frozenset()) -> None:
+    """Remove every dispatcher worktree except those in keep (retained for resume)."""
+    root = repo_root / _WORKTREE_DIR
+    if keep and root.exists():
+        for path in root.iterdir():
+            if path not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+    else:
+        shutil.rmtree(root, ignore_errors=True)
     subprocess.run(
         ["git", "worktree", "prune"],
         capture_output=True, text=True, timeout=30,
     )
-    shutil.rmtree(repo_root / _WORKTREE_DIR, ignore_errors=True)
+
+
+def dir_size_mb(path: Path) -> float:
+    total = 0
+    for dirpath, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass
+    return total / (1024 * 1024)
+
+
+def evict_retained(conn, repo_root: Path, max_age_days: int, max_total_mb: int) -> list[Path]:
+    """Apply the retention policy to worktrees kept for resume; returns the evicted paths.
+
+    Entries whose directory is gone are dropped, then worktrees unused for
+    more than max_age_days, then the least recently used ones until the rest
+    fit in max_total_mb. A limit of 0 disables that rule.
+    """
+    now = datetime.now(timezone.utc)
+    kept: list[tuple[Path, float]] = []
+    evicted: list[Path] = []
+    for row in db.get_retained_worktrees(conn):
+        path = Path(row["path"])
+        if not path.exists():
+            db.release_worktree(conn, row["path"])
+            continue
+        age_days = (now - datetime.fromisoformat(row["updated_at"])).total_seconds() / 86400
+        if max_age_days and age_days > max_age_days:
+            evicted.append(path)
+        else:
+            kept.append((path, dir_size_mb(path) if max_total_mb else 0.0))
+    total = sum(size for _, size in kept)
+    for path, size in kept:  # least recently used first
+        if not max_total_mb or total <= max_total_mb:
+            break
+        evicted.append(path)
+        total -= size
+    for path in evicted:
+        remove_worktree(path, repo_root)
+        shutil.rmtree(path, ignore_errors=True)
+        db.release_worktree(conn, str(path))
+    return evicted